@@ -0,0 +1,88 @@
+"""Benchmark da leitura de arquivos na exportação: sequencial x paralela.
+
+Uso:
+    python benchmark_reader.py [PASTA] [--workers 1 4 8] [--repeat 3] [--latencia-ms 0]
+
+Sem PASTA, uma árvore sintética é criada em um diretório temporário.
+A opção --latencia-ms acrescenta um atraso a cada abertura de arquivo para
+simular compartilhamentos de rede ou discos com cache frio.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import folder_content_core as core
+
+
+def create_sample_tree(base, folders=20, files_per_folder=50, file_size=8 * 1024):
+    """Cria uma árvore sintética de arquivos de texto"""
+    line = "lorem ipsum dolor sit amet, consectetur adipiscing elit\n"
+    body = (line * (file_size // len(line) + 1))[:file_size]
+    for i in range(folders):
+        folder = os.path.join(base, f"pasta_{i:03d}")
+        os.makedirs(folder)
+        for j in range(files_per_folder):
+            with open(os.path.join(folder, f"arquivo_{j:03d}.txt"), 'w', encoding='utf-8') as f:
+                f.write(body)
+
+
+def install_latency(latency):
+    """Substitui open no núcleo de exportação por uma versão com atraso artificial"""
+    if latency <= 0:
+        return
+
+    def slow_open(*args, **kwargs):
+        time.sleep(latency)
+        return open(*args, **kwargs)
+
+    core.open = slow_open
+
+
+def run_export(folder, workers):
+    """Executa a exportação completa descartando a saída e retorna (segundos, bytes)"""
+    total = 0
+    start = time.perf_counter()
+    for chunk in core.iter_documentation(folder, {folder}, workers):
+        total += len(chunk)
+    return time.perf_counter() - start, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara a leitura sequencial e paralela da exportação")
+    parser.add_argument('folder', nargs='?', help="pasta a exportar (padrão: árvore sintética)")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8, 16])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--latencia-ms', type=float, default=0.0, dest='latency_ms')
+    args = parser.parse_args()
+
+    temp_dir = None
+    folder = args.folder
+    if not folder:
+        temp_dir = tempfile.mkdtemp(prefix="bench_gerador_")
+        folder = os.path.join(temp_dir, "projeto")
+        create_sample_tree(folder)
+
+    install_latency(args.latency_ms / 1000.0)
+
+    try:
+        print(f"📂 Pasta: {folder}")
+        baseline = None
+        for workers in args.workers:
+            times = []
+            for _ in range(args.repeat):
+                elapsed, size = run_export(folder, workers)
+                times.append(elapsed)
+            best = min(times)
+            if baseline is None:
+                baseline = best
+            mode = "sequencial" if workers <= 1 else f"{workers} threads"
+            print(f"{mode:>12}: {best * 1000:9.1f} ms  ({size / 1024:.0f} KB, {baseline / best:.2f}x)")
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
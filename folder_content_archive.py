@@ -0,0 +1,363 @@
+"""Leitura de projetos direto de arquivos compactados (.zip, .tar, .tar.gz).
+
+ArchiveScanner monta um arquivo compactado como uma pasta virtual: o
+caminho do arquivo (ex.: /downloads/app-1.0.tar.gz) faz o papel da pasta
+do projeto e os membros aparecem abaixo dele
+(/downloads/app-1.0.tar.gz/app-1.0/setup.py). As listagens vêm do
+diretório central do zip ou dos cabeçalhos do tar, lidos uma única vez
+ao montar, e o conteúdo dos membros é lido em fluxo durante a
+exportação; nada é extraído para o disco. Os .gitignore de dentro do
+arquivo valem quando o IgnoreMatcher é criado com o scanner
+(IgnoreMatcher(root, scanner=scanner)), que os lê por ArchiveScanner.open.
+
+Um .tar.gz não permite ler um membro sem descomprimir tudo o que vem
+antes dele. Na leitura dos cabeçalhos são guardados pontos de acesso (o
+estado do descompressor a cada GZIP_ACCESS_SPACING bytes descomprimidos,
+como no zran.c do zlib), que dividem o tar em blocos descomprimidos
+independentemente; os últimos blocos usados ficam em um cache LRU, de
+modo que os membros de uma mesma pasta, vizinhos no arquivo, são lidos
+sem descomprimir o mesmo trecho várias vezes.
+
+Exemplo:
+    from folder_content_archive import ArchiveScanner
+    from folder_content_core import write_documentation
+    with ArchiveScanner('/downloads/app-1.0.tar.gz') as scanner:
+        write_documentation('app.md', scanner.root, {scanner.root}, scanner=scanner)
+"""
+import errno
+import io
+import os
+import posixpath
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+
+from folder_content_core import VirtualScanner
+
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz')
+
+# Distância (em bytes descomprimidos) entre os pontos de acesso de um .tar.gz
+GZIP_ACCESS_SPACING = 2 * 1024 * 1024
+
+# Bytes lidos do .gz a cada passo e limite de saída por passo do descompressor
+GZIP_INPUT_CHUNK = 64 * 1024
+GZIP_OUTPUT_CHUNK = 1024 * 1024
+
+# Blocos descomprimidos de .tar.gz mantidos em cache (cada um com cerca de
+# GZIP_ACCESS_SPACING bytes)
+GZIP_CACHED_BLOCKS = 16
+
+# Buffer dos leitores de membros (também o trecho verificado por open_binary_file)
+MEMBER_BUFFER_SIZE = 64 * 1024
+
+
+class ArchiveError(OSError):
+    """Arquivo compactado inválido ou em formato não suportado"""
+
+
+def is_archive(path):
+    """Indica se path é um arquivo compactado que pode ser montado como pasta"""
+    return path.lower().endswith(ARCHIVE_EXTENSIONS) and os.path.isfile(path)
+
+
+def _member_path(name):
+    """Caminho normalizado de um membro ('a/b.py'), ou None se ele deve ser ignorado"""
+    name = posixpath.normpath(name.replace('\\', '/')).lstrip('/')
+    if name in ('', '.') or name == '..' or name.startswith('../'):
+        return None
+    return name
+
+
+class _GzipStream:
+    """Descompressão sequencial de um .gz a partir de um ponto de acesso.
+
+    pos é a posição (descomprimida) do próximo byte a ser lido. Com
+    points, pontos de acesso (posição na entrada, posição descomprimida,
+    cópia do descompressor) são registrados a cada spacing bytes.
+    """
+
+    def __init__(self, path, in_offset=0, out_offset=0, decompressor=None, points=None,
+                 spacing=GZIP_ACCESS_SPACING):
+        self.f = open(path, 'rb')
+        self.f.seek(in_offset)
+        self.d = decompressor
+        self.pos = out_offset
+        self.points = points
+        self.spacing = spacing
+        self._buffer = b''
+        self._start = 0
+        self._input = b''
+        self._eof = False
+        self._out = out_offset  # posição descomprimida do fim do buffer
+
+    def _fill(self):
+        """Descomprime mais um trecho para o buffer; retorna False no fim do arquivo"""
+        # Importado sob demanda, como os demais formatos de compressão
+        import zlib
+
+        while not self._eof:
+            data = self._input or self.f.read(GZIP_INPUT_CHUNK)
+            if not data:
+                self._eof = True
+                break
+            if self.d is None:
+                # Início de um membro gzip; o que vier depois do último é descartado
+                if not data.startswith(b'\x1f\x8b'):
+                    self._eof = True
+                    break
+                self.d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            try:
+                out = self.d.decompress(data, GZIP_OUTPUT_CHUNK)
+            except zlib.error as e:
+                raise ArchiveError(f"arquivo gzip corrompido: {e}") from None
+            if self.d.eof:
+                self._input = self.d.unused_data
+                self.d = None
+            else:
+                self._input = self.d.unconsumed_tail
+            self._out += len(out)
+
+            # Ponto de acesso: só quando toda a entrada lida foi consumida
+            if self.points is not None and not self._input:
+                last = self.points[-1][1] if self.points else 0
+                if self._out - last >= self.spacing:
+                    self.points.append((self.f.tell(), self._out, self.d.copy() if self.d else None))
+
+            if out:
+                self._buffer = self._buffer[self._start:] + out
+                self._start = 0
+                return True
+        return False
+
+    def read(self, size):
+        """Lê até size bytes (menos só no fim do arquivo)"""
+        while len(self._buffer) - self._start < size and self._fill():
+            pass
+        data = self._buffer[self._start:self._start + size]
+        self._start += len(data)
+        self.pos += len(data)
+        return data
+
+    def close(self):
+        self.f.close()
+
+
+class _GzipIndex:
+    """Acesso aleatório a um .gz pelos pontos de acesso, com cache dos blocos descomprimidos.
+
+    points são os pontos registrados por _GzipStream (o primeiro em 0) e
+    end a posição descomprimida até onde o arquivo foi lido; o bloco i vai
+    do ponto i ao i + 1 (ou até end).
+    """
+
+    def __init__(self, path, points, end):
+        self.path = path
+        self.points = points
+        self.end = end
+        self._offsets = [point[1] for point in points]
+        self._blocks = OrderedDict()  # índice do bloco -> bytes
+        self._loading = {}  # índice do bloco -> Event (descompressão em andamento)
+        self._lock = threading.Lock()
+
+    def _block(self, i):
+        while True:
+            with self._lock:
+                data = self._blocks.get(i)
+                if data is not None:
+                    self._blocks.move_to_end(i)
+                    return data
+                # Um bloco pedido por várias threads é descomprimido só por uma
+                loading = self._loading.get(i)
+                if loading is None:
+                    self._loading[i] = threading.Event()
+                    break
+            loading.wait()
+        try:
+            data = self._decompress(i)
+            with self._lock:
+                self._blocks[i] = data
+                while len(self._blocks) > GZIP_CACHED_BLOCKS:
+                    self._blocks.popitem(last=False)
+        finally:
+            with self._lock:
+                self._loading.pop(i).set()
+        return data
+
+    def _decompress(self, i):
+        in_offset, out_offset, decompressor = self.points[i]
+        stop = self._offsets[i + 1] if i + 1 < len(self._offsets) else self.end
+        stream = _GzipStream(self.path, in_offset, out_offset, decompressor.copy() if decompressor else None)
+        try:
+            return stream.read(stop - out_offset)
+        finally:
+            stream.close()
+
+    def read_at(self, offset, size):
+        """Lê até size bytes a partir de offset (descomprimido)"""
+        parts = []
+        while size > 0 and offset < self.end:
+            i = bisect_right(self._offsets, offset) - 1
+            data = self._block(i)
+            start = offset - self._offsets[i]
+            piece = data[start:start + size]
+            if not piece:
+                break
+            parts.append(piece)
+            offset += len(piece)
+            size -= len(piece)
+        return b''.join(parts)
+
+    def clear(self):
+        with self._lock:
+            self._blocks.clear()
+
+
+class _GzipMember:
+    """Fluxo de leitura de um trecho de um .gz, a partir de um _GzipIndex"""
+
+    def __init__(self, index, offset):
+        self._index = index
+        self._offset = offset
+
+    def read(self, size):
+        data = self._index.read_at(self._offset, size)
+        self._offset += len(data)
+        return data
+
+    def close(self):
+        pass
+
+
+class _MemberReader(io.RawIOBase):
+    """Leitura dos size bytes de um membro de um tar a partir de um fluxo já posicionado"""
+
+    def __init__(self, stream, size):
+        self._stream = stream
+        self._remaining = size
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        data = self._stream.read(size)
+        if not data:
+            raise ArchiveError("arquivo compactado truncado")
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._stream.close()
+        super().close()
+
+
+class ArchiveScanner(VirtualScanner):
+    """Scanner que serve os membros de um .zip, .tar ou .tar.gz como uma pasta virtual.
+
+    root é o caminho do arquivo compactado, usado como pasta do projeto;
+    a árvore de membros é lida ao criar o scanner e open lê o conteúdo de
+    um membro em fluxo. No tar, links simbólicos e arquivos especiais
+    ficam de fora. Pode ser usado por várias threads; close (ou with)
+    libera o arquivo.
+    """
+
+    def __init__(self, archive_path, cache=None, ignore=None, name_index=None):
+        super().__init__(os.path.normpath(os.path.abspath(archive_path)), cache, ignore, name_index)
+        self._zip = None
+        self._gzip = None
+
+        name = self.root.lower()
+        try:
+            if name.endswith('.zip'):
+                self._load_zip()
+            else:
+                self._load_tar(name.endswith(('.gz', '.tgz')))
+        except ArchiveError:
+            self.close()
+            raise
+        except (EOFError, ValueError) as e:
+            self.close()
+            raise ArchiveError(f"arquivo compactado inválido: {e}") from None
+
+    def close(self):
+        """Fecha o arquivo compactado e os leitores abertos"""
+        if self._zip is not None:
+            self._zip.close()
+        if self._gzip is not None:
+            self._gzip.clear()
+
+    def _load_zip(self):
+        import zipfile
+        try:
+            self._zip = zipfile.ZipFile(self.root)
+        except zipfile.BadZipFile as e:
+            raise ArchiveError(f"arquivo zip inválido: {e}") from None
+        for info in self._zip.infolist():
+            name = _member_path(info.filename)
+            if name is None:
+                continue
+            if info.is_dir():
+                self._add(name, True)
+            else:
+                mtime = time.mktime(info.date_time + (0, 0, -1))
+                self._add(name, False, info.file_size, mtime, info)
+
+    def _load_tar(self, compressed):
+        import tarfile
+        points = None
+        if compressed:
+            points = [(0, 0, None)]
+            stream = _GzipStream(self.root, points=points, spacing=GZIP_ACCESS_SPACING)
+            mode = 'r|'
+        else:
+            stream = open(self.root, 'rb')
+            mode = 'r:'
+        try:
+            with tarfile.open(fileobj=stream, mode=mode) as tar:
+                while True:
+                    member = tar.next()
+                    if member is None:
+                        break
+                    # Só os dados de posição são guardados: a lista do tarfile é descartada
+                    tar.members.clear()
+                    name = _member_path(member.name)
+                    if name is None:
+                        continue
+                    if member.isdir():
+                        self._add(name, True)
+                    elif member.isreg() and not member.issparse():
+                        self._add(name, False, member.size, float(member.mtime), member.offset_data)
+                    elif member.islnk():
+                        target = self._files.get(_member_path(member.linkname) or '')
+                        if target is not None:
+                            self._add(name, False, target[0], float(member.mtime), target[2])
+        except tarfile.TarError as e:
+            raise ArchiveError(f"arquivo tar inválido: {e}") from None
+        finally:
+            stream.close()
+        if compressed:
+            self._gzip = _GzipIndex(self.root, points, stream._out)
+
+    def open(self, path):
+        """Abre um membro para leitura em fluxo; retorna (arquivo binário, tamanho)"""
+        name = self._relative(path)
+        member = self._files.get(name) if name is not None else None
+        if member is None:
+            code = errno.EISDIR if name in self._dirs else errno.ENOENT
+            raise OSError(code, os.strerror(code), path)
+        size, _, locator = member
+
+        if self._zip is not None:
+            raw = self._zip.open(locator)
+        elif self._gzip is not None:
+            raw = _MemberReader(_GzipMember(self._gzip, locator), size)
+        else:
+            f = open(self.root, 'rb')
+            f.seek(locator)
+            raw = _MemberReader(f, size)
+        return io.BufferedReader(raw, MEMBER_BUFFER_SIZE), size
@@ -0,0 +1,111 @@
+"""Seleção só dos arquivos alterados (desde uma revisão do git ou uma data).
+
+Os caminhos devolvidos aqui são usados diretamente como selected_items
+da exportação, que então traz só esses arquivos, sem as pastas em volta.
+
+changed_since_ref pergunta ao git: `git diff --name-only` contra a
+revisão (mais os arquivos novos ainda não rastreados) já traz o conjunto
+alterado, e nenhum outro arquivo do projeto é consultado nem lido.
+modified_since percorre a árvore pelo Scanner e compara o mtime de cada
+arquivo com o limite, sem ler conteúdo; com o índice persistente
+(folder_content_index), pastas inalteradas não são listadas de novo.
+O mtime de cada arquivo ainda precisa ser consultado, já que editar um
+arquivo no lugar não altera o mtime da pasta.
+
+Exemplo:
+    from folder_content_changes import changed_since_ref
+    from folder_content_core import write_documentation
+    paths = changed_since_ref('/projetos/app', 'main')
+    write_documentation('revisao.md', '/projetos/app', set(paths))
+"""
+import datetime
+import os
+import re
+import time
+
+from folder_content_git import GitError, run_git
+
+# Durações relativas aceitas como limite ("30m", "2h", "7d", "1w")
+_DURATION_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([smhdw])\s*$', re.IGNORECASE)
+_DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 7 * 86400}
+
+
+def parse_cutoff(text, now=None):
+    """Converte um limite em timestamp.
+
+    Aceita durações relativas a agora ("30m", "2h", "7d", "1w") e datas
+    ISO 8601 no horário local ("2024-05-01", "2024-05-01 14:30");
+    levanta ValueError para qualquer outro texto.
+    """
+    match = _DURATION_RE.match(text)
+    if match:
+        now = time.time() if now is None else now
+        return now - float(match.group(1)) * _DURATION_UNITS[match.group(2).lower()]
+    try:
+        moment = datetime.datetime.fromisoformat(text.strip())
+    except ValueError:
+        raise ValueError(f"data ou duração inválida: {text} (use ex.: 2h, 7d ou 2024-05-01)") from None
+    return moment.timestamp()
+
+
+def modified_since(root_path, cutoff, scanner, task=None):
+    """Arquivos da árvore (sem os ignorados) com mtime posterior a cutoff, em ordem.
+
+    As listagens vêm do scanner (e do índice persistente, se houver); de
+    cada arquivo só é consultado o mtime atual (scanner.file_key).
+    task.progress recebe (arquivos verificados, alterados).
+    """
+    changed = []
+    checked = 0
+    for path, dirs, files in scanner.walk(root_path):
+        if task:
+            task.check()
+        for entry in files:
+            try:
+                mtime, _ = scanner.file_key(entry.path)
+            except OSError:
+                continue
+            if mtime > cutoff:
+                changed.append(entry.path)
+        checked += len(files)
+        if task:
+            task.progress(checked, len(changed))
+    changed.sort()
+    return changed
+
+
+def changed_since_ref(root_path, ref, revision=None):
+    """Arquivos de root_path alterados desde a revisão ref, relativos a root_path, em ordem.
+
+    Sem revision, compara ref com a pasta de trabalho e inclui os arquivos
+    não rastreados (respeitando o .gitignore); com revision, compara as
+    duas revisões. Arquivos removidos e submódulos ficam de fora e nenhum
+    arquivo é consultado no disco. Levanta GitError.
+    """
+    try:
+        run_git(root_path, 'rev-parse', '--verify', '--quiet', '--end-of-options', f"{ref}^{{commit}}")
+    except GitError:
+        raise GitError(f"revisão não encontrada: {ref}") from None
+
+    args = ['diff', '--name-only', '-z', '--relative', '--no-renames', '--diff-filter=d',
+            '--ignore-submodules', ref]
+    if revision is not None:
+        args.append(revision)
+    names = set(run_git(root_path, *args, '--', '.').split(b'\0'))
+    if revision is None:
+        names.update(run_git(root_path, 'ls-files', '--others', '--exclude-standard', '-z', '--', '.').split(b'\0'))
+    names.discard(b'')
+    return sorted(os.path.normpath(os.fsdecode(name)) for name in names)
+
+
+def find_changed(root_path, since, scanner, task=None):
+    """Arquivos alterados conforme since: uma duração ou data (modified_since) ou uma revisão do git.
+
+    Retorna caminhos absolutos; levanta GitError se since não for uma
+    data nem uma revisão válida.
+    """
+    try:
+        cutoff = parse_cutoff(since)
+    except ValueError:
+        return [os.path.join(root_path, name) for name in changed_since_ref(root_path, since)]
+    return modified_since(root_path, cutoff, scanner, task)
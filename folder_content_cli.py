@@ -0,0 +1,302 @@
+"""Modo linha de comando do Gerador de Conteúdo (sem interface gráfica).
+
+Exemplos:
+    python folder_content_generator.py export meu_projeto -o meu_projeto.md
+    python folder_content_generator.py export meu_projeto --include src --include README.md
+    python folder_content_cli.py export meu_projeto > saida.txt
+    python folder_content_cli.py export meu_projeto -o meu_projeto.md.xz --level 9
+    python folder_content_cli.py export app-1.0.tar.gz -o app.md
+    python folder_content_cli.py export meu_projeto --rev v1.0 -o meu_projeto-v1.0.md
+    python folder_content_cli.py export meu_projeto --changed-since main -o revisao.md
+    python folder_content_cli.py export meu_projeto --modified-since 2h
+
+Não importa o Tkinter, podendo rodar em agentes de build e tarefas agendadas.
+"""
+import argparse
+import os
+import sys
+
+from folder_content_core import (
+    DEFAULT_MAX_FILE_SIZE, DEFAULT_RAW_COPY_SIZE, DEFAULT_READ_WORKERS, Scanner, iter_documentation,
+    write_chunks, write_documentation
+)
+
+
+def build_parser():
+    """Monta o parser de argumentos da linha de comando"""
+    parser = argparse.ArgumentParser(
+        prog="folder_content_generator.py",
+        description="Gerador de Conteúdo - documentação de projetos sem interface gráfica"
+    )
+    subparsers = parser.add_subparsers(dest='command')
+
+    export = subparsers.add_parser('export', help="gera a documentação de uma pasta")
+    export.add_argument(
+        'root', help="pasta do projeto ou arquivo .zip, .tar, .tar.gz ou .tgz (lido sem extrair)"
+    )
+    export.add_argument(
+        '-i', '--include', action='append', default=[], metavar='CAMINHO',
+        help="arquivo ou pasta (relativo à pasta do projeto) a incluir; pode ser repetido. "
+             "Padrão: o projeto inteiro"
+    )
+    export.add_argument(
+        '-e', '--exclude', action='append', default=[], metavar='CAMINHO',
+        help="arquivo ou pasta (relativo à pasta do projeto) a excluir do que foi incluído; pode ser repetido"
+    )
+    export.add_argument(
+        '-o', '--output', default='-', metavar='ARQUIVO',
+        help="arquivo de saída ('-' para a saída padrão, o padrão); "
+             "com extensão .gz, .xz ou .bz2 a saída é comprimida durante a geração"
+    )
+    export.add_argument(
+        '--rev', metavar='REVISÃO',
+        help="exporta uma revisão do repositório git da pasta (tag, branch ou commit), "
+             "lida direto do banco de objetos, sem checkout"
+    )
+    changes = export.add_mutually_exclusive_group()
+    changes.add_argument(
+        '--changed-since', metavar='REF',
+        help="exporta só os arquivos alterados desde a revisão REF do git (git diff), "
+             "mais os novos não rastreados; com --rev, as alterações entre REF e a revisão"
+    )
+    changes.add_argument(
+        '--modified-since', metavar='TEMPO',
+        help="exporta só os arquivos com mtime posterior a TEMPO: duração (30m, 2h, 7d) "
+             "ou data (2024-05-01, '2024-05-01 14:30')"
+    )
+    export.add_argument(
+        '--level', type=int, choices=range(0, 10), metavar='0-9',
+        help="nível de compressão das saídas .gz/.xz/.bz2 (padrão: 6 para gzip e xz, 9 para bz2)"
+    )
+    export.add_argument(
+        '-w', '--workers', type=int, default=DEFAULT_READ_WORKERS,
+        help=f"threads de leitura antecipada (1 = sequencial, padrão: {DEFAULT_READ_WORKERS})"
+    )
+    export.add_argument(
+        '-x', '--ignore', action='append', default=[], metavar='PADRÃO',
+        help="padrão a ignorar, na sintaxe do .gitignore (ex.: '*.log', 'dist/'); pode ser repetido"
+    )
+    export.add_argument(
+        '--no-ignore', action='store_true',
+        help="não aplicar .gitignore nem os padrões padrão (node_modules, .git, __pycache__...)"
+    )
+    export.add_argument(
+        '--max-size', type=int, default=DEFAULT_MAX_FILE_SIZE // 1024, metavar='KB',
+        help=f"arquivos maiores que isso são listados sem conteúdo "
+             f"(0 = sem limite, padrão: {DEFAULT_MAX_FILE_SIZE // 1024} KB)"
+    )
+    export.add_argument(
+        '--raw-size', type=int, default=DEFAULT_RAW_COPY_SIZE // 1024, metavar='KB',
+        help=f"arquivos a partir desse tamanho são copiados sem decodificação "
+             f"(0 = desativado, padrão: {DEFAULT_RAW_COPY_SIZE // 1024} KB)"
+    )
+    export.add_argument(
+        '--incremental', action='store_true',
+        help="atualiza só as seções alteradas de uma saída anterior (exige --output)"
+    )
+    export.add_argument(
+        '--max-tokens', type=int, default=0, metavar='N',
+        help="limita a saída a cerca de N tokens (estimados), escolhendo e truncando arquivos "
+             "(os mais rasos e menores primeiro)"
+    )
+    export.add_argument(
+        '--index', action='store_true',
+        help="usar o índice persistente de varredura (acelera exportações repetidas de projetos grandes; "
+             "não se aplica a arquivos compactados nem a --rev)"
+    )
+    export.add_argument('-q', '--quiet', action='store_true', help="não exibir o resumo no stderr")
+
+    return parser
+
+
+def resolve_includes(root_path, includes, default_root=True, scanner=None):
+    """Converte os caminhos de --include/--exclude em caminhos absolutos dentro do projeto"""
+    if not includes:
+        return {root_path} if default_root else set()
+
+    scanner = scanner or Scanner()
+    selected = set()
+    for include in includes:
+        path = os.path.normpath(os.path.join(root_path, include))
+        if scanner.stat(path) is None:
+            raise ValueError(f"caminho não encontrado: {include}")
+        selected.add(path)
+    return selected
+
+
+def restrict_paths(paths, selected_items, excluded_items):
+    """Mantém só os caminhos dentro de algum item incluído e fora dos excluídos"""
+    def within(path, items):
+        return any(path == item or path.startswith(item.rstrip(os.sep) + os.sep) for item in items)
+
+    return {path for path in paths if within(path, selected_items) and not within(path, excluded_items)}
+
+
+def close_scanner(scanner):
+    """Libera o índice persistente ou o arquivo compactado do scanner"""
+    if scanner.index is not None:
+        scanner.index.close()
+    if not scanner.local:
+        scanner.close()
+
+
+def run_export(args):
+    """Executa o subcomando export"""
+    root_path = os.path.abspath(args.root)
+    if args.incremental and args.output == '-':
+        print("❌ --incremental exige um arquivo de saída (--output)", file=sys.stderr)
+        return 1
+    if args.incremental and args.max_tokens > 0:
+        print("❌ --incremental e --max-tokens não podem ser usados juntos", file=sys.stderr)
+        return 1
+
+    if args.modified_since:
+        # Importado sob demanda, como os demais modos de exportação
+        from folder_content_changes import parse_cutoff
+        try:
+            cutoff = parse_cutoff(args.modified_since)
+        except ValueError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+
+    disk_root = root_path
+    if args.rev:
+        if not os.path.isdir(root_path):
+            print(f"❌ Pasta não encontrada: {args.root}", file=sys.stderr)
+            return 1
+        # Importado sob demanda: subprocess só é carregado quando uma revisão é pedida
+        from folder_content_git import GitError, GitScanner
+        try:
+            scanner = GitScanner(root_path, args.rev)
+        except GitError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+        root_path = scanner.virtual_path(root_path)
+        if scanner.stat(root_path) is None:
+            print(f"❌ Pasta não encontrada na revisão {args.rev}: {args.root}", file=sys.stderr)
+            scanner.close()
+            return 1
+    elif os.path.isfile(root_path):
+        # Importado sob demanda: zipfile/tarfile só são carregados para arquivos compactados
+        from folder_content_archive import ArchiveError, ArchiveScanner, is_archive
+        if not is_archive(root_path):
+            print(f"❌ Formato não suportado (use .zip, .tar, .tar.gz ou .tgz): {args.root}", file=sys.stderr)
+            return 1
+        try:
+            scanner = ArchiveScanner(root_path)
+        except ArchiveError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+        root_path = scanner.root
+    elif os.path.isdir(root_path):
+        scanner = Scanner()
+        if args.index:
+            # Importado sob demanda: sqlite3 só é carregado quando o índice é pedido
+            from folder_content_index import open_index
+            scanner.index = open_index(root_path)
+    else:
+        print(f"❌ Pasta não encontrada: {args.root}", file=sys.stderr)
+        return 1
+
+    try:
+        selected_items = resolve_includes(root_path, args.include, scanner=scanner)
+        excluded_items = resolve_includes(root_path, args.exclude, default_root=False, scanner=scanner)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        close_scanner(scanner)
+        return 1
+
+    if args.ignore or not args.no_ignore:
+        from folder_content_ignore import IgnoreMatcher
+        scanner.ignore = IgnoreMatcher(
+            root_path, args.ignore, use_defaults=not args.no_ignore, use_gitignore=not args.no_ignore,
+            scanner=scanner
+        )
+
+    if args.changed_since or args.modified_since:
+        from folder_content_changes import changed_since_ref, modified_since
+        try:
+            if args.changed_since:
+                if not scanner.local and not args.rev:
+                    raise ValueError("--changed-since não se aplica a arquivos compactados")
+                names = changed_since_ref(disk_root, args.changed_since, args.rev)
+                changed = [os.path.join(root_path, name) for name in names]
+            else:
+                changed = modified_since(root_path, cutoff, scanner)
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}", file=sys.stderr)
+            close_scanner(scanner)
+            return 1
+        selected_items = restrict_paths(changed, selected_items, excluded_items)
+
+    workers = max(1, args.workers)
+    max_file_size = args.max_size * 1024 if args.max_size > 0 else None
+    raw_copy_size = args.raw_size * 1024 if args.raw_size > 0 else None
+    stats = {}
+    try:
+        if args.max_tokens > 0:
+            # Importado sob demanda, como o modo incremental
+            from folder_content_tokens import iter_documentation_budget, write_documentation_budget
+        if args.output == '-':
+            out = sys.stdout.buffer
+            if args.max_tokens > 0:
+                chunks = iter_documentation_budget(
+                    root_path, selected_items, args.max_tokens, workers, stats=stats, scanner=scanner,
+                    excluded_items=excluded_items, max_file_size=max_file_size
+                )
+            else:
+                chunks = iter_documentation(root_path, selected_items, workers, stats=stats, scanner=scanner,
+                                            max_file_size=max_file_size, excluded_items=excluded_items,
+                                            raw_copy_size=raw_copy_size)
+            write_chunks(out, chunks)
+            out.flush()
+        elif args.max_tokens > 0:
+            write_documentation_budget(
+                args.output, root_path, selected_items, args.max_tokens, workers, stats=stats, scanner=scanner,
+                excluded_items=excluded_items, max_file_size=max_file_size, compress_level=args.level
+            )
+        elif args.incremental:
+            from folder_content_incremental import write_documentation_incremental
+            write_documentation_incremental(
+                args.output, root_path, selected_items, workers, stats=stats, scanner=scanner,
+                max_file_size=max_file_size, excluded_items=excluded_items, raw_copy_size=raw_copy_size,
+                compress_level=args.level
+            )
+        else:
+            write_documentation(args.output, root_path, selected_items, workers, stats=stats, scanner=scanner,
+                                max_file_size=max_file_size, excluded_items=excluded_items,
+                                raw_copy_size=raw_copy_size, compress_level=args.level)
+    except BrokenPipeError:
+        # Saída encerrada antes do fim (ex.: "| head"): sair sem traceback
+        sys.stdout = open(os.devnull, 'w')
+        return 1
+    except OSError as e:
+        print(f"❌ Erro ao gerar documentação: {e}", file=sys.stderr)
+        return 1
+    finally:
+        close_scanner(scanner)
+
+    if not args.quiet:
+        destination = "saída padrão" if args.output == '-' else args.output
+        skipped = f" ({stats['skipped']} ignorado(s))" if stats.get('skipped') else ""
+        print(f"✅ {stats['files']} arquivo(s) exportado(s) para {destination}{skipped}", file=sys.stderr)
+        if 'tokens' in stats:
+            print(f"🔢 ≈ {stats['tokens']} tokens • {stats['truncated']} truncado(s) • "
+                  f"{stats['omitted']} fora do orçamento", file=sys.stderr)
+    return 0
+
+
+def main(argv=None):
+    """Ponto de entrada do modo linha de comando; retorna o código de saída"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == 'export':
+        return run_export(args)
+
+    parser.print_help(sys.stderr)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1968 @@
+"""Núcleo do Gerador de Conteúdo: varredura, seleção e exportação.
+
+Este módulo não depende do Tkinter: é usado tanto pela interface gráfica
+quanto pelo modo linha de comando (folder_content_cli.py), e pode ser
+importado diretamente para automação, testes ou medições de desempenho.
+
+API pública:
+
+Varredura
+    Scanner                 -- varredura com os.scandir: lista pastas
+                               (listdir/scan), percorre árvores (walk),
+                               consulta itens (stat) e conta itens
+                               (count_items); com ignore, poda os itens
+                               ignorados (folder_content_ignore); open e
+                               file_key servem a exportação e podem ser
+                               sobrescritos por scanners não locais
+                               (folder_content_archive.ArchiveScanner)
+    VirtualScanner          -- base dos scanners não locais, que servem uma
+                               árvore mantida na memória
+    StatCache               -- cache de listagens e metadados, compartilhável
+                               entre vários Scanner
+    SizeTotals              -- arquivos e bytes exportados de cada pasta e
+                               subárvore, somados durante count_items
+    Listing                 -- listagem compacta de uma pasta (arrays),
+                               usada como sequência de Entry
+    Entry                   -- item retornado pelo Scanner (nome, caminho,
+                               tipo, tamanho e mtime)
+    format_size(bytes)      -- tamanho legível ("1.5 MB")
+    get_file_icon(nome)     -- ícone do arquivo conforme a extensão
+    skip_reason(caminho)    -- motivo para um arquivo ficar fora da
+                               documentação (extensão binária ou tamanho),
+                               sem ler o conteúdo
+
+Seleção
+    SelectionModel          -- seleção hierárquica (marcar uma pasta custa
+                               O(profundidade)); estados UNSELECTED,
+                               PARTIAL e SELECTED; selection_rules()
+                               devolve a seleção como regras de inclusão
+                               e exclusão para a exportação; add_child e
+                               remove acompanham itens criados e apagados
+                               sem perder a seleção
+
+Exportação
+    iter_documentation(...) -- gera a documentação em blocos de texto
+                               (e RawFile, para arquivos grandes)
+    write_documentation(...) -- grava a documentação em disco
+    write_chunks(saída, ...) -- grava os blocos de iter_documentation
+    open_output(caminho)    -- abre a saída (comprimida em uma thread
+                               própria para .gz, .xz e .bz2)
+    iter_export_plan(...)   -- pastas e arquivos exportados, a partir dos
+                               caminhos incluídos (pastas entram inteiras)
+                               menos os excluídos
+    ContentCache            -- cache LRU das seções renderizadas, chaveado
+                               por (caminho, mtime, tamanho)
+    SkippedFile             -- arquivo ignorado na exportação (binário ou
+                               maior que o limite); aparece como
+                               "[Arquivo ignorado: motivo]"
+    InvalidUtf8             -- arquivo que deixa de ser UTF-8 válido; o
+                               trecho válido é mantido, seguido de
+                               "[Erro ao ler arquivo: ...]"
+
+Funções de longa duração aceitam um objeto task opcional com os métodos
+check() (interrompe a tarefa, se cancelada) e progress(*args).
+
+Exemplo:
+    from folder_content_core import write_documentation
+    write_documentation('saida.md', '/projetos/app', {'/projetos/app/src'})
+"""
+import codecs
+import datetime
+import errno
+import io
+import mmap
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from stat import S_ISDIR
+
+# Tamanho (em caracteres) dos blocos lidos de cada arquivo durante a exportação
+CHUNK_SIZE = 64 * 1024
+
+# Leitura antecipada: quantas threads leem arquivos em paralelo durante a
+# exportação (1 desativa o paralelismo) e quantos caracteres de cada arquivo
+# são carregados adiantados
+DEFAULT_READ_WORKERS = 8
+PREFETCH_SIZE = 4 * CHUNK_SIZE
+
+# Limite padrão (em caracteres) do cache de seções renderizadas
+DEFAULT_CACHE_CHARS = 64 * 1024 * 1024
+
+# Arquivos maiores que isso (em bytes) ficam fora da documentação (None desativa)
+DEFAULT_MAX_FILE_SIZE = 1024 * 1024
+
+# Quantos bytes do início de cada arquivo são verificados em busca de bytes
+# nulos (indício de arquivo binário)
+SNIFF_SIZE = 8 * 1024
+
+# Arquivos a partir deste tamanho (em bytes) são copiados para a saída sem
+# decodificação (veja RawFile); None desativa
+DEFAULT_RAW_COPY_SIZE = 4 * 1024 * 1024
+# Janela do mmap na cópia desses arquivos (múltiplo de mmap.ALLOCATIONGRANULARITY)
+RAW_CHUNK_SIZE = 1024 * 1024
+
+# Saídas comprimidas conforme a extensão do arquivo, com o nível padrão de cada formato
+COMPRESSION_EXTENSIONS = {'.gz': 'gzip', '.xz': 'xz', '.bz2': 'bz2'}
+DEFAULT_COMPRESS_LEVELS = {'gzip': 6, 'xz': 6, 'bz2': 9}
+
+# Blocos aguardando a thread de compressão (limita a memória usada)
+COMPRESS_QUEUE_SIZE = 16
+
+# Ícones exibidos na árvore conforme a extensão do arquivo
+FILE_ICONS = {
+    '.py': '🐍', '.js': '🟨', '.html': '🌐', '.css': '🎨',
+    '.md': '📝', '.txt': '📄', '.json': '📋', '.xml': '📄',
+    '.jpg': '🖼️', '.png': '🖼️', '.gif': '🖼️', '.svg': '🖼️',
+    '.pdf': '📕', '.doc': '📘', '.docx': '📘',
+    '.zip': '📦', '.rar': '📦', '.7z': '📦',
+    '.exe': '⚙️', '.bat': '⚙️', '.sh': '⚙️'
+}
+
+# Extensões de arquivos binários, que não são lidos na exportação: as de
+# FILE_ICONS que não são texto e outros formatos comuns
+BINARY_EXTENSIONS = frozenset({
+    # Imagens
+    '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.ico', '.webp', '.tif', '.tiff', '.psd',
+    # Documentos
+    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.odt', '.ods', '.odp',
+    # Compactados
+    '.zip', '.rar', '.7z', '.gz', '.tgz', '.bz2', '.xz', '.tar', '.jar', '.war', '.whl', '.egg',
+    # Executáveis e objetos compilados
+    '.exe', '.dll', '.so', '.dylib', '.msi', '.bin', '.o', '.a', '.lib', '.obj',
+    '.class', '.pyc', '.pyo', '.pyd',
+    # Áudio, vídeo e fontes
+    '.mp3', '.wav', '.ogg', '.flac', '.mp4', '.avi', '.mov', '.mkv', '.webm',
+    '.ttf', '.otf', '.woff', '.woff2', '.eot',
+    # Bancos de dados e imagens de disco
+    '.db', '.sqlite', '.sqlite3', '.iso', '.img', '.dmg',
+})
+
+
+# ---------------------------------------------------------------------------
+# Varredura
+# ---------------------------------------------------------------------------
+
+def format_size(size):
+    """Formata um tamanho em bytes (B, KB, MB, GB)"""
+    if size < 1024:
+        return f"{size} B"
+    elif size < 1024 * 1024:
+        return f"{size / 1024:.1f} KB"
+    elif size < 1024 * 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f} MB"
+    else:
+        return f"{size / (1024 * 1024 * 1024):.1f} GB"
+
+
+def get_file_icon(filename):
+    """Retorna um ícone baseado na extensão do arquivo"""
+    ext = os.path.splitext(filename)[1].lower()
+    return FILE_ICONS.get(ext, '📄')
+
+
+def skip_reason(file_path, size=None, max_size=DEFAULT_MAX_FILE_SIZE):
+    """Motivo para um arquivo ficar fora da documentação, ou None.
+
+    Considera só a extensão e o tamanho (se informado); o conteúdo não é lido.
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in BINARY_EXTENSIONS:
+        return f"arquivo binário ({ext})"
+    if max_size and size is not None and size > max_size:
+        return f"muito grande ({format_size(size)})"
+    return None
+
+
+class Entry:
+    """Item de uma pasta listado pelo Scanner.
+
+    size e mtime podem ser None enquanto o arquivo ainda não foi
+    consultado com stat (ver Scanner.listdir).
+    """
+
+    __slots__ = ('name', 'path', 'is_dir', 'size', 'mtime')
+
+    def __init__(self, name, path, is_dir, size=None, mtime=None):
+        self.name = name
+        self.path = path
+        self.is_dir = is_dir
+        self.size = size
+        self.mtime = mtime
+
+    def __repr__(self):
+        kind = "pasta" if self.is_dir else "arquivo"
+        return f"Entry({self.path!r}, {kind})"
+
+
+class Listing:
+    """Listagem compacta de uma pasta (pastas primeiro, depois arquivos, em ordem alfabética).
+
+    Nomes, tipos, tamanhos e mtimes ficam em arrays, em vez de um Entry
+    por item; a listagem se comporta como uma sequência somente leitura
+    de Entry, criados sob demanda (fatias incluídas, como as páginas da
+    árvore). view(posições) cria uma listagem filtrada que compartilha os
+    arrays com a original, de modo que os stats preenchidos nela valem
+    para ambas. Tamanho -1 indica arquivo ainda não consultado com stat.
+    """
+
+    __slots__ = ('path', 'prefix', 'names', 'is_dir', 'sizes', 'mtimes', 'order', '_positions')
+
+    def __init__(self, path, names, is_dir, sizes=None, mtimes=None, order=None):
+        self.path = path
+        self.prefix = path if path.endswith(os.sep) else path + os.sep
+        self.names = names          # [str]
+        self.is_dir = is_dir        # bytearray (1 = pasta)
+        self.sizes = sizes if sizes is not None else array('q', [-1]) * len(names)
+        self.mtimes = mtimes if mtimes is not None else array('d', [0.0]) * len(names)
+        self.order = order          # posições visíveis nos arrays (None = todas)
+        self._positions = None
+
+    def __len__(self):
+        return len(self.names) if self.order is None else len(self.order)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._entry(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return self._entry(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._entry(i)
+
+    def _entry(self, index):
+        i = index if self.order is None else self.order[index]
+        name = self.names[i]
+        size = self.sizes[i]
+        if size < 0:
+            return Entry(name, self.prefix + name, bool(self.is_dir[i]))
+        return Entry(name, self.prefix + name, bool(self.is_dir[i]), size, self.mtimes[i])
+
+    def names_and_types(self):
+        """Gera (nome, é pasta) de cada item, sem criar Entry"""
+        if self.order is None:
+            return zip(self.names, map(bool, self.is_dir))
+        return ((self.names[i], bool(self.is_dir[i])) for i in self.order)
+
+    def _position(self, name):
+        """Posição (nos arrays) do item com esse nome, ou None"""
+        if self._positions is None:
+            positions = {name: i for i, name in enumerate(self.names)}
+            if self.order is not None:
+                visible = set(self.order)
+                positions = {name: i for name, i in positions.items() if i in visible}
+            self._positions = positions
+        return self._positions.get(name)
+
+    def find(self, name):
+        """Entry do item com esse nome ou None (o índice por nome é criado na primeira busca)"""
+        i = self._position(name)
+        if i is None:
+            return None
+        size = self.sizes[i]
+        if size < 0:
+            return Entry(name, self.prefix + name, bool(self.is_dir[i]))
+        return Entry(name, self.prefix + name, bool(self.is_dir[i]), size, self.mtimes[i])
+
+    def index(self, name):
+        """Posição do item com esse nome na listagem (como em listing[i]), ou -1"""
+        i = self._position(name)
+        if i is None:
+            return -1
+        if self.order is None:
+            return i
+        # As posições de uma view estão em ordem crescente
+        return bisect_left(self.order, i)
+
+    def view(self, positions):
+        """Listagem com só os itens nas posições informadas (relativas a esta listagem)"""
+        if self.order is not None:
+            positions = [self.order[i] for i in positions]
+        return Listing(self.path, self.names, self.is_dir, self.sizes, self.mtimes, array('l', positions))
+
+    def missing_stats(self, start=0, stop=None):
+        """Posições (nos arrays) dos arquivos entre start e stop ainda sem stat"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        indices = range(start, stop) if self.order is None else self.order[start:stop]
+        sizes, is_dir = self.sizes, self.is_dir
+        return [i for i in indices if sizes[i] < 0 and not is_dir[i]]
+
+
+# No Windows, DirEntry.stat() não faz chamada de sistema (os dados vêm da
+# própria listagem); nos demais sistemas o stat é adiado até ser necessário
+_SCANDIR_STAT_IS_FREE = os.name == 'nt'
+
+
+class StatCache:
+    """Cache em memória de listagens de pastas e metadados de itens.
+
+    Compartilhado pela árvore, pela contagem de itens e pela exportação,
+    para que cada pasta seja listada uma única vez. Uma listagem só é
+    reaproveitada enquanto o mtime da pasta não mudar.
+    """
+
+    def __init__(self):
+        self.listings = {}  # pasta -> (mtime da pasta, Listing)
+        self.entries = {}   # caminho -> Entry (itens consultados fora de uma listagem)
+
+    def clear(self):
+        self.listings.clear()
+        self.entries.clear()
+
+
+class Scanner:
+    """Varredura do sistema de arquivos baseada em os.scandir.
+
+    Reaproveita o tipo (e, quando disponível, o stat) que os DirEntry já
+    trazem, evitando uma chamada isdir/getsize por item. Com um índice
+    persistente (folder_content_index.ScanIndex), listagens de pastas
+    inalteradas desde a última execução são lidas do índice.
+
+    Com ignore (folder_content_ignore.IgnoreMatcher), listdir e walk
+    omitem os itens ignorados e walk não desce nas pastas ignoradas; scan
+    continua devolvendo a listagem completa (é ela que vai para os caches).
+    Com name_index (folder_content_search.NameIndex), cada pasta listada
+    por listdir tem seus nomes registrados para a busca.
+    As listagens são guardadas como Listing (arrays), sem um objeto por item.
+
+    A exportação lê os arquivos com open e consulta versões com file_key;
+    subclasses com local falso (como folder_content_archive.ArchiveScanner)
+    servem itens que não existem no disco e sobrescrevem esses métodos.
+    """
+
+    # Os caminhos são arquivos do disco (permitem os.stat, mmap etc.)
+    local = True
+
+    # A exportação pode ler vários arquivos ao mesmo tempo (leitura antecipada
+    # em threads); falso quando as leituras são serializadas de qualquer forma
+    parallel_reads = True
+
+    # Pastas modificadas há menos que isso (em segundos) podem mudar de novo
+    # sem alterar o mtime; suas listagens não são consideradas confiáveis
+    RACY_WINDOW = 2.0
+
+    def __init__(self, cache=None, index=None, ignore=None, name_index=None):
+        self.cache = cache if cache is not None else StatCache()
+        self.index = index
+        self.ignore = ignore
+        self.name_index = name_index
+
+    def clear(self):
+        """Descarta tudo o que foi varrido até agora (o índice persistente é mantido)"""
+        self.cache.clear()
+
+    def scan(self, path):
+        """Lista uma pasta (pastas primeiro, depois arquivos, em ordem alfabética).
+
+        Retorna a Listing completa (sem aplicar o ignore); os arquivos
+        podem vir sem size/mtime, use listdir ou fill_stats quando eles
+        forem necessários. Erros de acesso são propagados para quem chamou.
+        """
+        dir_mtime = os.stat(path).st_mtime
+        cached = self.cache.listings.get(path)
+        if cached is not None and cached[0] == dir_mtime:
+            return cached[1]
+
+        previous = cached[1] if cached is not None else None
+        if self.index is not None:
+            stored = self.index.load_listing(path)
+            if stored is not None:
+                if stored[0] == dir_mtime:
+                    # O índice devolve os itens já ordenados
+                    listing = stored[1]
+                    self.cache.listings[path] = (dir_mtime, listing)
+                    return listing
+                previous = previous or stored[1]
+
+        items = []
+        with os.scandir(path) as it:
+            for dir_entry in it:
+                try:
+                    is_dir = dir_entry.is_dir()
+                except OSError:
+                    is_dir = False
+                size, mtime = -1, 0.0
+                if _SCANDIR_STAT_IS_FREE and not is_dir:
+                    try:
+                        st = dir_entry.stat()
+                        size, mtime = st.st_size, st.st_mtime
+                    except OSError:
+                        size = 0
+                items.append((not is_dir, dir_entry.name.lower(), dir_entry.name, size, mtime))
+
+        items.sort()
+        listing = Listing(
+            path,
+            [item[2] for item in items],
+            bytearray(not item[0] for item in items),
+            array('q', [item[3] for item in items]),
+            array('d', [item[4] for item in items]),
+        )
+        trusted = time.time() - dir_mtime > self.RACY_WINDOW
+        self.cache.listings[path] = (dir_mtime if trusted else None, listing)
+
+        if self.index is not None:
+            if trusted:
+                self.index.store_listing(path, dir_mtime, listing)
+            if previous:
+                # Subpastas que deixaram de existir saem do índice
+                current = {name for name, is_dir in listing.names_and_types() if is_dir}
+                for name, is_dir in previous.names_and_types():
+                    if is_dir and name not in current:
+                        self.index.forget(previous.prefix + name)
+
+        return listing
+
+    def listdir(self, path, stats=True):
+        """Lista uma pasta sem os itens ignorados.
+
+        Retorna uma Listing; com stats=True, o tamanho e o mtime de todos os
+        arquivos são preenchidos (com stats=False, use fill_stats só nos
+        itens exibidos, como faz a árvore ao paginar pastas enormes).
+        """
+        listing = self.scan(path)
+        if self.ignore is not None:
+            listing = self.ignore.filter(path, listing)
+        if self.name_index is not None:
+            self.name_index.add(path, listing)
+        if stats:
+            self.fill_stats(listing)
+        return listing
+
+    def fill_stats(self, listing, start=0, stop=None):
+        """Preenche tamanho e mtime dos arquivos de listing[start:stop] ainda sem stat.
+
+        Quando a listagem fica completa, ela é regravada no índice.
+        """
+        missing = listing.missing_stats(start, stop)
+        if not missing:
+            return
+        names, prefix = listing.names, listing.prefix
+        for i in missing:
+            try:
+                st = os.stat(prefix + names[i])
+            except OSError:
+                listing.sizes[i], listing.mtimes[i] = 0, 0.0
+            else:
+                listing.sizes[i], listing.mtimes[i] = st.st_size, st.st_mtime
+
+        if self.index is not None:
+            cached = self.cache.listings.get(listing.path)
+            if cached is not None and cached[0] is not None and not cached[1].missing_stats():
+                self.index.store_listing(listing.path, cached[0], cached[1])
+
+    def stat(self, path):
+        """Retorna o Entry de um caminho (com size/mtime) ou None se ele não existir"""
+        entry = self.cache.entries.get(path)
+        if entry is None:
+            cached = self.cache.listings.get(os.path.dirname(path))
+            if cached is not None:
+                entry = cached[1].find(os.path.basename(path))
+        if entry is not None and (entry.is_dir or entry.size is not None):
+            return entry
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        is_dir = S_ISDIR(st.st_mode)
+        entry = Entry(os.path.basename(path) or path, path, is_dir, st.st_size, st.st_mtime)
+        self.cache.entries[path] = entry
+        return entry
+
+    def open(self, path):
+        """Abre um arquivo em modo binário; retorna (arquivo, tamanho)"""
+        return open_disk_file(path)
+
+    def file_key(self, path):
+        """(mtime, tamanho) atuais de um arquivo, sem passar pelos caches; levanta OSError"""
+        st = os.stat(path)
+        return st.st_mtime, st.st_size
+
+    def restat(self, path):
+        """Consulta de novo um arquivo alterado no lugar (o mtime da pasta não muda nesse caso).
+
+        Atualiza tamanho e mtime na listagem em cache da pasta e retorna o
+        Entry atual, ou None se o arquivo não existir mais.
+        """
+        self.cache.entries.pop(path, None)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        name = os.path.basename(path)
+        cached = self.cache.listings.get(os.path.dirname(path))
+        if cached is not None:
+            i = cached[1]._position(name)
+            if i is not None:
+                cached[1].sizes[i], cached[1].mtimes[i] = st.st_size, st.st_mtime
+        return Entry(name, path, S_ISDIR(st.st_mode), st.st_size, st.st_mtime)
+
+    def walk(self, top, onerror=None):
+        """Percorre uma árvore como os.walk, gerando (pasta, [Entry de pastas], [Entry de arquivos]).
+
+        A lista de pastas pode ser alterada no lugar para podar a descida.
+        Pastas que não podem ser listadas são ignoradas (ou repassadas a onerror),
+        assim como os itens descartados pelo ignore do Scanner.
+        """
+        stack = [top]
+        while stack:
+            path = stack.pop()
+            try:
+                listing = self.listdir(path, stats=False)
+            except OSError as e:
+                if onerror is not None:
+                    onerror(e)
+                continue
+
+            dirs = []
+            files = []
+            for entry in listing:
+                (dirs if entry.is_dir else files).append(entry)
+            yield path, dirs, files
+
+            stack.extend(entry.path for entry in reversed(dirs))
+
+    def count_items(self, folder, task=None, totals=None):
+        """Conta (pastas, arquivos) de uma árvore; task.progress recebe as parciais.
+
+        Com totals (SizeTotals), os tamanhos dos arquivos também são
+        consultados e somados por pasta.
+        """
+        total_files = 0
+        total_dirs = 0
+        stack = [folder]
+        while stack:
+            path = stack.pop()
+            if task:
+                task.check()
+            try:
+                listing = self.listdir(path, stats=totals is not None)
+            except OSError:
+                continue
+            if totals is not None:
+                totals.add(path, listing)
+
+            subdirs = [listing.prefix + name for name, is_dir in listing.names_and_types() if is_dir]
+            total_dirs += len(subdirs)
+            total_files += len(listing) - len(subdirs)
+            stack.extend(subdirs)
+            if task:
+                task.progress(total_dirs, total_files)
+        return total_dirs, total_files
+
+
+class VirtualScanner(Scanner):
+    """Base dos scanners que servem uma árvore mantida na memória (local falso).
+
+    root é o caminho usado como pasta do projeto e os membros ficam abaixo
+    dele; as subclasses registram os membros com _add (pastas ausentes,
+    mas implícitas nos caminhos, são criadas) e implementam open. scan,
+    stat e file_key respondem a partir da árvore, sem chamadas ao sistema
+    de arquivos. close (ou with) libera os recursos da subclasse.
+    """
+
+    local = False
+
+    def __init__(self, root, cache=None, ignore=None, name_index=None):
+        super().__init__(cache, None, ignore, name_index)
+        self.root = root
+        self._dirs = {'': {}}  # pasta -> {nome: é pasta}
+        self._files = {}       # membro -> (tamanho, mtime, localizador)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        pass
+
+    def _add(self, name, is_dir, size=0, mtime=0.0, locator=None):
+        """Registra um membro ('a/b.py') e as pastas acima dele; locator é repassado a open"""
+        parent, _, base = name.rpartition('/')
+        if is_dir:
+            self._dirs.setdefault(name, {})
+        else:
+            if name in self._dirs:
+                return
+            self._files[name] = (size, mtime, locator)
+        while True:
+            children = self._dirs.get(parent)
+            if children is None:
+                children = self._dirs[parent] = {}
+                children[base] = is_dir
+                name, is_dir = parent, True
+                parent, _, base = name.rpartition('/')
+                continue
+            children[base] = is_dir or children.get(base, False)
+            return
+
+
+    def _relative(self, path):
+        """Caminho do membro ('' para a raiz) correspondente a path, ou None"""
+        if path == self.root:
+            return ''
+        prefix = self.root + os.sep
+        if path.startswith(prefix):
+            return path[len(prefix):].replace(os.sep, '/')
+        return None
+
+    def scan(self, path):
+        """Listagem de uma pasta da árvore virtual (já com tamanhos e mtimes)"""
+        cached = self.cache.listings.get(path)
+        if cached is not None:
+            return cached[1]
+        name = self._relative(path)
+        children = self._dirs.get(name) if name is not None else None
+        if children is None:
+            code = errno.ENOTDIR if name in self._files else errno.ENOENT
+            raise OSError(code, os.strerror(code), path)
+
+        prefix = name + '/' if name else ''
+        items = sorted((not is_dir, child.lower(), child) for child, is_dir in children.items())
+        sizes = []
+        mtimes = []
+        for is_file, _, child in items:
+            if is_file:
+                size, mtime, _ = self._files[prefix + child]
+                sizes.append(size)
+                mtimes.append(mtime)
+            else:
+                sizes.append(-1)
+                mtimes.append(0.0)
+        listing = Listing(
+            path,
+            [item[2] for item in items],
+            bytearray(not item[0] for item in items),
+            array('q', sizes),
+            array('d', mtimes),
+        )
+        self.cache.listings[path] = (None, listing)
+        return listing
+
+    def stat(self, path):
+        """Entry de um caminho da árvore virtual, ou None se ele não existir"""
+        name = self._relative(path)
+        if name is None:
+            return None
+        base = os.path.basename(path) or path
+        if name in self._dirs:
+            return Entry(base, path, True)
+        member = self._files.get(name)
+        if member is None:
+            return None
+        return Entry(base, path, False, member[0], member[1])
+
+    def file_key(self, path):
+        name = self._relative(path)
+        member = self._files.get(name) if name is not None else None
+        if member is None:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+        return member[1], member[0]
+
+
+class SizeTotals:
+    """Quantidade de arquivos e bytes de cada pasta e de sua subárvore.
+
+    Alimentado com as listagens (já com stats) de Scanner.count_items. Os
+    bytes são só os que a exportação traz: arquivos binários ou acima de
+    max_size (ver skip_reason) contam como arquivos, mas não somam bytes.
+    Cada pasta guarda os totais dos seus arquivos diretos e os da subárvore;
+    registrar (ou registrar de novo) uma pasta soma só a diferença a ela e
+    aos ancestrais, em O(profundidade), e subpastas que sumiram da
+    listagem têm sua subárvore descontada. Assim o peso de qualquer pasta
+    é consultado em O(1), sem percorrer nem ler arquivos.
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_FILE_SIZE):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._dirs = {}  # pasta -> [arquivos diretos, bytes diretos, arquivos da subárvore, bytes da subárvore, subpastas]
+
+    def __len__(self):
+        return len(self._dirs)
+
+    def add(self, dir_path, listing):
+        """Registra os arquivos diretos de uma pasta listada (com stats)"""
+        files = size = 0
+        subdirs = []
+        for entry in listing:
+            if entry.is_dir:
+                subdirs.append(entry.path)
+            else:
+                files += 1
+                if not skip_reason(entry.path, entry.size, self.max_size):
+                    size += entry.size or 0
+        with self._lock:
+            node = self._dirs.get(dir_path)
+            if node is None:
+                node = self._dirs[dir_path] = [0, 0, 0, 0, ()]
+            else:
+                for path in set(node[4]).difference(subdirs):
+                    self._forget(path)
+            delta_files, delta_size = files - node[0], size - node[1]
+            node[0], node[1], node[4] = files, size, tuple(subdirs)
+            self._propagate(dir_path, delta_files, delta_size)
+
+    def _propagate(self, path, delta_files, delta_size):
+        while delta_files or delta_size:
+            node = self._dirs.get(path)
+            if node is None:
+                return
+            node[2] += delta_files
+            node[3] += delta_size
+            parent = os.path.dirname(path)
+            if parent == path:
+                return
+            path = parent
+
+    def _forget(self, dir_path):
+        """Remove uma pasta e sua subárvore, descontando-as dos ancestrais"""
+        node = self._dirs.get(dir_path)
+        if node is None:
+            return
+        self._propagate(dir_path, -node[2], -node[3])
+        stack = [dir_path]
+        while stack:
+            node = self._dirs.pop(stack.pop(), None)
+            if node is not None:
+                stack.extend(node[4])
+
+    def clear(self):
+        with self._lock:
+            self._dirs.clear()
+
+    def folder(self, dir_path):
+        """(arquivos, bytes) da subárvore de uma pasta já registrada, ou None"""
+        node = self._dirs.get(dir_path)
+        if node is None:
+            return None
+        return node[2], node[3]
+
+    def selection(self, included, excluded, scanner):
+        """(arquivos, bytes, completo) das regras de seleção (SelectionModel.selection_rules).
+
+        Como cada exclusão fica dentro de uma inclusão (e vice-versa), o
+        total é a soma das inclusões menos a das exclusões. Arquivos são
+        consultados em scanner.stat (que usa as listagens em cache);
+        completo é falso se alguma pasta ainda não foi somada.
+        """
+        files = size = 0
+        complete = True
+        for paths, sign in ((included, 1), (excluded, -1)):
+            for path in paths:
+                totals = self.folder(path)
+                if totals is None:
+                    entry = scanner.stat(path)
+                    if entry is None:
+                        continue
+                    if entry.is_dir:
+                        complete = False
+                        continue
+                    skipped = skip_reason(entry.path, entry.size, self.max_size)
+                    totals = 1, 0 if skipped else entry.size or 0
+                files += sign * totals[0]
+                size += sign * totals[1]
+        return files, size, complete
+
+
+# ---------------------------------------------------------------------------
+# Seleção
+# ---------------------------------------------------------------------------
+
+# Estados de seleção de um nó
+UNSELECTED = 0
+PARTIAL = 1
+SELECTED = 2
+
+
+class _SelectionNode:
+    """Dados de um nó do SelectionModel.
+
+    state, n_selected, n_partial e n_marked só valem se o nó não estiver
+    defasado, isto é, se nenhum ancestral tiver um mark mais recente que
+    stamp; nesse caso o estado real é o valor desse mark.
+    """
+
+    __slots__ = ('parent', 'n_children', 'touched', 'state', 'stamp', 'mark', 'mark_stamp',
+                 'n_selected', 'n_partial', 'loaded', 'n_marked')
+
+    def __init__(self, parent, state, stamp):
+        self.parent = parent
+        self.n_children = 0     # filhos carregados
+        self.touched = []       # filhos que já têm nó próprio (os demais seguem o mark)
+        self.state = state
+        self.stamp = stamp
+        self.mark = None        # estado imposto aos descendentes (marcação da subárvore inteira)
+        self.mark_stamp = 0
+        self.n_selected = 0     # filhos com a subárvore toda marcada
+        self.n_partial = 0      # filhos parcialmente marcados
+        self.loaded = 1         # nós carregados na subárvore (incluindo este)
+        self.n_marked = 1 if state == SELECTED else 0  # nós carregados marcados na subárvore
+
+
+class SelectionModel:
+    """Seleção hierárquica de pastas e arquivos, independente da interface.
+
+    Conhece apenas os nós já carregados (registrados com add_root e
+    set_children). Marcar uma pasta marca toda a sua subárvore; uma pasta
+    fica marcada quando todos os seus filhos conhecidos estão e parcial
+    quando só alguns estão.
+
+    Marcar ou desmarcar custa O(profundidade): a pasta recebe um mark
+    (válido para todos os descendentes, que não são visitados) e os
+    ancestrais atualizam suas contagens de filhos marcados/parciais. Os
+    filhos de uma pasta só ganham um nó próprio quando são alterados;
+    até lá seguem o mark da pasta, de modo que registrar uma pasta com
+    100 mil filhos custa O(1). O pai de um caminho é dado por parent_of
+    (os.path.dirname). Os métodos que alteram a seleção retornam os
+    caminhos do nó e dos ancestrais cujo estado mudou; os descendentes
+    devem ser consultados com state() quando forem exibidos.
+    """
+
+    def __init__(self, parent_of=os.path.dirname):
+        self.nodes = {}  # caminho -> _SelectionNode (raízes, pastas carregadas e itens alterados)
+        self.roots = []
+        self.parent_of = parent_of
+        self._tick = 0
+
+    def clear(self):
+        """Remove todos os nós e a seleção"""
+        self.nodes.clear()
+        self.roots.clear()
+
+    def add_root(self, path):
+        """Registra um nó raiz"""
+        if path not in self.nodes:
+            self.nodes[path] = _SelectionNode(None, UNSELECTED, self._tick)
+            self.roots.append(path)
+
+    def set_children(self, path, count):
+        """Registra que a pasta path tem count filhos carregados.
+
+        Os filhos (caminhos cujo parent_of é path) entram com o estado da
+        pasta: marcados se ela estiver marcada.
+        """
+        node = self._materialize(path)
+        if node.n_children:
+            # Recarga: a pasta volta a um estado uniforme e perde os filhos antigos
+            self.set_selected(path, node.state == SELECTED)
+            stack = list(node.touched)
+            while stack:
+                stack.extend(self.nodes.pop(stack.pop()).touched)
+            self._add_counts(node, 1 - node.loaded, (1 if node.state == SELECTED else 0) - node.n_marked)
+            node.n_children = node.n_selected = node.n_partial = 0
+            node.touched = []
+
+        if not count:
+            return
+        self._tick += 1
+        node.n_children = count
+        node.mark, node.mark_stamp = node.state, self._tick
+        node.stamp = self._tick
+        if node.state == SELECTED:
+            node.n_selected = count
+        self._add_counts(node, count, count if node.state == SELECTED else 0)
+
+    def state(self, path):
+        """Estado de um nó: UNSELECTED, PARTIAL ou SELECTED (O(profundidade))"""
+        node = self.nodes.get(path)
+        if node is not None:
+            mark, mark_stamp = None, node.stamp
+            parent = node.parent
+        else:
+            # Filho ainda sem nó próprio: segue o mark mais recente dos ancestrais
+            parent = self.parent_of(path)
+            owner = self.nodes.get(parent)
+            if owner is None or not owner.n_children:
+                return UNSELECTED
+            mark, mark_stamp = None, 0
+        while parent is not None:
+            ancestor = self.nodes[parent]
+            if ancestor.mark is not None and ancestor.mark_stamp > mark_stamp:
+                mark, mark_stamp = ancestor.mark, ancestor.mark_stamp
+            parent = ancestor.parent
+        return node.state if mark is None else mark
+
+    def is_selected(self, path):
+        return self.state(path) == SELECTED
+
+    def count(self):
+        """Quantidade de nós carregados marcados"""
+        return sum(self.nodes[root].n_marked for root in self.roots)
+
+    def selection_rules(self):
+        """Seleção como regras: (caminhos incluídos, caminhos excluídos).
+
+        Uma pasta incluída entra inteira (inclusive itens ainda não
+        carregados), exceto os caminhos excluídos abaixo dela; dentro de um
+        excluído pode haver novas inclusões. Pastas parciais viram "pasta
+        menos exclusões" ou "inclusões individuais", conforme o estado dos
+        filhos não alterados, de modo que a seleção fica compacta sem
+        expandir a árvore nem percorrer os filhos não alterados.
+        """
+        included, excluded = set(), set()
+        stack = [(root, None, 0, False) for root in self.roots]
+        while stack:
+            path, mark, mark_stamp, inside = stack.pop()
+            node = self.nodes[path]
+            state = mark if mark is not None and mark_stamp > node.stamp else node.state
+            if state == SELECTED:
+                if not inside:
+                    included.add(path)
+            elif state == UNSELECTED:
+                if inside:
+                    excluded.add(path)
+            else:
+                if node.mark is not None and node.mark_stamp > mark_stamp:
+                    mark, mark_stamp = node.mark, node.mark_stamp
+                if node.n_children > len(node.touched):
+                    include_folder = mark == SELECTED
+                else:
+                    unselected = node.n_children - node.n_selected - node.n_partial
+                    include_folder = node.n_selected > unselected
+                if include_folder and not inside:
+                    included.add(path)
+                elif inside and not include_folder:
+                    excluded.add(path)
+                stack.extend((child, mark, mark_stamp, include_folder) for child in node.touched)
+        return included, excluded
+
+    def toggle(self, path):
+        """Alterna a seleção de um nó (nós parciais passam a marcados)"""
+        return self.set_selected(path, self.state(path) != SELECTED)
+
+    def set_selected(self, path, select):
+        """Marca/desmarca um nó e toda a sua subárvore e ajusta os pais"""
+        node = self._materialize(path)
+        self._tick += 1
+        new_state = SELECTED if select else UNSELECTED
+        old_state, old_marked = node.state, node.n_marked
+
+        node.state = new_state
+        node.stamp = self._tick
+        if node.n_children:
+            node.mark, node.mark_stamp = new_state, self._tick
+            node.n_selected = node.n_children if select else 0
+            node.n_partial = 0
+        node.n_marked = node.loaded if select else 0
+
+        changed = [path] if old_state != new_state else []
+        changed.extend(self._propagate(node.parent, old_state, new_state, node.n_marked - old_marked))
+        return changed
+
+    def add_child(self, path):
+        """Registra um item novo em uma pasta carregada (ex.: criado no disco).
+
+        O item entra com o estado que os filhos não alterados da pasta têm
+        (marcado se ela foi marcada inteira), sem alterar a seleção dos
+        demais. Retorna os caminhos cujo estado mudou.
+        """
+        parent = self.parent_of(path)
+        owner = self.nodes.get(parent)
+        if owner is None or not owner.n_children or path in self.nodes:
+            return []
+        folder = self._materialize(parent)
+        state = self.state(path)
+        self._tick += 1
+        folder.n_children += 1
+        folder.n_selected += state == SELECTED
+        self._add_counts(folder, 1, 0)
+        return self._update_folder(parent, folder, 1 if state == SELECTED else 0)
+
+    def remove(self, path):
+        """Descarta um item (e sua subárvore) que deixou de existir; retorna os caminhos cujo estado mudou"""
+        parent = self.parent_of(path)
+        owner = self.nodes.get(parent)
+        if owner is None or not owner.n_children:
+            return []
+        folder = self._materialize(parent)
+        if path in self.nodes:
+            node = self._materialize(path)
+            state, loaded, marked = node.state, node.loaded, node.n_marked
+            stack = [path]
+            while stack:
+                stack.extend(self.nodes.pop(stack.pop()).touched)
+            folder.touched.remove(path)
+        else:
+            state = self.state(path)
+            loaded, marked = 1, 1 if state == SELECTED else 0
+        self._tick += 1
+        folder.n_children -= 1
+        folder.n_selected -= state == SELECTED
+        folder.n_partial -= state == PARTIAL
+        self._add_counts(folder, -loaded, 0)
+        return self._update_folder(parent, folder, -marked)
+
+    def covers(self, path):
+        """Indica se path entra na seleção, mesmo que ainda não tenha sido carregado.
+
+        Um item não carregado entra quando a pasta carregada mais próxima
+        acima dele está marcada (pastas marcadas entram inteiras).
+        """
+        current = path
+        while current not in self.nodes:
+            parent = self.parent_of(current)
+            owner = self.nodes.get(parent)
+            if owner is not None and owner.n_children:
+                break
+            if parent == current:
+                return False
+            current = parent
+        return self.state(current) == SELECTED
+
+    def _update_folder(self, path, folder, marked):
+        """Recalcula o estado de uma pasta cujos filhos mudaram (marked: variação de marcados) e ajusta os pais"""
+        old_state = folder.state
+        if folder.n_children:
+            if folder.n_selected == folder.n_children:
+                folder.state = SELECTED
+            elif folder.n_selected or folder.n_partial:
+                folder.state = PARTIAL
+            else:
+                folder.state = UNSELECTED
+        elif folder.state == PARTIAL:
+            # Sem filhos carregados, uma pasta não pode ficar parcial
+            folder.state = UNSELECTED
+        folder.stamp = self._tick
+        delta = marked + (folder.state == SELECTED) - (old_state == SELECTED)
+        folder.n_marked += delta
+        changed = [path] if folder.state != old_state else []
+        changed.extend(self._propagate(folder.parent, old_state, folder.state, delta))
+        return changed
+
+    def _propagate(self, parent, old_state, new_state, delta):
+        """Ajusta os ancestrais a partir de parent depois que um filho passou de old_state a
+        new_state e o total de marcados da subárvore dele variou delta; retorna os que mudaram"""
+        changed = []
+        while parent is not None and (old_state != new_state or delta):
+            ancestor = self.nodes[parent]
+            ancestor_old = ancestor.state
+            if old_state != new_state:
+                ancestor.n_selected += (new_state == SELECTED) - (old_state == SELECTED)
+                ancestor.n_partial += (new_state == PARTIAL) - (old_state == PARTIAL)
+                if ancestor.n_selected == ancestor.n_children:
+                    ancestor.state = SELECTED
+                elif ancestor.n_selected or ancestor.n_partial:
+                    ancestor.state = PARTIAL
+                else:
+                    ancestor.state = UNSELECTED
+            delta += (ancestor.state == SELECTED) - (ancestor_old == SELECTED)
+            ancestor.n_marked += delta
+            ancestor.stamp = self._tick
+
+            if ancestor.state != ancestor_old:
+                changed.append(parent)
+            old_state, new_state = ancestor_old, ancestor.state
+            parent = ancestor.parent
+        return changed
+
+    def set_all(self, select):
+        """Marca/desmarca todos os nós raiz (e, com eles, toda a árvore conhecida)"""
+        changed = []
+        for path in self.roots:
+            changed.extend(self.set_selected(path, select))
+        return changed
+
+    def _materialize(self, path):
+        """Aplica os marks pendentes dos ancestrais aos nós do caminho até path.
+
+        Um filho carregado que ainda não tem nó próprio ganha um aqui.
+        """
+        if path not in self.nodes:
+            parent = self.parent_of(path)
+            owner = self.nodes.get(parent)
+            if owner is None or not owner.n_children:
+                raise KeyError(path)
+            self.nodes[path] = _SelectionNode(parent, UNSELECTED, 0)
+            owner.touched.append(path)
+
+        chain = []
+        current = path
+        while current is not None:
+            node = self.nodes[current]
+            chain.append(node)
+            current = node.parent
+
+        mark, mark_stamp = None, 0
+        for node in reversed(chain):
+            if mark is not None and mark_stamp > node.stamp:
+                node.state = mark
+                node.stamp = mark_stamp
+                node.mark = None
+                node.n_selected = node.n_children if mark == SELECTED else 0
+                node.n_partial = 0
+                node.n_marked = node.loaded if mark == SELECTED else 0
+            elif node.mark is not None and node.mark_stamp > mark_stamp:
+                mark, mark_stamp = node.mark, node.mark_stamp
+        return chain[0]
+
+    def _add_counts(self, node, loaded, marked):
+        """Soma nós carregados/marcados a um nó e a todos os seus ancestrais"""
+        while node is not None:
+            node.loaded += loaded
+            node.n_marked += marked
+            node = self.nodes[node.parent] if node.parent is not None else None
+
+
+# ---------------------------------------------------------------------------
+# Exportação
+# ---------------------------------------------------------------------------
+
+
+class SkippedFile(Exception):
+    """Arquivo que fica fora da documentação (binário ou grande demais)"""
+
+
+class InvalidUtf8(ValueError):
+    """Byte inválido em UTF-8, com a posição contada desde o início do arquivo.
+
+    prefix traz o texto válido lido na mesma chamada, antes do byte
+    inválido (já com as quebras de linha convertidas).
+    """
+
+    def __init__(self, offset, byte, reason, prefix=''):
+        super().__init__(f"'utf-8' codec can't decode byte 0x{byte:02x} in position {offset}: {reason}")
+        self.offset = offset
+        self.prefix = prefix
+
+
+class Utf8Decoder:
+    """Decodificação incremental de UTF-8 comum à leitura em texto e à cópia em bytes.
+
+    Os dois caminhos usam a mesma verificação, de modo que um arquivo
+    inválido gera a mesma saída nos dois: o trecho até o primeiro byte
+    inválido e a mensagem de InvalidUtf8 com a posição no arquivo.
+    """
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self.offset = 0  # bytes recebidos até aqui
+
+    def pending(self):
+        """Bytes de um caractere incompleto guardados para a próxima chamada"""
+        return len(self._decoder.getstate()[0])
+
+    def decode(self, data, final=False):
+        """Decodifica o próximo trecho; retorna (texto, bytes válidos de data, InvalidUtf8 ou None).
+
+        Os bytes válidos são os do início de data que completam caracteres
+        (sem o caractere incompleto do fim, que fica para a próxima chamada);
+        com erro, são os anteriores ao byte inválido (negativo se ele
+        começou em um trecho anterior) e o texto é o válido até ali.
+        """
+        pending = self.pending()
+        start = self.offset - pending
+        self.offset += len(data)
+        try:
+            text = self._decoder.decode(data, final)
+        except UnicodeDecodeError as e:
+            error = InvalidUtf8(start + e.start, e.object[e.start], e.reason)
+            return bytes(e.object[:e.start]).decode('utf-8'), e.start - pending, error
+        return text, len(data) - self.pending(), None
+
+
+class Utf8Reader(io.TextIOBase):
+    """Leitura de um arquivo binário como texto UTF-8, com quebras de linha "\\r\\n" e "\\r" viradas "\\n".
+
+    Usado no lugar de io.TextIOWrapper para que um byte inválido seja
+    relatado com a posição no arquivo e o texto válido antes dele
+    (InvalidUtf8.prefix), como na cópia em bytes (copy_raw_file).
+    """
+
+    def __init__(self, raw):
+        super().__init__()
+        self.raw = raw
+        self._decoder = Utf8Decoder()
+        self._buffer = ''
+        self._after_cr = False
+        self._eof = False
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = -1
+        while not self._eof and (size < 0 or len(self._buffer) < size):
+            data = self.raw.read(max(size - len(self._buffer), CHUNK_SIZE) if size >= 0 else -1)
+            final = not data or size < 0
+            text, _, error = self._decoder.decode(data, final)
+            text = self._newlines(text, final or error is not None)
+            self._eof = final
+            if error is not None:
+                self._eof = True
+                error.prefix, self._buffer = self._buffer + text, ''
+                raise error
+            self._buffer += text
+        if size < 0:
+            result, self._buffer = self._buffer, ''
+        else:
+            result, self._buffer = self._buffer[:size], self._buffer[size:]
+        return result
+
+    def _newlines(self, text, final):
+        if self._after_cr:
+            text = '\r' + text
+            self._after_cr = False
+        if not final and text.endswith('\r'):
+            text = text[:-1]
+            self._after_cr = True
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+
+    def close(self):
+        if not self.closed:
+            self.raw.close()
+        super().close()
+
+
+def open_disk_file(file_path):
+    """Abre um arquivo local em modo binário; retorna (arquivo, tamanho)"""
+    raw = open(file_path, 'rb')
+    try:
+        return raw, os.fstat(raw.fileno()).st_size
+    except BaseException:
+        raw.close()
+        raise
+
+
+def open_binary_file(file_path, max_size=DEFAULT_MAX_FILE_SIZE, opener=None):
+    """Abre um arquivo de texto em modo binário, com as verificações de open_text_file.
+
+    opener(caminho) abre o arquivo e retorna (arquivo binário com peek,
+    tamanho); o padrão é open_disk_file (veja Scanner.open).
+    """
+    reason = skip_reason(file_path)
+    if reason:
+        raise SkippedFile(reason)
+
+    raw, size = (opener or open_disk_file)(file_path)
+    try:
+        if max_size:
+            reason = skip_reason(file_path, size, max_size)
+            if reason:
+                raise SkippedFile(reason)
+        if b'\0' in raw.peek(SNIFF_SIZE)[:SNIFF_SIZE]:
+            raise SkippedFile("arquivo binário")
+        return raw
+    except BaseException:
+        raw.close()
+        raise
+
+
+def open_text_file(file_path, max_size=DEFAULT_MAX_FILE_SIZE, opener=None):
+    """Abre um arquivo para leitura como texto UTF-8.
+
+    Levanta SkippedFile sem ler o conteúdo para extensões binárias e
+    arquivos maiores que max_size; nos demais, os primeiros SNIFF_SIZE
+    bytes são verificados em busca de bytes nulos. Bytes inválidos em
+    UTF-8 levantam InvalidUtf8 na leitura (veja Utf8Reader).
+    """
+    return Utf8Reader(open_binary_file(file_path, max_size, opener))
+
+
+class RawFile:
+    """Corpo de um arquivo grande, copiado em bytes para a saída.
+
+    Gerado por iter_documentation (com raw_copy_size) no lugar dos blocos
+    de texto do arquivo; write_chunks o grava com copy_raw_file, sem
+    decodificar o arquivo inteiro para str.
+    """
+
+    __slots__ = ('path', 'handle')
+
+    def __init__(self, path, handle):
+        self.path = path
+        self.handle = handle
+
+    def close(self):
+        self.handle.close()
+
+
+def open_raw_file(file_path, max_size=DEFAULT_MAX_FILE_SIZE):
+    """RawFile de um arquivo de texto, ou None se ele deve seguir pelo caminho de texto.
+
+    Levanta SkippedFile como open_text_file. Arquivos que não podem ser
+    abertos ou que começam só com espaços em branco (podendo ser
+    "[Arquivo vazio]") seguem como texto, onde recebem o tratamento habitual.
+    """
+    try:
+        handle = open_binary_file(file_path, max_size)
+    except SkippedFile:
+        raise
+    except Exception:
+        return None
+    if not handle.peek(SNIFF_SIZE)[:SNIFF_SIZE].strip():
+        handle.close()
+        return None
+    return RawFile(file_path, handle)
+
+
+def read_error_text(error, after_content):
+    """Mensagem de erro de leitura no corpo de um arquivo (em uma nova linha após o trecho já gravado)"""
+    separator = "\n" if after_content else ""
+    return f"{separator}[Erro ao ler arquivo: {error}]"
+
+
+def copy_raw_file(raw, out, chunk_size=RAW_CHUNK_SIZE):
+    """Copia o corpo de um RawFile para out (binário) e retorna os bytes gravados.
+
+    O arquivo é mapeado na memória (mmap) em janelas de chunk_size bytes,
+    gravadas por memoryview, sem cópias nem conversão para str; cada
+    janela é validada pelo mesmo Utf8Decoder da leitura em texto antes de
+    ser gravada (o caractere cortado no fim de uma janela só é gravado com
+    a seguinte). Quebras de linha "\\r\\n" e "\\r" viram "\\n", como na
+    leitura em modo texto. Se o arquivo não for UTF-8 válido, o trecho até
+    o primeiro byte inválido é gravado, seguido da mesma mensagem de erro
+    de iter_file_body.
+    """
+    written = 0
+    after_cr = False
+    error = None
+    decoder = Utf8Decoder()
+    carry = b''  # início de um caractere cortado no fim da janela anterior
+    with raw.handle as f:
+        size = os.fstat(f.fileno()).st_size
+        for start in range(0, size, chunk_size):
+            length = min(chunk_size, size - start)
+            with mmap.mmap(f.fileno(), length, offset=start, access=mmap.ACCESS_READ) as window:
+                _, valid, error = decoder.decode(window, start + length == size)
+                if valid < 0:
+                    # O byte inválido está no caractere cortado da janela anterior
+                    carry = b''
+                next_carry = window[valid:length] if error is None else b''
+                length = max(0, valid)
+                if carry:
+                    # Um caractere cortado não contém "\r"
+                    out.write(carry)
+                    written += len(carry)
+
+                if window.find(b'\r', 0, length) == -1 and not (after_cr and window[:1] == b'\n'):
+                    with memoryview(window) as view, view[:length] as piece:
+                        out.write(piece)
+                    written += length
+                    after_cr = False
+                else:
+                    data = window[:length]
+                    if after_cr and data.startswith(b'\n'):
+                        data = data[1:]
+                    after_cr = data.endswith(b'\r')
+                    data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+                    out.write(data)
+                    written += len(data)
+                carry = next_carry
+            if error is not None:
+                break
+
+    if error is not None:
+        message = read_error_text(error, written > 0).encode('utf-8')
+        out.write(message)
+        written += len(message)
+    return written
+
+
+def compression_for(file_path):
+    """Formato de compressão de uma saída pela extensão ('gzip', 'xz', 'bz2') ou None"""
+    return COMPRESSION_EXTENSIONS.get(os.path.splitext(file_path)[1].lower())
+
+
+class CompressedOutput:
+    """Arquivo de saída comprimido em uma thread própria.
+
+    write() só enfileira uma cópia dos bytes; a thread de compressão os
+    comprime (gzip, lzma e bz2 liberam o GIL) e grava no disco, de modo
+    que a compressão acontece em paralelo com a leitura dos arquivos. A
+    fila é limitada a COMPRESS_QUEUE_SIZE blocos. Erros da thread são
+    repassados no próximo write() ou em close().
+    """
+
+    def __init__(self, file_path, method, level=None):
+        # Importados sob demanda: só são carregados quando a saída é comprimida
+        import queue
+
+        if level is None:
+            level = DEFAULT_COMPRESS_LEVELS[method]
+        raw = open(file_path, 'wb')
+        try:
+            if method == 'gzip':
+                import gzip
+                # mtime=0: a mesma documentação gera sempre o mesmo .gz
+                self._file = gzip.GzipFile(filename='', mode='wb', fileobj=raw, compresslevel=level, mtime=0)
+            elif method == 'xz':
+                import lzma
+                self._file = lzma.LZMAFile(raw, 'wb', preset=level)
+            elif method == 'bz2':
+                import bz2
+                self._file = bz2.BZ2File(raw, 'wb', compresslevel=level)
+            else:
+                raise ValueError(f"formato de compressão desconhecido: {method}")
+        except BaseException:
+            raw.close()
+            raise
+        self._raw = raw
+        self._queue = queue.Queue(COMPRESS_QUEUE_SIZE)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="compressao-saida", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            data = self._queue.get()
+            if data is None:
+                return
+            if self._error is None:
+                try:
+                    self._file.write(data)
+                except BaseException as e:
+                    self._error = e
+
+    def write(self, data):
+        if self._error is not None:
+            raise self._error
+        self._queue.put(bytes(data))
+        return len(data)
+
+    def close(self):
+        """Espera a compressão terminar e fecha o arquivo"""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        try:
+            self._file.close()
+        finally:
+            self._raw.close()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_output(file_path, compress_level=None):
+    """Abre a saída da documentação para gravação em bytes.
+
+    Extensões .gz, .xz e .bz2 (ex.: "projeto.txt.gz") geram uma saída
+    comprimida durante a gravação (CompressedOutput), com compress_level
+    ou o nível padrão do formato.
+    """
+    method = compression_for(file_path)
+    if method is None:
+        return open(file_path, 'wb')
+    return CompressedOutput(file_path, method, compress_level)
+
+
+def write_chunks(out, chunks):
+    """Grava em out (binário) os blocos de iter_documentation, em UTF-8; retorna os bytes gravados"""
+    written = 0
+    for chunk in chunks:
+        if isinstance(chunk, RawFile):
+            written += copy_raw_file(chunk, out)
+        else:
+            data = chunk.encode('utf-8')
+            out.write(data)
+            written += len(data)
+    return written
+
+
+class PrefetchedFile:
+    """Início de um arquivo já lido por uma thread de leitura antecipada.
+
+    Se o arquivo não coube em PREFETCH_SIZE, handle continua aberto e
+    posicionado logo após head para que o restante seja lido em blocos.
+    """
+
+    __slots__ = ('head', 'handle', 'error')
+
+    def __init__(self, head='', handle=None, error=None):
+        self.head = head
+        self.handle = handle
+        self.error = error
+
+    def close(self):
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
+
+
+def open_prefetched(file_path, size=PREFETCH_SIZE, max_size=DEFAULT_MAX_FILE_SIZE, opener=None):
+    """Abre um arquivo e lê até size caracteres (executado nas threads de leitura)"""
+    try:
+        f = open_text_file(file_path, max_size, opener)
+    except Exception as e:
+        return PrefetchedFile(error=e)
+    try:
+        head = f.read(size)
+    except Exception as e:
+        f.close()
+        return PrefetchedFile(error=e)
+    if len(head) < size:
+        f.close()
+        return PrefetchedFile(head)
+    return PrefetchedFile(head, f)
+
+
+def iter_file_chunks(file_path, prefetched=None, max_size=DEFAULT_MAX_FILE_SIZE, opener=None):
+    """Gera o conteúdo de um arquivo em blocos, aproveitando a leitura antecipada se houver"""
+    if prefetched is None:
+        head = ''
+        f = open_text_file(file_path, max_size, opener)
+    else:
+        if prefetched.error is not None:
+            if isinstance(prefetched.error, InvalidUtf8) and prefetched.error.prefix:
+                yield prefetched.error.prefix
+            raise prefetched.error
+        head, f = prefetched.head, prefetched.handle
+
+    if f is None:
+        if head:
+            yield head
+        return
+
+    with f:
+        if head:
+            yield head
+        while True:
+            try:
+                chunk = f.read(CHUNK_SIZE)
+            except InvalidUtf8 as e:
+                if e.prefix:
+                    yield e.prefix
+                raise
+            if not chunk:
+                break
+            yield chunk
+
+
+def prefetch_files(plan, workers, window=None, max_size=DEFAULT_MAX_FILE_SIZE, opener=None):
+    """Lê antecipadamente os arquivos de um plano de exportação em um pool de threads.
+
+    Recebe tuplas (tipo, caminho, caminho relativo) e gera as mesmas tuplas
+    acrescidas de um PrefetchedFile (None para itens que não são arquivos),
+    preservando a ordem original. No máximo window itens ficam em leitura
+    ou aguardando consumo, o que limita memória e arquivos abertos.
+    """
+    # Importado sob demanda: mantém rápida a inicialização do modo linha de comando
+    from concurrent.futures import ThreadPoolExecutor
+
+    window = window or workers * 2
+    pending = deque()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            for kind, path, rel_path in plan:
+                future = (executor.submit(open_prefetched, path, max_size=max_size, opener=opener)
+                          if kind == 'file' else None)
+                pending.append((kind, path, rel_path, future))
+
+                while len(pending) > window:
+                    kind, path, rel_path, future = pending.popleft()
+                    yield kind, path, rel_path, future.result() if future else None
+
+            while pending:
+                kind, path, rel_path, future = pending.popleft()
+                yield kind, path, rel_path, future.result() if future else None
+        finally:
+            # Exportação interrompida: descartar leituras pendentes sem vazar arquivos abertos
+            for _, _, _, future in pending:
+                if future and not future.cancel():
+                    future.result().close()
+
+
+def mark_raw_files(plan, raw_copy_size, keys=None, max_size=DEFAULT_MAX_FILE_SIZE):
+    """Troca o tipo 'file' por 'raw' nos arquivos com pelo menos raw_copy_size bytes.
+
+    Usa o (mtime, tamanho) de keys quando houver; arquivos acima de
+    max_size continuam como 'file' (eles são ignorados na exportação).
+    """
+    for kind, path, rel_path in plan:
+        if kind == 'file':
+            key = keys.get(path) if keys else None
+            try:
+                size = key[1] if key else os.stat(path).st_size
+            except OSError:
+                size = 0
+            if size >= raw_copy_size and not (max_size and size > max_size):
+                kind = 'raw'
+        yield kind, path, rel_path
+
+
+def iter_export_plan(root_path, selected_items, scanner=None, excluded_items=None):
+    """Determina, em ordem, as pastas e arquivos que entram na documentação.
+
+    Gera tuplas (tipo, caminho, caminho relativo), onde tipo é 'folder',
+    'file' ou 'error' (neste caso o terceiro campo traz a mensagem de erro).
+    Pastas selecionadas entram inteiras, exceto os caminhos de
+    excluded_items (pastas excluídas não são percorridas).
+    """
+    scanner = scanner or Scanner()
+    base_path = os.path.dirname(root_path)
+    processed_paths = set()
+    excluded_items = excluded_items or ()
+
+    for item_path in sorted(selected_items):
+        if item_path in processed_paths or item_path in excluded_items:
+            continue
+        entry = scanner.stat(item_path)
+        if entry is None:
+            continue
+
+        rel_path = os.path.relpath(item_path, base_path).replace(os.sep, '/')
+
+        if entry.is_dir:
+            processed_paths.add(item_path)
+            yield 'folder', item_path, rel_path
+
+            # Incluir conteúdo da pasta se selecionada
+            yield from iter_folder_files(scanner, item_path, processed_paths, base_path, excluded_items)
+        else:
+            processed_paths.add(item_path)
+            yield 'file', item_path, rel_path
+
+
+def iter_folder_files(scanner, folder_path, processed_paths, base_path, excluded_items=()):
+    """Lista os arquivos de uma pasta recursivamente, em ordem alfabética"""
+    errors = []
+    for root, dirs, files in scanner.walk(folder_path, onerror=errors.append):
+        if excluded_items:
+            dirs[:] = [entry for entry in dirs if entry.path not in excluded_items]
+        for entry in files:
+            if entry.path in processed_paths or entry.path in excluded_items:
+                continue
+
+            processed_paths.add(entry.path)
+            yield 'file', entry.path, os.path.relpath(entry.path, base_path).replace(os.sep, '/')
+
+    # Como em os.walk, só a falha ao listar a própria pasta é relatada
+    if errors and errors[0].filename == folder_path:
+        yield 'error', folder_path, str(errors[0])
+
+
+class ContentCache:
+    """Cache LRU de seções já renderizadas, limitado pelo tamanho total.
+
+    A chave é o caminho do arquivo; uma seção só é reaproveitada se o
+    mtime, o tamanho e o caminho relativo continuarem iguais, de modo que
+    exportações repetidas só releem os arquivos que mudaram. Pode ser usado
+    por várias threads.
+    """
+
+    def __init__(self, max_chars=DEFAULT_CACHE_CHARS, max_entry_chars=None):
+        self.max_chars = max_chars
+        self.max_entry_chars = max_entry_chars or max_chars // 16
+        self.total_chars = 0
+        self.hits = 0
+        self.misses = 0
+        self._sections = OrderedDict()  # caminho -> (mtime, tamanho, caminho relativo, seção)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sections)
+
+    def get(self, path, mtime, size, rel_path):
+        """Retorna a seção em cache ou None (contabilizando acertos e falhas)"""
+        with self._lock:
+            item = self._sections.get(path)
+            if item is not None and item[:3] == (mtime, size, rel_path):
+                self._sections.move_to_end(path)
+                self.hits += 1
+                return item[3]
+            self.misses += 1
+            return None
+
+    def put(self, path, mtime, size, rel_path, section):
+        """Guarda uma seção, descartando as menos usadas se o limite for excedido"""
+        if len(section) > self.max_entry_chars:
+            return
+        with self._lock:
+            old = self._sections.pop(path, None)
+            if old is not None:
+                self.total_chars -= len(old[3])
+            self._sections[path] = (mtime, size, rel_path, section)
+            self.total_chars += len(section)
+            while self.total_chars > self.max_chars:
+                _, evicted = self._sections.popitem(last=False)
+                self.total_chars -= len(evicted[3])
+
+    def clear(self):
+        with self._lock:
+            self._sections.clear()
+            self.total_chars = 0
+
+
+def stat_plan_files(plan, keys, cache=None, stats=None, scanner=None):
+    """Consulta (mtime, tamanho) dos arquivos do plano, guardando-os em keys[caminho].
+
+    Com um ContentCache, os arquivos em cache são trocados por
+    ('cached', caminho, (caminho relativo, seção)); os demais seguem como
+    ('file', caminho, caminho relativo). Os arquivos são consultados com
+    scanner.file_key (por padrão, os.stat).
+    """
+    file_key = (scanner if scanner is not None else Scanner()).file_key
+    for kind, path, rel_path in plan:
+        if kind == 'file':
+            try:
+                key = file_key(path)
+            except OSError:
+                yield kind, path, rel_path
+                continue
+            keys[path] = key
+            if cache is not None:
+                section = cache.get(path, key[0], key[1], rel_path)
+                if section is not None:
+                    stats['cache_hits'] += 1
+                    yield 'cached', path, (rel_path, section)
+                    continue
+                stats['cache_misses'] += 1
+        yield kind, path, rel_path
+
+
+class Section:
+    """Descrição de uma seção da documentação gerada.
+
+    kind é 'header', 'folder', 'file' ou 'error'; para arquivos, mtime e
+    size identificam a versão exportada e skipped indica se ele entrou
+    como ignorado (contado em stats['skipped']). offset e length (em bytes
+    UTF-8) são preenchidos por quem grava a saída.
+    """
+
+    __slots__ = ('kind', 'path', 'mtime', 'size', 'offset', 'length', 'skipped')
+
+    def __init__(self, kind, path=None, mtime=None, size=None, offset=0, length=0, skipped=False):
+        self.kind = kind
+        self.path = path
+        self.mtime = mtime
+        self.size = size
+        self.offset = offset
+        self.length = length
+        self.skipped = skipped
+
+
+def render_header(root_path):
+    """Cabeçalho da documentação"""
+    folder_name = os.path.basename(root_path)
+    return (f"# Documentação do Projeto: {folder_name}\n"
+            f"Gerado automaticamente pelo Gerador de Conteúdo\n"
+            f"Data: {datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n"
+            f"Caminho base: {root_path}\n"
+            f"\n"
+            f"{'=' * 60}\n"
+            f"\n")
+
+
+def iter_documentation(root_path, selected_items, read_workers=DEFAULT_READ_WORKERS, task=None, stats=None,
+                       scanner=None, content_cache=None, sections=None, max_file_size=DEFAULT_MAX_FILE_SIZE,
+                       excluded_items=None, raw_copy_size=None):
+    """Gera o conteúdo da documentação em blocos (cabeçalho, seções e conteúdo dos arquivos).
+
+    task é opcional: se informado, task.check() é chamado antes de cada
+    arquivo (para permitir cancelamento) e task.progress(n, caminho) relata
+    o andamento. stats['files'] recebe a quantidade de arquivos exportados.
+    scanner permite reaproveitar as listagens já feitas (ex.: pela árvore) e
+    content_cache (ContentCache) as seções de arquivos que não mudaram;
+    stats['cache_hits'] e stats['cache_misses'] registram o uso do cache.
+    Se sections for uma lista, um Section é acrescentado a ela logo antes
+    do primeiro bloco de cada seção (permitindo registrar deslocamentos).
+    Arquivos binários ou maiores que max_file_size bytes são listados como
+    ignorados, sem ter o conteúdo lido (contados em stats['skipped']).
+    excluded_items são os caminhos excluídos de dentro das pastas
+    selecionadas (veja SelectionModel.selection_rules). Com raw_copy_size,
+    o corpo dos arquivos a partir desse tamanho é gerado como um RawFile
+    (em vez de blocos de texto), a ser gravado com write_chunks; isso só
+    vale para scanners locais (os arquivos são lidos com scanner.open).
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault('files', 0)
+    stats.setdefault('skipped', 0)
+    stats.setdefault('cache_hits', 0)
+    stats.setdefault('cache_misses', 0)
+
+    if sections is not None:
+        sections.append(Section('header'))
+    yield render_header(root_path)
+
+    scanner = scanner if scanner is not None else Scanner()
+    opener = scanner.open
+    plan = iter_export_plan(root_path, selected_items, scanner, excluded_items)
+    file_keys = {}
+    if content_cache is not None or sections is not None:
+        plan = stat_plan_files(plan, file_keys, content_cache, stats, scanner)
+    if raw_copy_size and scanner.local:
+        plan = mark_raw_files(plan, raw_copy_size, file_keys, max_file_size)
+    if read_workers > 1 and scanner.parallel_reads:
+        items = prefetch_files(plan, read_workers, max_size=max_file_size, opener=opener)
+    else:
+        items = (
+            (kind, path, rel_path,
+             open_prefetched(path, max_size=max_file_size, opener=opener) if kind == 'file' else None)
+            for kind, path, rel_path in plan
+        )
+
+    for kind, path, rel_path, prefetched in items:
+        key = file_keys.pop(path, None) if kind in ('file', 'cached', 'raw') else None
+        section = None
+        if sections is not None:
+            section_kind = 'file' if kind in ('cached', 'raw') else kind
+            section = Section(section_kind, path, *(key or (None, None)))
+            sections.append(section)
+
+        if kind == 'folder':
+            yield f"## 📁 {rel_path}/\n\n"
+        elif kind == 'error':
+            yield f"[Erro ao processar pasta {path}: {rel_path}]\n\n"
+        elif kind == 'cached':
+            rel_path, section = rel_path
+            if task:
+                task.check()
+                task.progress(stats['files'], rel_path)
+            yield section
+            stats['files'] += 1
+        elif kind == 'raw':
+            if task:
+                task.check()
+                task.progress(stats['files'], rel_path)
+            try:
+                raw = open_raw_file(path, max_file_size)
+            except SkippedFile:
+                stats['skipped'] += 1
+                if section is not None:
+                    section.skipped = True
+                raw = None
+            if raw is None:
+                yield from iter_file_section(path, rel_path, max_size=max_file_size, opener=opener)
+            else:
+                yield f"### 📄 {rel_path}\n```\n"
+                yield raw
+                yield "\n```\n\n"
+            stats['files'] += 1
+        else:
+            if task:
+                task.check()
+                task.progress(stats['files'], rel_path)
+            # Arquivos ignorados não entram no cache: o limite de tamanho pode mudar
+            skipped = isinstance(prefetched.error, SkippedFile)
+            if skipped:
+                stats['skipped'] += 1
+                if section is not None:
+                    section.skipped = True
+
+            if content_cache is None or key is None or skipped:
+                yield from iter_file_section(path, rel_path, prefetched)
+            else:
+                # Guardar a seção enquanto ela é gerada (arquivos grandes não entram no cache)
+                parts = []
+                size = 0
+                for chunk in iter_file_section(path, rel_path, prefetched):
+                    if parts is not None:
+                        size += len(chunk)
+                        if size > content_cache.max_entry_chars:
+                            parts = None
+                        else:
+                            parts.append(chunk)
+                    yield chunk
+                if parts is not None:
+                    content_cache.put(path, key[0], key[1], rel_path, ''.join(parts))
+            stats['files'] += 1
+
+
+def iter_file_section(file_path, rel_path, prefetched=None, max_size=DEFAULT_MAX_FILE_SIZE, opener=None):
+    """Gera a seção de um arquivo, lendo seu conteúdo em blocos de tamanho fixo"""
+    yield f"### 📄 {rel_path}\n```\n"
+    yield from iter_file_body(file_path, prefetched, max_size, opener)
+    yield "\n```\n\n"
+
+
+def iter_file_body(file_path, prefetched=None, max_size=DEFAULT_MAX_FILE_SIZE, opener=None):
+    """Lê um arquivo em blocos de CHUNK_SIZE caracteres.
+
+    Blocos iniciais só com espaços em branco ficam retidos até aparecer
+    algum conteúdo, para que arquivos vazios continuem sendo marcados
+    como "[Arquivo vazio]" sem precisar carregar o arquivo inteiro. Se o
+    arquivo deixar de ser UTF-8 válido, o trecho válido é mantido e
+    seguido da mensagem de erro em uma nova linha (como em copy_raw_file).
+    """
+    pending = []
+    has_content = False
+    try:
+        for chunk in iter_file_chunks(file_path, prefetched, max_size, opener):
+            if has_content:
+                yield chunk
+            elif chunk.strip():
+                has_content = True
+                yield ''.join(pending) + chunk
+                pending = []
+            else:
+                pending.append(chunk)
+    except SkippedFile as e:
+        yield f"[Arquivo ignorado: {e}]"
+        return
+    except InvalidUtf8 as e:
+        valid = ''.join(pending)
+        if valid:
+            yield valid
+        yield read_error_text(e, has_content or bool(valid))
+        return
+    except Exception as e:
+        if has_content:
+            yield "\n"
+        yield f"[Erro ao ler arquivo: {e}]"
+        return
+
+    if not has_content:
+        yield "[Arquivo vazio]"
+
+
+def write_documentation(file_path, root_path, selected_items, read_workers=DEFAULT_READ_WORKERS, task=None,
+                        scanner=None, content_cache=None, stats=None, sections=None,
+                        max_file_size=DEFAULT_MAX_FILE_SIZE, excluded_items=None, raw_copy_size=DEFAULT_RAW_COPY_SIZE,
+                        compress_level=None):
+    """Grava a documentação em disco em blocos, sem montar a saída inteira na memória.
+
+    A saída é gravada em UTF-8 com quebras de linha "\\n" em qualquer
+    sistema. Em caso de cancelamento ou erro o arquivo parcial é removido.
+    Retorna a quantidade de arquivos exportados (detalhes em stats, como
+    em iter_documentation). Se sections for uma lista, recebe as seções
+    gravadas com seus deslocamentos e tamanhos em bytes. Arquivos a partir
+    de raw_copy_size bytes são copiados sem decodificação (copy_raw_file).
+    Saídas .gz, .xz e .bz2 são comprimidas durante a gravação (open_output);
+    nelas os deslocamentos de sections se referem ao conteúdo descomprimido.
+    """
+    if stats is None:
+        stats = {}
+    chunks = iter_documentation(
+        root_path, selected_items, read_workers, task, stats, scanner, content_cache, sections, max_file_size,
+        excluded_items, raw_copy_size
+    )
+    try:
+        with open_output(file_path, compress_level) as f:
+            if sections is None:
+                write_chunks(f, chunks)
+            else:
+                offset = 0
+                current = None
+                for chunk in chunks:
+                    if current is not sections[-1]:
+                        if current is not None:
+                            current.length = offset - current.offset
+                        current = sections[-1]
+                        current.offset = offset
+                    offset += write_chunks(f, (chunk,))
+                if current is not None:
+                    current.length = offset - current.offset
+    except BaseException:
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
+        raise
+    return stats['files']
@@ -1,8 +1,181 @@
 import os
+import sys
+
+# Modo linha de comando (ex.: "export"): despachado antes de importar o
+# Tkinter, para rodar sem display e iniciar rápido em pipelines
+if __name__ == "__main__" and len(sys.argv) > 1:
+    from folder_content_cli import main as cli_main
+    sys.exit(cli_main(sys.argv[1:]))
+
+import queue
+import re
+import threading
+import time
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+from collections import deque
+from tkinter import ttk, filedialog, messagebox, simpledialog
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import datetime
+
+from folder_content_core import (
+    DEFAULT_MAX_FILE_SIZE, DEFAULT_RAW_COPY_SIZE, DEFAULT_READ_WORKERS, PARTIAL, SELECTED, ContentCache, Scanner, SelectionModel,
+    SizeTotals, format_size, get_file_icon, iter_documentation, skip_reason, write_documentation
+)
+from folder_content_archive import ArchiveScanner, is_archive
+from folder_content_changes import changed_since_ref, modified_since, parse_cutoff
+from folder_content_git import GitScanner
+from folder_content_ignore import IgnoreMatcher
+from folder_content_incremental import write_documentation_incremental
+from folder_content_index import open_index
+from folder_content_search import NameIndex, compile_pattern, grep_files
+from folder_content_tokens import CHARS_PER_TOKEN, SelectionTokens, TokenCache, write_documentation_budget
+from folder_content_watch import create_watcher
+
+# Itens inseridos por vez ao expandir uma pasta (o resto fica atrás de "Mostrar mais")
+TREE_PAGE_SIZE = 1000
+
+# "Expandir Tudo": limite de itens inseridos e fatia de tempo (ms) de cada lote
+EXPAND_NODE_BUDGET = 20000
+EXPAND_SLICE_MS = 30
+
+# Busca: espera após a última tecla (ms), resultados por busca e quantos são revelados na árvore
+SEARCH_DEBOUNCE_MS = 150
+SEARCH_RESULT_LIMIT = 500
+SEARCH_REVEAL_LIMIT = 20
+
+# Espera (ms) após a última mudança de seleção antes de recontar os tokens
+TOKEN_COUNT_DELAY_MS = 300
+
+# Modo de observação: espera (ms) após a última alteração antes de regravar a saída
+AUTO_EXPORT_DELAY_MS = 1500
+
+class TaskCancelled(Exception):
+    """Sinaliza que uma tarefa em segundo plano foi cancelada"""
+
+
+class BackgroundTask:
+    """Tarefa executada pelo BackgroundWorker.
+
+    A função da tarefa recebe esta instância como primeiro argumento e deve
+    chamar check() periodicamente (para respeitar cancelamentos) e
+    progress() para publicar o andamento na interface.
+    """
+
+    # Intervalo mínimo (em segundos) entre dois eventos de progresso
+    PROGRESS_INTERVAL = 0.1
+
+    def __init__(self, worker, on_progress=None, on_done=None, on_error=None, on_cancel=None):
+        self.worker = worker
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_cancel = on_cancel
+        self._cancel_event = threading.Event()
+        self._last_progress = 0.0
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """Solicita o cancelamento da tarefa"""
+        self._cancel_event.set()
+
+    def check(self):
+        """Interrompe a tarefa se o cancelamento foi solicitado"""
+        if self._cancel_event.is_set():
+            raise TaskCancelled()
+
+    def progress(self, *args, force=False):
+        """Publica o andamento da tarefa, limitando a frequência de atualizações"""
+        if self.on_progress is None:
+            return
+        now = time.monotonic()
+        if force or now - self._last_progress >= self.PROGRESS_INTERVAL:
+            self._last_progress = now
+            self.worker.post(self, self.on_progress, *args)
+
+
+class BackgroundWorker:
+    """Executa varreduras e exportações fora da thread do Tk.
+
+    As tarefas rodam em um pool de threads; os resultados e eventos de
+    progresso passam por uma fila que é esvaziada na thread principal com
+    root.after, já que o Tkinter não pode ser acessado de outras threads.
+    """
+
+    POLL_INTERVAL = 50  # ms
+
+    def __init__(self, root, max_workers=2):
+        self.root = root
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.events = queue.Queue()
+        self.active_tasks = set()
+        self._polling = False
+
+    def submit(self, func, *args, on_progress=None, on_done=None, on_error=None, on_cancel=None):
+        """Agenda func(task, *args) em segundo plano e retorna a BackgroundTask"""
+        task = BackgroundTask(self, on_progress, on_done, on_error, on_cancel)
+        self.active_tasks.add(task)
+        self.executor.submit(self._run, task, func, args)
+        self._schedule_poll()
+        return task
+
+    def post(self, task, callback, *args):
+        """Enfileira um callback para ser executado na thread do Tk"""
+        if callback is not None:
+            self.events.put((task, callback, args))
+
+    def cancel_all(self):
+        """Cancela todas as tarefas em andamento"""
+        for task in list(self.active_tasks):
+            task.cancel()
+
+    def shutdown(self):
+        """Cancela as tarefas e encerra o pool sem bloquear a interface"""
+        self.cancel_all()
+        self.executor.shutdown(wait=False)
+
+    def _run(self, task, func, args):
+        try:
+            result = func(task, *args)
+        except TaskCancelled:
+            self.post(task, task.on_cancel)
+        except Exception as e:
+            self.post(task, task.on_error, e)
+        else:
+            self.post(task, task.on_done, result)
+        finally:
+            # Marcador de fim da tarefa
+            self.events.put((task, None, ()))
+
+    def _schedule_poll(self):
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.POLL_INTERVAL, self._poll)
+
+    def _poll(self):
+        while True:
+            try:
+                task, callback, args = self.events.get_nowait()
+            except queue.Empty:
+                break
+
+            if callback is None:
+                # Marcador de fim da tarefa
+                self.active_tasks.discard(task)
+                continue
+            # Eventos de progresso de tarefas canceladas são descartados
+            if task.cancelled and callback is task.on_progress:
+                continue
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"❌ Erro ao processar evento de tarefa: {e}")
+
+        self._polling = False
+        if self.active_tasks:
+            self._schedule_poll()
 
 class ModernFolderContentApp:
     def __init__(self, root):
@@ -18,10 +191,55 @@ class ModernFolderContentApp:
         self.setup_modern_style()
         
         # Variáveis de estado
-        self.selected_items = set()
+        self.name_index = NameIndex()
+        self.size_totals = SizeTotals()  # arquivos e bytes por pasta, para os totais da seleção
+        self.scanner = Scanner(name_index=self.name_index)
+        self.selection = SelectionModel()
+        self.nodes = {}  # caminho -> item da árvore
+        self.listings = {}  # pasta expandida -> Listing (para as próximas páginas)
+        self.checkbox_refresh_pending = False
         self.folder_path = tk.StringVar()
         self.search_var = tk.StringVar()
         self.search_var.trace('w', self.on_search_change)
+        self.search_after = None  # busca agendada (debounce)
+        self.search_matches = []  # itens da árvore destacados pela última busca
+        self.search_results = []  # caminhos encontrados pela última busca (nome ou conteúdo)
+        self.grep_task = None
+        self.changed_since = "HEAD"  # último critério de "Marcar alterados"
+        self.changed_task = None
+        
+        # Modo de observação: pastas monitoradas e saída atualizada automaticamente
+        self.watcher = None
+        self.watch_after = None
+        self.watch_task = None  # listagem inicial das pastas a monitorar
+        self.watch_poll_task = None
+        self.watch_walks = set()  # registros no monitoramento em segundo plano (pastas abertas e subárvores novas)
+        self.last_output = None  # (arquivo, orçamento de tokens) da última geração
+        self.auto_export_after = None
+        
+        # Tarefas em segundo plano (varreduras e exportações)
+        self.worker = BackgroundWorker(self.root)
+        # A consulta contínua ao monitoramento tem uma thread só sua, para
+        # não disputar o pool com contagens, buscas e exportações
+        self.watch_worker = BackgroundWorker(self.root, max_workers=1)
+        self.export_task = None
+        self.folder_info_task = None
+        self.expand_task = None
+        self.expand_budget = EXPAND_NODE_BUDGET
+        self.expand_pending = deque()  # (pasta, Listing) aguardando inserção na árvore
+        self.expand_drain_scheduled = False
+        self.expand_message = None
+        self.read_workers = DEFAULT_READ_WORKERS
+        self.ignore_patterns = []  # padrões de exclusão do usuário (além do .gitignore)
+        self.max_file_size = DEFAULT_MAX_FILE_SIZE
+        self.raw_copy_size = DEFAULT_RAW_COPY_SIZE  # arquivos copiados sem decodificação a partir deste tamanho
+        self.compress_level = None  # nível das saídas .gz/.xz/.bz2 (None = padrão do formato)
+        self.content_cache = ContentCache()
+        self.token_cache = TokenCache()
+        self.rule_tokens = SelectionTokens()  # tokens de cada caminho das regras de seleção
+        self.token_task = None
+        self.token_after = None
+        self.selection_tokens = None  # (arquivos, tokens) da seleção atual, quando já contados
         
         # Criar interface
         self.create_interface()
@@ -156,6 +374,22 @@ class ModernFolderContentApp:
         )
         select_btn.pack(side=tk.LEFT, padx=(10, 0))
         
+        # Botão para abrir um arquivo compactado como pasta
+        archive_btn = ttk.Button(
+            input_frame,
+            text="📦 Abrir Compactado",
+            command=self.select_archive
+        )
+        archive_btn.pack(side=tk.LEFT, padx=(10, 0))
+        
+        # Botão para carregar uma revisão do git (sem checkout)
+        revision_btn = ttk.Button(
+            input_frame,
+            text="🔖 Revisão Git",
+            command=self.select_revision
+        )
+        revision_btn.pack(side=tk.LEFT, padx=(10, 0))
+        
         # Informações da pasta (oculta inicialmente)
         self.folder_info_frame = ttk.Frame(section_frame)
         self.folder_info_label = ttk.Label(
@@ -224,6 +458,81 @@ class ModernFolderContentApp:
         )
         collapse_btn.pack(side=tk.LEFT)
         
+        # Separador
+        ttk.Separator(left_controls, orient='vertical').pack(side=tk.LEFT, fill='y', padx=(10, 10))
+        
+        # Itens ignorados (.gitignore, node_modules, .git...)
+        self.hide_ignored_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(
+            left_controls,
+            text="Ocultar ignorados",
+            variable=self.hide_ignored_var,
+            command=self.apply_ignore_rules
+        ).pack(side=tk.LEFT, padx=(0, 5))
+        
+        ttk.Button(
+            left_controls,
+            text="🚫 Padrões",
+            command=self.edit_ignore_patterns,
+            style='Secondary.TButton'
+        ).pack(side=tk.LEFT)
+        
+        # Modo de observação: a árvore acompanha as alterações no disco
+        self.watch_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            left_controls,
+            text="👁 Monitorar",
+            variable=self.watch_var,
+            command=self.toggle_watch
+        ).pack(side=tk.LEFT, padx=(10, 0))
+        
+        # Frame direito - busca por nome (também nas pastas ainda não expandidas) ou por conteúdo
+        right_controls = ttk.Frame(toolbar)
+        right_controls.grid(row=0, column=2, sticky='e')
+        
+        self.search_entry = ttk.Entry(
+            right_controls,
+            textvariable=self.search_var,
+            foreground='gray',
+            width=30
+        )
+        self.search_entry.insert(0, "Buscar arquivos...")
+        self.search_entry.pack(side=tk.LEFT)
+        self.search_entry.bind("<FocusIn>", self.on_search_focus_in)
+        self.search_entry.bind("<FocusOut>", self.on_search_focus_out)
+        self.search_entry.bind("<Return>", lambda e: self.run_search())
+        
+        # Busca no conteúdo: roda ao pressionar Enter
+        self.content_search_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            right_controls,
+            text="No conteúdo",
+            variable=self.content_search_var,
+            command=self.on_search_change
+        ).pack(side=tk.LEFT, padx=(10, 0))
+        
+        self.regex_search_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            right_controls,
+            text="Regex",
+            variable=self.regex_search_var
+        ).pack(side=tk.LEFT, padx=(5, 0))
+        
+        ttk.Button(
+            right_controls,
+            text="☑️ Marcar resultados",
+            command=self.select_search_results,
+            style='Secondary.TButton'
+        ).pack(side=tk.LEFT, padx=(10, 0))
+        
+        # Seleção só do que mudou (desde uma revisão do git ou uma data)
+        ttk.Button(
+            right_controls,
+            text="🕒 Marcar alterados",
+            command=self.select_changed,
+            style='Secondary.TButton'
+        ).pack(side=tk.LEFT, padx=(5, 0))
+        
     def create_tree_area(self, parent):
         """Cria a área da árvore de arquivos"""
         # Frame container
@@ -250,17 +559,22 @@ class ModernFolderContentApp:
         self.tree.heading("#0", text="✓ Nome do Arquivo/Pasta")
         
         # Scrollbars modernas
-        v_scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.v_scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
         h_scrollbar = ttk.Scrollbar(tree_frame, orient=tk.HORIZONTAL, command=self.tree.xview)
         
-        self.tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        self.tree.configure(yscrollcommand=self.on_tree_yscroll, xscrollcommand=h_scrollbar.set)
         
         # Layout
         self.tree.grid(row=0, column=0, sticky='nsew')
-        v_scrollbar.grid(row=0, column=1, sticky='ns')
+        self.v_scrollbar.grid(row=0, column=1, sticky='ns')
         h_scrollbar.grid(row=1, column=0, sticky='ew')
         
         # Bind eventos
+        # Arquivos que ficam fora da documentação (binários ou grandes demais)
+        self.tree.tag_configure('skipped', foreground=self.colors['secondary'])
+        # Resultados da busca
+        self.tree.tag_configure('match', background='#fff3bf')
+        
         self.tree.bind("<<TreeviewOpen>>", self.on_open)
         self.tree.bind("<Button-1>", self.on_click)
         self.tree.bind("<Double-1>", self.on_double_click)
@@ -315,6 +629,43 @@ class ModernFolderContentApp:
         )
         self.generate_btn.pack(side=tk.RIGHT, padx=(10, 0))
         
+        # Botão de cancelamento (visível apenas durante a exportação)
+        self.cancel_btn = ttk.Button(
+            actions_frame,
+            text="✖ Cancelar",
+            command=self.cancel_export,
+            style='Secondary.TButton'
+        )
+        
+        # Barra de progresso das tarefas em segundo plano
+        self.progress_bar = ttk.Progressbar(actions_frame, mode='indeterminate', length=160)
+        
+        # Orçamento de tokens (vazio = sem limite): escolhe e trunca arquivos para caber
+        self.token_budget_var = tk.StringVar()
+        ttk.Entry(
+            actions_frame,
+            textvariable=self.token_budget_var,
+            width=10
+        ).pack(side=tk.RIGHT, padx=(5, 0))
+        ttk.Label(actions_frame, text="Máx. tokens:").pack(side=tk.RIGHT, padx=(10, 0))
+        
+        # Exportação incremental (atualiza só as seções alteradas da saída anterior)
+        self.incremental_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            actions_frame,
+            text="Incremental",
+            variable=self.incremental_var
+        ).pack(side=tk.RIGHT, padx=(10, 0))
+        
+        # Com "Monitorar", regrava a última saída quando arquivos selecionados mudam
+        self.auto_export_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            actions_frame,
+            text="Atualizar saída",
+            variable=self.auto_export_var,
+            command=self.schedule_auto_export
+        ).pack(side=tk.RIGHT, padx=(10, 0))
+        
         # Informações adicionais
         info_text = "💡 Dica: Marque as pastas e arquivos que deseja incluir na documentação"
         ttk.Label(
@@ -338,9 +689,99 @@ class ModernFolderContentApp:
         if not folder:
             return
         
+        self.load_folder(folder)
+
+    def select_archive(self):
+        """Seleciona um arquivo compactado e o carrega como pasta (sem extrair)"""
+        archive = filedialog.askopenfilename(
+            title="Abrir arquivo compactado",
+            filetypes=[
+                ("Arquivos compactados", "*.zip *.tar *.tar.gz *.tgz"),
+                ("Todos os Arquivos", "*.*")
+            ]
+        )
+        if not archive:
+            return
+        
+        self.load_folder(os.path.normpath(archive))
+
+    def select_revision(self):
+        """Carrega uma revisão do git (tag, branch ou commit) do projeto, lida sem checkout"""
+        scanner = self.scanner
+        if isinstance(scanner, GitScanner):
+            folder = scanner.repo
+        elif scanner.local and self.folder_path.get():
+            folder = self.folder_path.get()
+        else:
+            folder = filedialog.askdirectory(title="Selecionar repositório git")
+            if not folder:
+                return
+        
+        revision = simpledialog.askstring(
+            "Revisão Git",
+            "Tag, branch ou commit a exportar (ex.: v1.0, main, HEAD~3):",
+            initialvalue=scanner.revision if isinstance(scanner, GitScanner) else "HEAD",
+            parent=self.root
+        )
+        if not revision or not revision.strip():
+            return
+        revision = revision.strip()
+        self.mount_scanner(f"{os.path.basename(folder)}@{revision}",
+                           lambda: GitScanner(folder, revision, name_index=NameIndex()))
+
+    def mount_archive(self, archive):
+        """Lê o índice de um arquivo compactado em segundo plano e então o carrega na árvore"""
+        self.mount_scanner(os.path.basename(archive), lambda: ArchiveScanner(archive, name_index=NameIndex()))
+
+    def mount_scanner(self, name, create):
+        """Cria em segundo plano um scanner não local (arquivo compactado ou revisão do git) e carrega sua árvore"""
+        self.update_status(f"📦 Lendo {name}...", "info")
+        
+        def on_error(e):
+            messagebox.showerror("Erro", f"Não foi possível abrir {name}:\n{e}")
+            self.update_status(f"❌ Erro ao abrir {name}: {e}", "error")
+        
+        self.worker.submit(
+            lambda task: create(),
+            on_done=lambda scanner: self.load_folder(scanner.root, scanner),
+            on_error=on_error
+        )
+
+    def load_folder(self, folder, scanner=None):
+        """Carrega a estrutura de uma pasta (ou de um arquivo compactado) na árvore.
+
+        Ao trocar de projeto, um novo Scanner é criado com o índice
+        persistente do projeto; ao recarregar o mesmo projeto (F5), as
+        listagens já conhecidas são reaproveitadas e só as pastas
+        modificadas voltam a ser listadas. Arquivos .zip, .tar e .tar.gz e
+        revisões do git são montados antes em segundo plano (mount_scanner),
+        que passa o scanner pronto.
+        """
+        if scanner is not None or folder != self.folder_path.get():
+            if scanner is None and is_archive(folder):
+                self.mount_archive(folder)
+                return
+            self.close_scanner()
+            self.name_index = scanner.name_index if scanner is not None else NameIndex()
+            self.size_totals = SizeTotals(self.max_file_size)
+            if scanner is None:
+                scanner = Scanner(index=open_index(folder), name_index=self.name_index)
+            scanner.ignore = self.create_ignore(folder, scanner)
+            self.scanner = scanner
+            self.last_output = None
+        
+        self.stop_watch()
+        self.cancel_expand()
+        self.cancel_grep()
+        self.search_matches = []
+        self.search_results = []
         self.folder_path.set(folder)
         self.tree.delete(*self.tree.get_children())
-        self.selected_items.clear()
+        self.selection.clear()
+        self.rule_tokens.clear()
+        self.schedule_token_count()
+        self.nodes.clear()
+        self.listings.clear()
         self.select_all_var.set(False)
         
         # Mostrar informações da pasta
@@ -353,28 +794,52 @@ class ModernFolderContentApp:
             open=False, 
             values=[folder, "folder"]
         )
+        self.nodes[folder] = root_node
+        self.selection.add_root(folder)
         
         # Adicionar placeholder
         self.tree.insert(root_node, "end", text="⏳ Carregando...", values=["DUMMY"])
         
         self.update_status("📁 Projeto carregado! Expanda as pastas e selecione os itens desejados.", "info")
+        if self.watch_var.get():
+            self.start_watch()
 
     def show_folder_info(self, folder):
-        """Mostra informações sobre a pasta selecionada"""
-        try:
-            # Contar arquivos e pastas
-            total_files = 0
-            total_dirs = 0
-            for root, dirs, files in os.walk(folder):
-                total_files += len(files)
-                total_dirs += len(dirs)
-            
-            info_text = f"📊 {total_dirs} pastas • {total_files} arquivos • {Path(folder).name}"
+        """Mostra informações sobre a pasta selecionada (contagem feita em segundo plano)"""
+        if self.folder_info_task:
+            self.folder_info_task.cancel()
+        
+        self.folder_info_label.config(text=f"📊 Contando itens de {Path(folder).name}...")
+        self.folder_info_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        def on_progress(total_dirs, total_files):
+            self.folder_info_label.config(
+                text=f"📊 {total_dirs} pastas • {total_files} arquivos • {Path(folder).name} (contando...)"
+            )
+            self.refresh_selection_label()
+        
+        def on_done(result):
+            total_dirs, total_files = result
+            folder_totals = totals.folder(folder)
+            size = f" • {format_size(folder_totals[1])}" if folder_totals else ""
+            info_text = f"📊 {total_dirs} pastas • {total_files} arquivos{size} • {Path(folder).name}"
             self.folder_info_label.config(text=info_text)
-            self.folder_info_frame.pack(fill=tk.X, pady=(10, 0))
-            
-        except Exception:
-            self.folder_info_frame.pack_forget()
+            self.folder_info_task = None
+            self.refresh_selection_label()
+            if scanner.index is not None:
+                scanner.index.flush()
+            # A contagem terminou de indexar os nomes: refaz a busca em andamento
+            if self.search_term() and not self.content_search_var.get():
+                self.schedule_search()
+        
+        scanner = self.scanner
+        totals = self.size_totals
+        self.folder_info_task = self.worker.submit(
+            lambda task: scanner.count_items(folder, task, totals),
+            on_progress=on_progress,
+            on_done=on_done,
+            on_error=lambda e: self.folder_info_frame.pack_forget()
+        )
 
     def on_open(self, event):
         """Evento quando um nó é expandido"""
@@ -386,75 +851,128 @@ class ModernFolderContentApp:
         if not values or len(values) < 1:
             return
         
-        path = values[0]
-        
-        # Verificar se precisa carregar
+        self.load_children(node, values[0])
+
+    def load_children(self, node, path, listing=None):
+        """Carrega os filhos de um nó que ainda só tem o marcador de carregamento"""
         children = self.tree.get_children(node)
         if len(children) == 1:
             child_values = self.tree.item(children[0], "values")
             if child_values and child_values[0] == "DUMMY":
                 self.tree.delete(children[0])
-                self.populate_node(node, path)
+                self.populate_node(node, path, listing)
 
-    def populate_node(self, parent_node, path):
-        """Popula um nó com seus filhos"""
+    def populate_node(self, parent_node, path, listing=None):
+        """Popula um nó com a primeira página de seus filhos"""
         try:
-            if not os.path.isdir(path):
-                return
-            
-            entries = []
-            for entry in os.listdir(path):
-                full_path = os.path.join(path, entry)
-                if os.path.isdir(full_path):
-                    entries.append((f"📁 {entry}", full_path, "folder"))
-                else:
-                    size = self.get_file_size(full_path)
-                    icon = self.get_file_icon(entry)
-                    entries.append((f"{icon} {entry} ({size})", full_path, "file"))
-            
-            # Ordenar: pastas primeiro, depois arquivos
-            entries.sort(key=lambda x: (x[2] == "file", x[0].lower()))
+            if listing is None:
+                entry = self.scanner.stat(path)
+                if entry is None or not entry.is_dir:
+                    return
+                # Só os nomes: tamanhos são consultados página a página
+                listing = self.scanner.listdir(path, stats=False)
+            self.listings[path] = listing
             
-            for display_name, full_path, item_type in entries:
-                node = self.tree.insert(parent_node, "end",
-                    text=f"☐ {display_name}",
-                    values=[full_path, item_type]
-                )
-                
-                if item_type == "folder":
-                    self.tree.insert(node, "end", text="⏳ Carregando...", values=["DUMMY"])
+            # Filhos entram com o estado da pasta (marcada ou não)
+            self.selection.set_children(path, len(listing))
+            self.insert_page(parent_node, path, 0)
+            if self.watcher is not None:
+                self.watch_folders([path])
                     
         except PermissionError:
             self.tree.insert(parent_node, "end", text="🔒 Acesso negado", values=[])
         except Exception as e:
             self.tree.insert(parent_node, "end", text=f"⚠️ Erro: {str(e)}", values=[])
 
+    def insert_page(self, parent_node, path, start, stop=None):
+        """Insere uma página de itens da pasta (ou até stop) e, se sobrar, a linha de "Mostrar mais" """
+        listing = self.listings[path]
+        stop = min(start + TREE_PAGE_SIZE if stop is None else stop, len(listing))
+        self.scanner.fill_stats(listing, start, stop)
+        checkbox = self.checkbox_for(self.selection.state(path))
+        
+        for entry in listing[start:stop]:
+            self.insert_entry(parent_node, entry, checkbox)
+        
+        remaining = len(listing) - stop
+        if remaining:
+            self.tree.insert(parent_node, "end",
+                text=f"➕ Mostrar mais ({remaining} restantes)",
+                values=["MORE", path, str(stop)]
+            )
+
+    def display_entry(self, entry):
+        """Texto (sem o indicador de seleção) e tags de um item da árvore"""
+        if entry.is_dir:
+            return f"📁 {entry.name}", ()
+        display_name = f"{get_file_icon(entry.name)} {entry.name} ({format_size(entry.size)})"
+        if skip_reason(entry.path, entry.size, self.max_file_size):
+            return display_name, ('skipped',)
+        return display_name, ()
+
+    def insert_entry(self, parent_node, entry, checkbox, index="end"):
+        """Insere um item na árvore (pastas com o marcador de carregamento) e retorna o nó"""
+        display_name, tags = self.display_entry(entry)
+        node = self.tree.insert(parent_node, index,
+            text=f"{checkbox} {display_name}",
+            values=[entry.path, "folder" if entry.is_dir else "file"],
+            tags=tags
+        )
+        self.nodes[entry.path] = node
+        
+        if entry.is_dir:
+            self.tree.insert(node, "end", text="⏳ Carregando...", values=["DUMMY"])
+        return node
+
+    def show_more(self, node):
+        """Troca a linha "Mostrar mais" pela próxima página de itens"""
+        _, path, start = self.tree.item(node, "values")
+        parent_node = self.tree.parent(node)
+        self.tree.delete(node)
+        if path in self.listings:
+            self.insert_page(parent_node, path, int(start))
+            self.schedule_checkbox_refresh()
+
+    def create_ignore(self, folder, scanner):
+        """Cria as regras de exclusão da pasta (ou None se os ignorados forem exibidos).
+
+        Os .gitignore são lidos pelo scanner, valendo também dentro de
+        arquivos compactados e revisões do git.
+        """
+        if not self.hide_ignored_var.get():
+            return None
+        return IgnoreMatcher(folder, self.ignore_patterns, scanner=scanner)
+
+    def apply_ignore_rules(self):
+        """Aplica as regras de exclusão atuais e recarrega a árvore"""
+        folder = self.folder_path.get()
+        if not folder:
+            return
+        self.scanner.ignore = self.create_ignore(folder, self.scanner)
+        self.load_folder(folder)
+
+    def edit_ignore_patterns(self):
+        """Edita os padrões de exclusão do usuário (sintaxe do .gitignore)"""
+        patterns = simpledialog.askstring(
+            "Padrões de exclusão",
+            "Padrões a ignorar, separados por vírgula (ex.: *.log, dist/, build/):",
+            initialvalue=", ".join(self.ignore_patterns),
+            parent=self.root
+        )
+        if patterns is None:
+            return
+        self.ignore_patterns = [p.strip() for p in patterns.split(",") if p.strip()]
+        self.apply_ignore_rules()
+
     def get_file_icon(self, filename):
         """Retorna um ícone baseado na extensão do arquivo"""
-        ext = os.path.splitext(filename)[1].lower()
-        icons = {
-            '.py': '🐍', '.js': '🟨', '.html': '🌐', '.css': '🎨',
-            '.md': '📝', '.txt': '📄', '.json': '📋', '.xml': '📄',
-            '.jpg': '🖼️', '.png': '🖼️', '.gif': '🖼️', '.svg': '🖼️',
-            '.pdf': '📕', '.doc': '📘', '.docx': '📘',
-            '.zip': '📦', '.rar': '📦', '.7z': '📦',
-            '.exe': '⚙️', '.bat': '⚙️', '.sh': '⚙️'
-        }
-        return icons.get(ext, '📄')
+        return get_file_icon(filename)
 
     def get_file_size(self, file_path):
         """Obtém o tamanho formatado do arquivo"""
         try:
-            size = os.path.getsize(file_path)
-            if size < 1024:
-                return f"{size} B"
-            elif size < 1024 * 1024:
-                return f"{size / 1024:.1f} KB"
-            elif size < 1024 * 1024 * 1024:
-                return f"{size / (1024 * 1024):.1f} MB"
-            else:
-                return f"{size / (1024 * 1024 * 1024):.1f} GB"
-        except:
+            return format_size(os.path.getsize(file_path))
+        except OSError:
             return "0 B"
 
     def on_click(self, event):
@@ -510,152 +1028,264 @@ class ModernFolderContentApp:
         values = self.tree.item(node, "values")
         if not values or values[0] == "DUMMY":
             return
+        if values[0] == "MORE":
+            self.show_more(node)
+            return
         
-        path = values[0]
-        text = self.tree.item(node, "text")
-        
-        if text.startswith("☐"):
-            # Marcar
-            new_text = text.replace("☐", "☑️", 1)
-            self.tree.item(node, text=new_text)
-            self.selected_items.add(path)
-            self.mark_children(node, True)
-
-            # 🔥 NOVO: Atualizar nós pais também ao marcar
-            self.update_parent_selection(node)
+        # O nó e os pais mudam na hora; os descendentes visíveis, na próxima atualização da tela
+        changed = self.selection.toggle(values[0])
+        self.refresh_checkboxes(changed)
+        self.schedule_checkbox_refresh()
+        self.update_selection_display()
 
-        elif text.startswith("☑️"):
-            # Desmarcar
-            new_text = text.replace("☑️", "☐", 1)
-            self.tree.item(node, text=new_text)
-            self.selected_items.discard(path)
-            self.mark_children(node, False)
+    @staticmethod
+    def checkbox_for(state):
+        """Indicador de seleção de um estado do SelectionModel"""
+        if state == SELECTED:
+            return "☑️"
+        if state == PARTIAL:
+            return "◩"
+        return "☐"
 
-            # Atualizar nós pais quando um item é desmarcado
-            self.update_parent_selection(node)
+    def refresh_checkboxes(self, paths):
+        """Atualiza o indicador ☐/◩/☑️ dos itens informados (só os que mudaram)"""
+        for path in paths:
+            node = self.nodes.get(path)
+            if not node:
+                continue
+            
+            text = self.tree.item(node, "text")
+            old = next((box for box in ("☑️", "◩") if text.startswith(box)), "☐")
+            new = self.checkbox_for(self.selection.state(path))
+            if new != old:
+                self.tree.item(node, text=new + text[len(old):])
 
-        
-        self.update_selection_display()
+    def schedule_checkbox_refresh(self):
+        """Agenda a atualização dos indicadores das linhas visíveis"""
+        if not self.checkbox_refresh_pending:
+            self.checkbox_refresh_pending = True
+            self.root.after_idle(self.refresh_visible_checkboxes)
 
-    def update_parent_selection(self, node):
-        """Atualiza o estado de seleção dos nós pais baseado nos filhos"""
-        parent = self.tree.parent(node)
-        if not parent:
-            return
+    def refresh_visible_checkboxes(self):
+        """Atualiza os indicadores apenas das linhas exibidas na tela.
 
-        parent_values = self.tree.item(parent, "values")
-        if not parent_values or parent_values[0] == "DUMMY":
+        Linhas fora da área visível (ou dentro de pastas recolhidas) são
+        atualizadas quando aparecem: rolar, expandir ou redimensionar a
+        árvore chama on_tree_yscroll, que agenda esta atualização.
+        """
+        self.checkbox_refresh_pending = False
+        first = self.tree.identify_row(1)
+        bbox = self.tree.bbox(first) if first else None
+        if not bbox:
             return
+        
+        row_height = max(1, bbox[3])
+        height = self.tree.winfo_height()
+        paths = []
+        y = bbox[1] + row_height // 2
+        while y < height:
+            node = self.tree.identify_row(y)
+            if not node:
+                break
+            values = self.tree.item(node, "values")
+            if values and values[0] not in ("DUMMY", "MORE"):
+                paths.append(values[0])
+            y += row_height
+        self.refresh_checkboxes(paths)
 
-        # Verificar se todos os filhos estão selecionados
-        all_children_selected = True
-        any_child_selected = False
-        for child in self.tree.get_children(parent):
-            child_values = self.tree.item(child, "values")
-            if child_values and child_values[0] != "DUMMY":
-                child_path = child_values[0]
-                if child_path in self.selected_items:
-                    any_child_selected = True
-                else:
-                    all_children_selected = False
-
-        parent_path = parent_values[0]
-        parent_text = self.tree.item(parent, "text")
-
-        # Caso todos os filhos estejam selecionados → marca o pai
-        if all_children_selected and parent_text.startswith("☐"):
-            new_text = parent_text.replace("☐", "☑️", 1)
-            self.tree.item(parent, text=new_text)
-            self.selected_items.add(parent_path)
-            self.update_parent_selection(parent)
-
-        # Caso nenhum ou só alguns filhos estejam selecionados → desmarca o pai
-        elif not all_children_selected and parent_text.startswith("☑️"):
-            new_text = parent_text.replace("☑️", "☐", 1)
-            self.tree.item(parent, text=new_text)
-            self.selected_items.discard(parent_path)
-            self.update_parent_selection(parent)
-
-    def mark_children(self, node, select):
-        """Marca/desmarca filhos recursivamente"""
-        for child in self.tree.get_children(node):
-            values = self.tree.item(child, "values")
-            if not values or values[0] == "DUMMY":
-                continue
-            
-            path = values[0]
-            text = self.tree.item(child, "text")
-            
-            if select and text.startswith("☐"):
-                new_text = text.replace("☐", "☑️", 1)
-                self.tree.item(child, text=new_text)
-                self.selected_items.add(path)
-            elif not select and text.startswith("☑️"):
-                new_text = text.replace("☑️", "☐", 1)
-                self.tree.item(child, text=new_text)
-                self.selected_items.discard(path)
-            
-            self.mark_children(child, select)
+    def on_tree_yscroll(self, first, last):
+        """Repassa a rolagem à barra e atualiza os indicadores que entraram na tela"""
+        self.v_scrollbar.set(first, last)
+        self.schedule_checkbox_refresh()
 
     def toggle_all(self):
         """Marca/desmarca todos os itens"""
-        select_all = self.select_all_var.get()
-        
-        for root_node in self.tree.get_children():
-            values = self.tree.item(root_node, "values")
-            if not values or values[0] == "DUMMY":
-                continue
-            
-            text = self.tree.item(root_node, "text")
-            path = values[0]
-            
-            if select_all and text.startswith("☐"):
-                new_text = text.replace("☐", "☑️", 1)
-                self.tree.item(root_node, text=new_text)
-                self.selected_items.add(path)
-            elif not select_all and text.startswith("☑️"):
-                new_text = text.replace("☑️", "☐", 1)
-                self.tree.item(root_node, text=new_text)
-                self.selected_items.discard(path)
-            
-            self.mark_children(root_node, select_all)
-        
+        changed = self.selection.set_all(self.select_all_var.get())
+        self.refresh_checkboxes(changed)
+        self.schedule_checkbox_refresh()
         self.update_selection_display()
 
     def expand_all(self):
-        """Expande toda a árvore"""
-        def expand_recursive(node):
-            self.tree.item(node, open=True)
-            for child in self.tree.get_children(node):
-                expand_recursive(child)
+        """Expande toda a árvore, carregando também as pastas ainda não abertas.
+
+        As pastas são listadas em segundo plano, em largura, até o limite de
+        expand_budget itens; a árvore recebe os resultados em lotes de no
+        máximo EXPAND_SLICE_MS (root.after), sem travar a interface.
+        """
+        folder = self.folder_path.get()
+        if folder not in self.nodes:
+            return
+        self.cancel_expand()
         
-        for root_node in self.tree.get_children():
-            expand_recursive(root_node)
+        scanner = self.scanner
+        budget = self.expand_budget
         
-        self.update_status("🔍 Estrutura expandida completamente", "info")
+        def scan(task):
+            pending = deque([folder])
+            inserted = 0
+            while pending:
+                task.check()
+                path = pending.popleft()
+                try:
+                    listing = scanner.listdir(path, stats=False)
+                except OSError:
+                    continue
+                stop = min(TREE_PAGE_SIZE, len(listing))
+                if inserted + stop > budget:
+                    return inserted, True
+                scanner.fill_stats(listing, 0, stop)
+                inserted += stop
+                self.worker.post(task, self.on_expand_listing, task, path, listing)
+                pending.extend(entry.path for entry in listing[:stop] if entry.is_dir)
+            return inserted, False
+        
+        def on_done(result):
+            inserted, truncated = result
+            if truncated:
+                self.expand_message = (f"⚠️ Expansão limitada a {inserted} itens; "
+                                       "expanda as pastas restantes manualmente", "warning")
+            else:
+                self.expand_message = ("🔍 Estrutura expandida completamente", "info")
+            self.schedule_expand_drain()
+        
+        self.update_status("🔍 Expandindo estrutura...", "info")
+        self.expand_task = self.worker.submit(
+            scan,
+            on_done=on_done,
+            on_error=lambda e: self.update_status(f"❌ Erro ao expandir: {e}", "error")
+        )
 
-    def collapse_all(self):
-        """Recolhe toda a árvore"""
-        def collapse_recursive(node):
-            self.tree.item(node, open=False)
-            for child in self.tree.get_children(node):
-                collapse_recursive(child)
+    def on_expand_listing(self, task, path, listing):
+        """Recebe (na thread do Tk) uma pasta listada pelo Expandir Tudo"""
+        if task.cancelled:
+            return
+        self.expand_pending.append((path, listing))
+        self.schedule_expand_drain()
+
+    def schedule_expand_drain(self):
+        if not self.expand_drain_scheduled:
+            self.expand_drain_scheduled = True
+            self.root.after(1, self.drain_expand_queue)
+
+    def drain_expand_queue(self):
+        """Insere na árvore as pastas pendentes até esgotar a fatia de tempo"""
+        self.expand_drain_scheduled = False
+        deadline = time.monotonic() + EXPAND_SLICE_MS / 1000
+        while self.expand_pending:
+            path, listing = self.expand_pending.popleft()
+            node = self.nodes.get(path)
+            if node:
+                self.load_children(node, path, listing)
+                self.tree.item(node, open=True)
+            if time.monotonic() >= deadline:
+                self.schedule_expand_drain()
+                return
         
-        for root_node in self.tree.get_children():
-            collapse_recursive(root_node)
+        if self.expand_message:
+            self.update_status(*self.expand_message)
+            self.expand_message = None
+            self.schedule_checkbox_refresh()
+
+    def cancel_expand(self):
+        """Interrompe um "Expandir Tudo" em andamento"""
+        if self.expand_task:
+            self.expand_task.cancel()
+            self.expand_task = None
+        self.expand_pending.clear()
+        self.expand_message = None
+
+    def collapse_all(self):
+        """Recolhe toda a árvore (só pastas já carregadas podem estar abertas)"""
+        self.cancel_expand()
+        for path in self.listings:
+            node = self.nodes.get(path)
+            if node:
+                self.tree.item(node, open=False)
         
         self.update_status("📁 Estrutura recolhida", "info")
 
     def update_selection_display(self):
-        """Atualiza a exibição de seleção"""
-        count = len(self.selected_items)
+        """Atualiza a exibição de seleção (os tokens são recontados em segundo plano)"""
+        count = self.selection.count()
+        self.selection_tokens = None
+        self.schedule_token_count()
+        self.refresh_selection_label()
         if count == 0:
-            self.selection_label.config(text="")
             self.update_status("Selecione itens para incluir na documentação", "info")
         else:
-            self.selection_label.config(text=f"✓ {count} itens selecionados")
             self.update_status(f"✅ {count} item(s) prontos para documentação", "success")
 
+    def refresh_selection_label(self):
+        """Mostra itens, arquivos, bytes e tokens da seleção.
+
+        Arquivos e bytes vêm dos totais por pasta (SizeTotals) somados na
+        contagem feita ao abrir o projeto, então o custo é proporcional às
+        regras da seleção, não aos arquivos. Os tokens são estimados pelo
+        tamanho até a contagem em segundo plano (count_tokens) terminar.
+        """
+        count = self.selection.count()
+        if count == 0:
+            self.selection_label.config(text="")
+            return
+        
+        selected_items, excluded_items = self.selection.selection_rules()
+        files, size, complete = self.size_totals.selection(selected_items, excluded_items, self.scanner)
+        pending = "" if complete else "+"
+        if self.selection_tokens is not None:
+            tokens = f"≈ {self.selection_tokens[1]:,} tokens"
+        else:
+            tokens = f"~{size // CHARS_PER_TOKEN:,}{pending} tokens (estimado)"
+        self.selection_label.config(
+            text=f"✓ {count} itens • {files}{pending} arquivo(s) • {format_size(size)}{pending} • {tokens}"
+        )
+
+    def schedule_token_count(self):
+        """Agenda a contagem de tokens da seleção (TOKEN_COUNT_DELAY_MS após a última mudança)"""
+        if self.token_task:
+            self.token_task.cancel()
+            self.token_task = None
+        if self.token_after is not None:
+            self.root.after_cancel(self.token_after)
+            self.token_after = None
+        if self.selection.count():
+            self.token_after = self.root.after(TOKEN_COUNT_DELAY_MS, self.count_tokens)
+
+    def count_tokens(self):
+        """Conta em segundo plano os tokens da documentação da seleção atual.
+
+        Só os caminhos das regras de seleção ainda não contados ou com
+        arquivos alterados (SelectionTokens, que confere os demais só com
+        stats) são percorridos: marcar ou desmarcar um item conta só esse
+        item. O total já conhecido é mostrado enquanto a conferência roda.
+        Cada arquivo é lido só na primeira contagem: o TokenCache guarda o
+        resultado por (caminho, mtime, tamanho) e é usado também pela
+        exportação com orçamento.
+        """
+        self.token_after = None
+        selected_items, excluded_items = self.selection.selection_rules()
+        root_path = self.folder_path.get()
+        rule_tokens = self.rule_tokens
+        if not rule_tokens.missing(selected_items, excluded_items):
+            self.selection_tokens = rule_tokens.selection(root_path, selected_items, excluded_items)
+            self.refresh_selection_label()
+        scanner = self.scanner
+        
+        def on_done(_):
+            self.token_task = None
+            self.selection_tokens = rule_tokens.selection(root_path, selected_items, excluded_items)
+            self.refresh_selection_label()
+        
+        def on_error(e):
+            self.token_task = None
+        
+        self.token_task = self.worker.submit(
+            lambda task: rule_tokens.count(
+                root_path, [*selected_items, *excluded_items], scanner, self.token_cache, task, self.max_file_size
+            ),
+            on_done=on_done,
+            on_error=on_error
+        )
+
     def update_status(self, message, status_type="info"):
         """Atualiza status com ícones apropriados"""
         icons = {
@@ -687,20 +1317,275 @@ class ModernFolderContentApp:
             event.widget.insert(0, "Buscar arquivos...")
             event.widget.config(foreground='gray')
 
+    def search_term(self):
+        """Termo digitado na busca ("" se vazio ou com o texto de exemplo)"""
+        search_term = self.search_var.get().strip().lower()
+        if search_term == "buscar arquivos...":
+            return ""
+        return search_term
+
     def on_search_change(self, *args):
-        """Manipula mudanças na busca"""
-        search_term = self.search_var.get().lower()
-        if search_term and search_term != "buscar arquivos...":
-            self.highlight_search_results(search_term)
-
-    def highlight_search_results(self, search_term):
-        """Destaca resultados da busca"""
-        # Implementação básica - pode ser expandida
-        pass
+        """Manipula mudanças na busca (a busca roda SEARCH_DEBOUNCE_MS após a última tecla)"""
+        if self.content_search_var.get():
+            # A busca no conteúdo lê os arquivos: só roda com Enter
+            return
+        self.schedule_search()
+
+    def schedule_search(self):
+        if self.search_after is not None:
+            self.root.after_cancel(self.search_after)
+        self.search_after = self.root.after(SEARCH_DEBOUNCE_MS, self.run_search)
+
+    def run_search(self):
+        """Busca o termo no índice de nomes e destaca os resultados na árvore"""
+        if self.search_after is not None:
+            self.root.after_cancel(self.search_after)
+            self.search_after = None
+        
+        if self.content_search_var.get():
+            self.run_grep()
+            return
+        
+        self.cancel_grep()
+        search_term = self.search_term()
+        if not search_term or not self.folder_path.get():
+            self.search_results = []
+            self.highlight_search_results([])
+            return
+        
+        results, truncated = self.name_index.search(search_term, SEARCH_RESULT_LIMIT)
+        self.search_results = results
+        self.highlight_search_results(results)
+        
+        if not results:
+            self.update_status(f"🔍 Nenhum item encontrado para \"{search_term}\"", "warning")
+            return
+        count = f"{len(results)}+" if truncated else str(len(results))
+        message = f"🔍 {count} item(s) encontrados"
+        if len(results) > SEARCH_REVEAL_LIMIT:
+            message += f"; exibindo os {SEARCH_REVEAL_LIMIT} primeiros na árvore"
+        if self.folder_info_task:
+            message += " (indexando...)"
+        self.update_status(message, "info")
+
+    def highlight_search_results(self, paths):
+        """Destaca os itens encontrados, abrindo as pastas até eles.
+
+        Só os SEARCH_REVEAL_LIMIT primeiros são revelados (pastas não
+        carregadas são carregadas, e páginas de pastas enormes são
+        inseridas até o item); o primeiro é rolado para a área visível.
+        """
+        for node in self.search_matches:
+            if self.tree.exists(node):
+                tags = self.tree.item(node, "tags")
+                self.tree.item(node, tags=[tag for tag in tags if tag != 'match'])
+        self.search_matches = []
+        
+        for path in paths[:SEARCH_REVEAL_LIMIT]:
+            self.highlight_path(path)
+        
+        if self.search_matches:
+            self.tree.see(self.search_matches[0])
+            self.schedule_checkbox_refresh()
+
+    def highlight_path(self, path):
+        """Revela e destaca um item encontrado"""
+        node = self.reveal_path(path)
+        if node:
+            tags = self.tree.item(node, "tags")
+            self.tree.item(node, tags=[tag for tag in tags if tag != 'match'] + ['match'])
+            self.search_matches.append(node)
+        return node
+
+    def reveal_path(self, path):
+        """Garante que o item exista na árvore, abrindo as pastas acima dele; retorna o nó ou None"""
+        folder = self.folder_path.get()
+        chain = []
+        while path not in self.nodes:
+            chain.append(path)
+            parent = os.path.dirname(path)
+            if parent == path or path == folder:
+                return None
+            path = parent
+        
+        for child in reversed(chain):
+            node = self.nodes[path]
+            self.load_children(node, path)
+            self.tree.item(node, open=True)
+            if child not in self.nodes and not self.insert_until(node, path, child):
+                return None
+            path = child
+        return self.nodes[path]
+
+    def insert_until(self, parent_node, path, child):
+        """Insere as páginas de uma pasta até incluir o item child (no lugar do "Mostrar mais")"""
+        listing = self.listings.get(path)
+        if listing is None:
+            return False
+        index = listing.index(os.path.basename(child))
+        if index < 0:
+            return False
+        
+        children = self.tree.get_children(parent_node)
+        values = self.tree.item(children[-1], "values") if children else ()
+        if not values or values[0] != "MORE":
+            return False
+        start = int(values[2])
+        self.tree.delete(children[-1])
+        self.insert_page(parent_node, path, start, (index // TREE_PAGE_SIZE + 1) * TREE_PAGE_SIZE)
+        return child in self.nodes
+
+    def run_grep(self):
+        """Procura o termo no conteúdo dos arquivos do projeto, em segundo plano.
+
+        Os arquivos são lidos por um pool de processos (grep_files) e os
+        resultados chegam à árvore em lotes, à medida que são encontrados.
+        """
+        self.cancel_grep()
+        self.search_results = []
+        self.highlight_search_results([])
+        
+        search_term = self.search_var.get().strip()
+        folder = self.folder_path.get()
+        if not self.search_term() or not folder:
+            return
+        try:
+            matcher = compile_pattern(search_term, regex=self.regex_search_var.get())
+        except re.error as e:
+            self.update_status(f"❌ Expressão regular inválida: {e}", "error")
+            return
+        
+        scanner = self.scanner
+        max_file_size = self.max_file_size
+        
+        def grep(task):
+            stats = {}
+            batch = []
+            last_post = time.monotonic()
+            for match in grep_files(folder, matcher, scanner=scanner, task=task, stats=stats,
+                                    max_size=max_file_size):
+                batch.append(match)
+                if time.monotonic() - last_post >= BackgroundTask.PROGRESS_INTERVAL:
+                    self.worker.post(task, self.on_grep_matches, task, batch)
+                    batch = []
+                    last_post = time.monotonic()
+            if batch:
+                self.worker.post(task, self.on_grep_matches, task, batch)
+            return stats
+        
+        def on_done(stats):
+            self.grep_task = None
+            skipped = f" ({stats['skipped']} ignorado(s))" if stats['skipped'] else ""
+            self.update_status(
+                f"🔍 {len(self.search_results)} de {stats['files']} arquivo(s) contêm \"{search_term}\"{skipped}",
+                "info" if self.search_results else "warning"
+            )
+        
+        def on_error(e):
+            self.grep_task = None
+            self.update_status(f"❌ Erro na busca: {e}", "error")
+        
+        self.update_status(f"🔍 Buscando \"{search_term}\" no conteúdo dos arquivos...", "info")
+        self.grep_task = self.worker.submit(grep, on_done=on_done, on_error=on_error)
+
+    def on_grep_matches(self, task, matches):
+        """Recebe (na thread do Tk) um lote de arquivos encontrados pela busca no conteúdo"""
+        if task.cancelled:
+            return
+        for path, line_number, line in matches:
+            self.search_results.append(path)
+            if len(self.search_matches) < SEARCH_REVEAL_LIMIT and self.highlight_path(path):
+                if len(self.search_matches) == 1:
+                    self.tree.see(self.search_matches[0])
+        self.schedule_checkbox_refresh()
+        self.update_status(f"🔍 {len(self.search_results)} arquivo(s) encontrados (buscando...)", "info")
+
+    def cancel_grep(self):
+        """Interrompe uma busca no conteúdo em andamento"""
+        if self.grep_task:
+            self.grep_task.cancel()
+            self.grep_task = None
+
+    def select_search_results(self):
+        """Marca todos os itens encontrados pela última busca (nome ou conteúdo)"""
+        changed = []
+        for path in self.search_results:
+            if self.reveal_path(path):
+                changed.extend(self.selection.set_selected(path, True))
+        if not changed:
+            self.update_status("🔍 Nenhum resultado de busca para marcar", "warning")
+            return
+        self.refresh_checkboxes(changed)
+        self.schedule_checkbox_refresh()
+        self.update_selection_display()
+
+    def select_changed(self):
+        """Marca só os arquivos alterados desde uma revisão do git ou uma data (desmarcando o resto).
+
+        O conjunto vem de `git diff` contra a revisão (nenhum outro arquivo é
+        consultado) ou do mtime dos arquivos, consultado em segundo plano
+        sem ler conteúdo (folder_content_changes).
+        """
+        folder = self.folder_path.get()
+        if not folder:
+            messagebox.showwarning("Aviso", "Selecione uma pasta primeiro!")
+            return
+        since = simpledialog.askstring(
+            "Marcar alterados",
+            "Revisão do git (ex.: main, HEAD~1) ou período/data (ex.: 2h, 7d, 2024-05-01):",
+            initialvalue=self.changed_since,
+            parent=self.root
+        )
+        if not since or not since.strip():
+            return
+        since = self.changed_since = since.strip()
+        if self.changed_task:
+            self.changed_task.cancel()
+        
+        scanner = self.scanner
+        
+        def find(task):
+            try:
+                cutoff = parse_cutoff(since)
+            except ValueError:
+                if isinstance(scanner, GitScanner):
+                    names = changed_since_ref(scanner.repo, since, scanner.commit)
+                elif scanner.local:
+                    names = changed_since_ref(folder, since)
+                else:
+                    raise ValueError("revisões do git não se aplicam a arquivos compactados") from None
+                return [os.path.join(folder, name) for name in names]
+            return modified_since(folder, cutoff, scanner, task)
+        
+        def on_progress(checked, changed):
+            self.update_status(f"🕒 {changed} alterado(s) em {checked} arquivo(s) verificados...", "info")
+        
+        def on_done(paths):
+            self.changed_task = None
+            changed = self.selection.set_all(False)
+            for path in paths:
+                if self.reveal_path(path):
+                    changed.extend(self.selection.set_selected(path, True))
+            self.select_all_var.set(False)
+            self.refresh_checkboxes(changed)
+            self.schedule_checkbox_refresh()
+            self.update_selection_display()
+            self.update_status(f"🕒 {len(paths)} arquivo(s) alterado(s) desde {since} marcado(s)",
+                               "info" if paths else "warning")
+        
+        def on_error(e):
+            self.changed_task = None
+            self.update_status(f"❌ Não foi possível listar os alterados: {e}", "error")
+        
+        self.update_status(f"🕒 Procurando arquivos alterados desde {since}...", "info")
+        self.changed_task = self.worker.submit(find, on_progress=on_progress, on_done=on_done, on_error=on_error)
 
     def generate_file(self):
         """Gera o arquivo de documentação"""
-        if not self.selected_items:
+        if self.export_task:
+            return
+        
+        if not self.selection.count():
             messagebox.showwarning(
                 "Nenhum item selecionado",
                 "Por favor, selecione pelo menos um arquivo ou pasta para incluir na documentação."
@@ -712,6 +1597,12 @@ class ModernFolderContentApp:
             messagebox.showerror("Erro", "Nenhuma pasta foi selecionada.")
             return
         
+        budget = self.token_budget_var.get().strip().replace(".", "").replace(",", "")
+        if budget and not (budget.isdigit() and int(budget) > 0):
+            messagebox.showerror("Erro", "O máximo de tokens deve ser um número inteiro positivo.")
+            return
+        budget = int(budget) if budget else None
+        
         # Gerar nome padrão mais descritivo
         folder_name = os.path.basename(root_path)
         default_name = f"{folder_name}_documentacao.txt"
@@ -723,6 +1614,9 @@ class ModernFolderContentApp:
             filetypes=[
                 ("Arquivos de Texto", "*.txt"),
                 ("Arquivos Markdown", "*.md"),
+                ("Texto comprimido (gzip)", "*.txt.gz"),
+                ("Markdown comprimido (xz)", "*.md.xz"),
+                ("Texto comprimido (bzip2)", "*.txt.bz2"),
                 ("Todos os Arquivos", "*.*")
             ],
             initialfile=default_name,
@@ -732,115 +1626,479 @@ class ModernFolderContentApp:
         if not file_path:
             return
         
-        try:
-            self.update_status("📝 Gerando documentação...", "info")
-            self.root.update()  # Atualizar interface
-            
-            # Gerar conteúdo
-            content = self.generate_content()
-            
-            # Salvar arquivo
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
-            # Sucesso
-            item_count = len(self.selected_items)
+        # Capturar o estado atual: a exportação não acessa o Tk fora da thread principal
+        selected_items, excluded_items = self.selection.selection_rules()
+        item_count = self.selection.count()
+        
+        def on_progress(file_count, rel_path):
+            self.update_status(f"📝 Gerando documentação... {file_count} arquivo(s) • {rel_path}", "info")
+        
+        def on_done(stats):
+            self.finish_export_ui()
             success_msg = (f"📄 Documentação gerada com sucesso!\n\n"
                           f"📂 Local: {file_path}\n"
                           f"📊 Itens incluídos: {item_count}\n"
+                          f"📄 Arquivos exportados: {stats['files']}\n"
+                          f"🚫 Ignorados (binários ou grandes): {stats.get('skipped', 0)}\n"
                           f"📏 Tamanho: {self.get_file_size(file_path)}")
+            if budget:
+                success_msg += (f"\n🔢 Tokens (estimados): {stats['tokens']:,} de {budget:,}\n"
+                                f"✂️ Truncados: {stats['truncated']} • Fora do orçamento: {stats['omitted']}")
             
             messagebox.showinfo("Sucesso", success_msg)
-            self.update_status(f"✅ Documentação salva: {os.path.basename(file_path)}", "success")
-            
-        except Exception as e:
+            self.last_output = (file_path, budget)
+            self.update_status(
+                f"✅ Documentação salva: {os.path.basename(file_path)} • {self.export_detail(stats, budget)}",
+                "success"
+            )
+        
+        def on_error(e):
+            self.finish_export_ui()
             error_msg = f"Erro ao gerar documentação:\n{str(e)}"
             messagebox.showerror("Erro", error_msg)
             self.update_status(f"❌ Erro ao salvar: {str(e)}", "error")
+        
+        def on_cancel():
+            self.finish_export_ui()
+            self.update_status("⚠️ Geração da documentação cancelada", "warning")
+        
+        self.update_status("📝 Gerando documentação...", "info")
+        self.start_export_ui()
+        self.export_task = self.worker.submit(
+            self.write_content, file_path, root_path, selected_items, excluded_items, self.scanner,
+            self.incremental_var.get(), budget,
+            on_progress=on_progress,
+            on_done=on_done,
+            on_error=on_error,
+            on_cancel=on_cancel
+        )
+
+    @staticmethod
+    def export_detail(stats, budget=None):
+        """Resumo de uma exportação para a barra de status (tokens, modo incremental ou cache)"""
+        if budget:
+            return f"≈ {stats['tokens']:,} tokens"
+        if 'incremental' in stats and stats['incremental'] != 'full':
+            return f"incremental: {stats['sections_rewritten']} seção(ões) atualizada(s)"
+        return (f"cache: {stats.get('cache_hits', 0)} reaproveitado(s), "
+                f"{stats.get('cache_misses', 0)} lido(s)")
+
+    def start_export_ui(self):
+        """Ajusta a interface para uma exportação em andamento"""
+        self.generate_btn.config(state='disabled')
+        self.cancel_btn.pack(side=tk.RIGHT, padx=(10, 0))
+        self.progress_bar.pack(side=tk.RIGHT, padx=(10, 0))
+        self.progress_bar.start(15)
+
+    def finish_export_ui(self):
+        """Restaura a interface após o término da exportação"""
+        self.export_task = None
+        self.progress_bar.stop()
+        self.progress_bar.pack_forget()
+        self.cancel_btn.pack_forget()
+        self.generate_btn.config(state='normal')
+
+    def cancel_export(self):
+        """Cancela a exportação em andamento"""
+        if self.export_task:
+            self.export_task.cancel()
+            self.update_status("⏳ Cancelando geração...", "warning")
 
     def generate_content(self):
-        """Gera o conteúdo do arquivo de documentação"""
-        root_path = self.folder_path.get()
-        folder_name = os.path.basename(root_path)
+        """Gera o conteúdo do arquivo de documentação como uma única string"""
+        selected_items, excluded_items = self.selection.selection_rules()
+        return ''.join(iter_documentation(
+            self.folder_path.get(), selected_items, self.read_workers,
+            scanner=self.scanner, content_cache=self.content_cache, max_file_size=self.max_file_size,
+            excluded_items=excluded_items
+        ))
+
+    def write_content(self, task, file_path, root_path, selected_items, excluded_items, scanner,
+                      incremental=False, budget=None):
+        """Grava a documentação em disco (executado em segundo plano).
+
+        Retorna as estatísticas da exportação (arquivos, uso do cache e modo
+        incremental). Com budget, a saída é limitada a esse número de tokens
+        (o modo incremental não se aplica).
+        """
+        stats = {}
+        if budget:
+            write_documentation_budget(
+                file_path, root_path, selected_items, budget, self.read_workers, task,
+                stats=stats, scanner=scanner, cache=self.token_cache, excluded_items=excluded_items,
+                max_file_size=self.max_file_size, compress_level=self.compress_level
+            )
+            return stats
+        write = write_documentation_incremental if incremental else write_documentation
+        write(
+            file_path, root_path, selected_items, self.read_workers, task,
+            scanner=scanner, content_cache=self.content_cache, stats=stats, max_file_size=self.max_file_size,
+            excluded_items=excluded_items, raw_copy_size=self.raw_copy_size, compress_level=self.compress_level
+        )
+        return stats
+
+    def toggle_watch(self):
+        """Liga/desliga o modo de observação"""
+        if self.watch_var.get():
+            self.start_watch()
+        else:
+            self.stop_watch()
+            self.update_status("👁 Monitoramento desligado", "info")
+
+    def start_watch(self):
+        """Passa a monitorar as pastas do projeto (inotify no Linux, senão polling).
+
+        Tudo é registrado em segundo plano (no polling, registrar uma pasta
+        aberta faz um stat por arquivo): primeiro as pastas abertas na
+        árvore, com o conteúdo dos arquivos, depois as demais, ao percorrer
+        o projeto (pelas listagens do Scanner, sem os itens ignorados).
+        """
+        self.stop_watch()
+        folder = self.folder_path.get()
+        if not folder:
+            return
+        if not self.scanner.local:
+            self.watch_var.set(False)
+            self.update_status("👁 O monitoramento não se aplica a arquivos compactados nem a revisões do git",
+                               "warning")
+            return
+        
+        watcher = self.watcher = create_watcher()
+        opened = [folder, *self.listings]
+        scanner = self.scanner
+        
+        def watch_dirs(task):
+            for path in opened:
+                task.check()
+                watcher.watch(path, files=True)
+            for path, _, _ in scanner.walk(folder):
+                task.check()
+                watcher.watch(path)
+        
+        def on_done(_):
+            self.watch_task = None
+            if self.watcher is not watcher:
+                return
+            self.update_status(f"👁 Monitorando {len(watcher)} pasta(s) ({watcher.name})", "info")
+        
+        def on_error(e):
+            self.watch_task = None
+            self.update_status(f"❌ Erro ao listar as pastas a monitorar: {e}", "error")
+        
+        self.watch_task = self.worker.submit(watch_dirs, on_done=on_done, on_error=on_error)
+        self.schedule_watch_poll()
+
+    def stop_watch(self):
+        """Encerra o monitoramento e a atualização automática pendente"""
+        for task in (self.watch_task, self.watch_poll_task, *self.watch_walks):
+            if task:
+                task.cancel()
+        self.watch_task = self.watch_poll_task = None
+        self.watch_walks.clear()
+        if self.watch_after:
+            self.root.after_cancel(self.watch_after)
+            self.watch_after = None
+        if self.auto_export_after:
+            self.root.after_cancel(self.auto_export_after)
+            self.auto_export_after = None
+        if self.watcher is not None:
+            self.watcher.close()
+            self.watcher = None
+
+    def schedule_watch_poll(self):
+        """Agenda a próxima consulta ao monitoramento"""
+        self.watch_after = self.root.after(int(self.watcher.interval * 1000), self.poll_watch)
+
+    def poll_watch(self):
+        """Consulta o monitoramento em segundo plano e aplica as alterações à árvore.
+
+        No polling, a consulta faz um stat por pasta monitorada; por isso
+        ela roda em segundo plano (no watch_worker, uma thread à parte do
+        pool das demais tarefas), junto com a releitura das pastas e
+        arquivos alterados (read_changes), e só a aplicação do resultado
+        (apply_changes) fica na thread do Tk. A próxima consulta é agendada
+        ao fim desta.
+        """
+        self.watch_after = None
+        watcher = self.watcher
+        if watcher is None:
+            return
+        relevant = self.change_filter()
+        
+        def poll(task):
+            dirs, files = watcher.changes()
+            task.check()
+            return (dirs, files, *self.read_changes(dirs, files, relevant))
+        
+        def on_done(result):
+            self.watch_poll_task = None
+            if self.watcher is not watcher:
+                return
+            dirs, files, folders, entries = result
+            if dirs or files:
+                self.apply_changes(dirs, files, folders, entries)
+            if self.watcher is watcher:
+                self.schedule_watch_poll()
+        
+        def on_error(e):
+            self.watch_poll_task = None
+            if self.watcher is watcher:
+                self.schedule_watch_poll()
+        
+        self.watch_poll_task = self.watch_worker.submit(poll, on_done=on_done, on_error=on_error)
+
+    def watch_folders(self, paths):
+        """Registra no monitoramento, em segundo plano, pastas abertas na árvore (com o conteúdo dos arquivos)"""
+        watcher = self.watcher
         
-        lines = [
-            f"# Documentação do Projeto: {folder_name}",
-            f"Gerado automaticamente pelo Gerador de Conteúdo",
-            f"Data: {datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')}",
-            f"Caminho base: {root_path}",
-            "",
-            "=" * 60,
-            ""
-        ]
-        
-        processed_paths = set()
-        sorted_items = sorted(self.selected_items)
-        
-        for item_path in sorted_items:
-            if not os.path.exists(item_path) or item_path in processed_paths:
+        def watch_all(task):
+            for path in paths:
+                task.check()
+                watcher.watch(path, files=True)
+        
+        def finished(*_):
+            self.watch_walks.discard(task)
+        
+        task = self.worker.submit(watch_all, on_done=finished, on_error=finished, on_cancel=finished)
+        self.watch_walks.add(task)
+
+    def watch_subtrees(self, paths):
+        """Registra no monitoramento, em segundo plano, pastas novas e tudo abaixo delas"""
+        watcher = self.watcher
+        scanner = self.scanner
+        
+        def watch_all(task):
+            for top in paths:
+                for path, _, _ in scanner.walk(top):
+                    task.check()
+                    watcher.watch(path)
+        
+        def finished(*_):
+            self.watch_walks.discard(task)
+        
+        task = self.worker.submit(watch_all, on_done=finished, on_error=finished, on_cancel=finished)
+        self.watch_walks.add(task)
+
+    def change_filter(self):
+        """Função que diz se uma alteração vista no disco interessa ao projeto aberto"""
+        folder = self.folder_path.get()
+        output = self.last_output[0] if self.last_output else None
+        
+        def relevant(path):
+            # A própria saída (e o manifesto) não dispara uma nova exportação
+            inside = path == folder or path.startswith(folder.rstrip(os.sep) + os.sep)
+            return inside and not (output and path.startswith(output))
+        return relevant
+
+    def read_changes(self, dirs, files, relevant):
+        """Relê do disco, em segundo plano, as pastas e arquivos alterados.
+
+        Retorna ({pasta: (listagem anterior, nova listagem ou None se a
+        pasta sumiu)}, {arquivo: entrada atualizada ou None}), só com os
+        caminhos relevantes; os totais de tamanho das pastas já saem
+        atualizados. A listagem anterior vem do cache do Scanner e é lida
+        antes de listdir substituí-la.
+        """
+        scanner = self.scanner
+        folders, entries = {}, {}
+        for path in sorted(dirs):
+            if not relevant(path):
                 continue
-            
-            rel_path = os.path.relpath(item_path, os.path.dirname(root_path)).replace(os.sep, '/')
-            
-            if os.path.isdir(item_path):
-                lines.append(f"## 📁 {rel_path}/")
-                lines.append("")
-                processed_paths.add(item_path)
-                
-                # Incluir conteúdo da pasta se selecionada
-                self.add_folder_contents(item_path, lines, processed_paths, os.path.dirname(root_path))
+            cached = scanner.cache.listings.get(path)
+            previous = cached[1] if cached is not None else None
+            if previous is not None and scanner.ignore is not None:
+                previous = scanner.ignore.filter(path, previous)
+            try:
+                listing = scanner.listdir(path)
+            except OSError:
+                # Pasta apagada: a mudança aparece na listagem da pasta acima
+                listing = None
             else:
-                lines.append(f"### 📄 {rel_path}")
-                lines.append("```")
-                try:
-                    with open(item_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        if content.strip():
-                            lines.append(content)
-                        else:
-                            lines.append("[Arquivo vazio]")
-                except Exception as e:
-                    lines.append(f"[Erro ao ler arquivo: {e}]")
-                lines.append("```")
-                lines.append("")
-                processed_paths.add(item_path)
-        
-        return '\n'.join(lines)
-
-    def add_folder_contents(self, folder_path, lines, processed_paths, base_path):
-        """Adiciona conteúdo de uma pasta recursivamente"""
-        try:
-            for root, dirs, files in os.walk(folder_path):
-                dirs.sort()
-                files.sort()
-                
-                # Adicionar arquivos
-                for file_name in files:
-                    file_path = os.path.join(root, file_name)
-                    if file_path in processed_paths:
-                        continue
-                    
-                    rel_path = os.path.relpath(file_path, base_path).replace(os.sep, '/')
-                    lines.append(f"### 📄 {rel_path}")
-                    lines.append("```")
-                    
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                            if content.strip():
-                                lines.append(content)
-                            else:
-                                lines.append("[Arquivo vazio]")
-                    except Exception as e:
-                        lines.append(f"[Erro ao ler arquivo: {e}]")
-                    
-                    lines.append("```")
-                    lines.append("")
-                    processed_paths.add(file_path)
-                    
-        except Exception as e:
-            lines.append(f"[Erro ao processar pasta {folder_path}: {e}]")
-            lines.append("")
+                self.size_totals.add(path, listing)
+            folders[path] = (previous, listing)
+        
+        for path in files:
+            if path in entries or not relevant(path):
+                continue
+            entry = scanner.restat(path)
+            if entry is None or entry.is_dir:
+                entries[path] = None
+                continue
+            entries[path] = entry
+            parent = os.path.dirname(path)
+            cached = scanner.cache.listings.get(parent)
+            if cached is not None and not cached[1].missing_stats():
+                listing = cached[1] if scanner.ignore is None else scanner.ignore.filter(parent, cached[1])
+                self.size_totals.add(parent, listing)
+        return folders, entries
+
+    def apply_changes(self, dirs, files, folders, entries):
+        """Aplica à árvore, à seleção e aos totais as alterações vistas no disco.
+
+        folders e entries são o resultado de read_changes. Só os nós das
+        pastas afetadas são alterados: itens novos entram na posição certa
+        (com o estado de seleção da pasta), itens apagados saem e arquivos
+        alterados têm o tamanho atualizado; o restante da árvore e da
+        seleção fica como está. Se um arquivo incluído na seleção mudou, a
+        última saída é regravada (schedule_auto_export).
+        """
+        relevant = self.change_filter()
+        changed = []
+        created = set()
+        affected = False
+        counts = [0, 0, 0]  # criados, apagados, alterados
+        for path, (previous, listing) in folders.items():
+            added, removed = self.patch_folder(path, previous, listing, changed)
+            created.update(added)
+            counts[1] += len(removed)
+            affected = affected or any(self.selection.covers(p) for p in added if relevant(p))
+            affected = affected or any(covered for p, covered in removed if relevant(p))
+        counts[0] = len(created)
+        
+        for path, entry in entries.items():
+            if path in created or entry is None:
+                continue
+            counts[2] += 1
+            node = self.nodes.get(path)
+            if node:
+                checkbox = self.tree.item(node, "text").split(" ", 1)[0]
+                display_name, tags = self.display_entry(entry)
+                self.tree.item(node, text=f"{checkbox} {display_name}", tags=tags)
+            affected = affected or self.selection.covers(path)
+        
+        for path in (*dirs, *files):
+            self.rule_tokens.discard(path)
+        if not any(counts):
+            return
+        self.refresh_checkboxes(changed)
+        self.schedule_checkbox_refresh()
+        if affected:
+            self.selection_tokens = None
+            self.schedule_token_count()
+        self.refresh_selection_label()
+        self.update_status(f"👁 Alterações no disco: {counts[0]} criado(s), {counts[1]} apagado(s), "
+                           f"{counts[2]} modificado(s)", "info")
+        if affected:
+            self.schedule_auto_export()
+
+    def patch_folder(self, path, previous, listing, changed):
+        """Aplica a diferença entre duas listagens de uma pasta (seleção, árvore e monitoramento).
+
+        previous e listing vêm de read_changes (listing é None se a pasta
+        sumiu). Retorna (caminhos criados, [(caminho apagado, estava na
+        seleção)]); changed recebe os caminhos cujo indicador de seleção mudou.
+        """
+        if listing is None:
+            return [], []
+        previous = self.listings.get(path, previous)
+        
+        old = dict(previous.names_and_types()) if previous is not None else {}
+        new = dict(listing.names_and_types())
+        prefix = listing.prefix
+        removed = [(prefix + name, self.selection.covers(prefix + name))
+                   for name, is_dir in old.items() if new.get(name) != is_dir]
+        added = [prefix + name for name, is_dir in new.items() if old.get(name) != is_dir]
+        
+        for removed_path, _ in removed:
+            self.watcher.unwatch(removed_path)
+        # Enquanto a listagem inicial não termina, ela mesma registra as
+        # pastas já existentes: só as novas precisam ser percorridas
+        unwatched = [prefix + name for name, is_dir in new.items()
+                     if is_dir and prefix + name not in self.watcher
+                     and (self.watch_task is None or prefix + name in added)]
+        if unwatched:
+            self.watch_subtrees(unwatched)
+        
+        parent_node = self.nodes.get(path)
+        if path not in self.listings or parent_node is None:
+            return added, removed
+        
+        if removed:
+            gone = {removed_path for removed_path, _ in removed}
+            for removed_path, _ in removed:
+                changed.extend(self.selection.remove(removed_path))
+                node = self.nodes.get(removed_path)
+                if node:
+                    self.tree.delete(node)
+            below = tuple(removed_path + os.sep for removed_path in gone)
+            for known in [p for p in self.nodes if p in gone or p.startswith(below)]:
+                del self.nodes[known]
+                self.listings.pop(known, None)
+            self.search_matches = [node for node in self.search_matches if self.tree.exists(node)]
+        if len(listing) > len(added):
+            for added_path in added:
+                changed.extend(self.selection.add_child(added_path))
+        else:
+            # Nenhum filho antigo restou: os novos entram com o estado da pasta
+            self.selection.set_children(path, len(listing))
+        
+        # Os itens já exibidos continuam exibidos, mais os novos entre eles
+        shown = 0
+        for child in self.tree.get_children(parent_node):
+            if self.tree.item(child, "values")[:1] == ("MORE",):
+                self.tree.delete(child)
+            else:
+                shown += 1
+        stop = min(len(listing), shown + len(added))
+        for i, entry in enumerate(listing[:stop]):
+            node = self.nodes.get(entry.path)
+            if node is None:
+                self.insert_entry(parent_node, entry, self.checkbox_for(self.selection.state(entry.path)), i)
+            else:
+                self.tree.move(node, parent_node, i)
+        if len(listing) > stop:
+            self.tree.insert(parent_node, "end",
+                text=f"➕ Mostrar mais ({len(listing) - stop} restantes)",
+                values=["MORE", path, str(stop)]
+            )
+        self.listings[path] = listing
+        return added, removed
+
+    def schedule_auto_export(self):
+        """Agenda (com espera, para agrupar alterações seguidas) a regravação da última saída"""
+        if not self.auto_export_var.get() or not self.last_output or self.watcher is None:
+            return
+        if self.auto_export_after:
+            self.root.after_cancel(self.auto_export_after)
+        self.auto_export_after = self.root.after(AUTO_EXPORT_DELAY_MS, self.run_auto_export)
+
+    def run_auto_export(self):
+        """Regrava a última saída com a seleção atual (incremental, salvo com orçamento de tokens)"""
+        self.auto_export_after = None
+        if not self.last_output or not self.selection.count():
+            return
+        if self.export_task:
+            # Uma exportação em andamento: tenta de novo depois dela
+            self.schedule_auto_export()
+            return
+        
+        file_path, budget = self.last_output
+        selected_items, excluded_items = self.selection.selection_rules()
+        
+        def on_done(stats):
+            self.finish_export_ui()
+            self.update_status(
+                f"🔄 Saída atualizada: {os.path.basename(file_path)} • {self.export_detail(stats, budget)}",
+                "success"
+            )
+        
+        def on_error(e):
+            self.finish_export_ui()
+            self.update_status(f"❌ Erro ao atualizar a saída: {e}", "error")
+        
+        def on_cancel():
+            self.finish_export_ui()
+            self.update_status("⚠️ Atualização da saída cancelada", "warning")
+        
+        self.update_status(f"🔄 Atualizando {os.path.basename(file_path)}...", "info")
+        self.start_export_ui()
+        self.export_task = self.worker.submit(
+            self.write_content, file_path, self.folder_path.get(), selected_items, excluded_items, self.scanner,
+            not budget, budget,
+            on_done=on_done,
+            on_error=on_error,
+            on_cancel=on_cancel
+        )
 
     def setup_keyboard_shortcuts(self):
         """Configura atalhos de teclado"""
@@ -849,22 +2107,24 @@ class ModernFolderContentApp:
         self.root.bind('<Control-a>', lambda e: self.select_all_var.set(not self.select_all_var.get()) or self.toggle_all())
         self.root.bind('<F5>', lambda e: self.refresh_tree())
         self.root.bind('<Control-f>', lambda e: self.focus_search())
+        self.root.bind('<Escape>', lambda e: self.cancel_export())
 
     def refresh_tree(self):
         """Atualiza a árvore de arquivos"""
         if self.folder_path.get():
-            current_folder = self.folder_path.get()
-            self.folder_path.set("")  # Limpar temporariamente
-            self.folder_path.set(current_folder)  # Recarregar
-            self.select_folder()
+            self.load_folder(self.folder_path.get())
+
+    def close_scanner(self):
+        """Grava o índice persistente do projeto atual (ou fecha o arquivo compactado)"""
+        if self.scanner.index is not None:
+            self.scanner.index.flush()
+        if not self.scanner.local:
+            self.scanner.close()
 
     def focus_search(self):
         """Foca no campo de busca"""
-        # Encontrar o widget de busca e focar nele
-        for widget in self.root.winfo_children():
-            if isinstance(widget, ttk.Entry) and widget.cget('textvariable') == str(self.search_var):
-                widget.focus_set()
-                break
+        self.search_entry.focus_set()
+        self.search_entry.select_range(0, tk.END)
 
 def main():
     """Função principal da aplicação"""
@@ -904,6 +2164,10 @@ def main():
     # Configurar fechamento da aplicação
     def on_closing():
         if messagebox.askokcancel("Sair", "Deseja realmente sair da aplicação?"):
+            app.stop_watch()
+            app.worker.shutdown()
+            app.watch_worker.shutdown()
+            app.close_scanner()
             root.destroy()
     
     root.protocol("WM_DELETE_WINDOW", on_closing)
@@ -0,0 +1,185 @@
+"""Exportação de uma revisão do git direto do banco de objetos.
+
+GitScanner serve a árvore de um commit (tag, branch ou hash) como uma
+pasta virtual, sem checkout: a árvore inteira vem de um único
+`git ls-tree -r`, já com o tamanho de cada blob, e o conteúdo dos
+arquivos é lido por um único processo `git cat-file --batch`, mantido
+aberto enquanto o scanner existir. A pasta virtual é a raiz do
+repositório seguida de "@revisão" (ex.: /projetos/app@v1.0), de modo que
+os caminhos da documentação indicam a revisão exportada.
+
+Exemplo:
+    from folder_content_core import write_documentation
+    from folder_content_git import GitScanner
+    with GitScanner('/projetos/app', 'v1.0') as scanner:
+        write_documentation('app-v1.0.md', scanner.root, {scanner.root}, scanner=scanner)
+"""
+import errno
+import io
+import os
+import subprocess
+import threading
+
+from folder_content_core import VirtualScanner
+
+# Blobs maiores que isso são lidos em fluxo por um `git cat-file blob`
+# próprio, em vez de passarem inteiros pelo processo compartilhado
+GIT_STREAM_SIZE = 1024 * 1024
+
+# Modos de entradas de árvore que não são arquivos comuns (link simbólico e submódulo)
+_SKIPPED_MODES = (b'120000', b'160000')
+
+
+class GitError(OSError):
+    """Repositório ou revisão inválidos, ou git indisponível"""
+
+
+def run_git(repo_path, *args):
+    """Executa um comando git no repositório e retorna a saída (bytes); levanta GitError"""
+    try:
+        result = subprocess.run(
+            ['git', '-C', repo_path, *args],
+            stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+    except OSError as e:
+        raise GitError(f"git não encontrado: {e}") from None
+    if result.returncode != 0:
+        message = result.stderr.decode('utf-8', 'replace').strip()
+        raise GitError(message or f"git {args[0]} falhou")
+    return result.stdout
+
+
+def revision_label(revision):
+    """Revisão usada no nome da pasta virtual ('origin/main' -> 'origin-main')"""
+    for char in ('/', '\\', ':'):
+        revision = revision.replace(char, '-')
+    return revision
+
+
+class _BlobReader(io.RawIOBase):
+    """Conteúdo de um blob como arquivo, lido só na primeira leitura.
+
+    Assim a verificação de tamanho de open_binary_file (skip_reason)
+    acontece antes de qualquer leitura: blobs ignorados são fechados sem
+    iniciar nenhum processo. Blobs maiores que GIT_STREAM_SIZE são lidos
+    de um `git cat-file blob` próprio; fechar encerra o processo.
+    """
+
+    def __init__(self, scanner, sha, size):
+        self._scanner = scanner
+        self._sha = sha
+        self._size = size
+        self._source = None  # io.BytesIO ou o processo git
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._source is None:
+            if self._size > GIT_STREAM_SIZE:
+                self._source = subprocess.Popen(
+                    ['git', '-C', self._scanner.repo, 'cat-file', 'blob', self._sha],
+                    stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+                )
+            else:
+                self._source = io.BytesIO(self._scanner._read_blob(self._sha))
+        if isinstance(self._source, io.BytesIO):
+            return self._source.readinto(buffer)
+        return self._source.stdout.readinto(buffer)
+
+    def close(self):
+        if not self.closed and isinstance(self._source, subprocess.Popen):
+            self._source.stdout.close()
+            if self._source.poll() is None:
+                self._source.kill()
+            self._source.wait()
+        super().close()
+
+
+class GitScanner(VirtualScanner):
+    """Scanner que serve a árvore de uma revisão do git como uma pasta virtual.
+
+    repo_path pode ser qualquer pasta do repositório; repo recebe a raiz
+    dele, commit o hash da revisão e root a pasta virtual. Todos os
+    arquivos têm como mtime a data do commit. Links simbólicos e
+    submódulos ficam de fora. Pode ser usado por várias threads (as
+    leituras pelo processo compartilhado são serializadas); close (ou
+    with) encerra os processos do git.
+    """
+
+    # Os blobs passam um a um pelo mesmo processo
+    parallel_reads = False
+
+    def __init__(self, repo_path, revision='HEAD', cache=None, ignore=None, name_index=None):
+        repo = os.path.normpath(os.fsdecode(run_git(repo_path, 'rev-parse', '--show-toplevel').strip()))
+        super().__init__(f"{repo}@{revision_label(revision)}", cache, ignore, name_index)
+        self.repo = repo
+        self.revision = revision
+        try:
+            self.commit = run_git(repo, 'rev-parse', '--verify', '--quiet', '--end-of-options',
+                                  f"{revision}^{{commit}}").decode().strip()
+        except GitError:
+            raise GitError(f"revisão não encontrada: {revision}") from None
+        self.commit_time = float(run_git(repo, 'show', '-s', '--format=%ct', self.commit).strip())
+        self._batch = None
+        self._lock = threading.Lock()
+
+        listing = run_git(repo, 'ls-tree', '-r', '-t', '-l', '-z', '--full-tree', self.commit)
+        for record in listing.split(b'\0'):
+            if not record:
+                continue
+            meta, _, name = record.partition(b'\t')
+            mode, kind, sha, size = meta.split()
+            name = os.fsdecode(name)
+            if kind == b'tree':
+                self._add(name, True)
+            elif kind == b'blob' and mode not in _SKIPPED_MODES:
+                self._add(name, False, int(size), self.commit_time, sha.decode())
+
+    def virtual_path(self, path):
+        """Caminho na pasta virtual correspondente a um caminho do repositório no disco"""
+        rel_path = os.path.relpath(os.path.abspath(path), self.repo)
+        if rel_path == os.curdir:
+            return self.root
+        return os.path.join(self.root, rel_path)
+
+    def close(self):
+        """Encerra o processo `git cat-file --batch`"""
+        with self._lock:
+            if self._batch is not None:
+                self._batch.stdin.close()
+                self._batch.stdout.close()
+                self._batch.wait()
+                self._batch = None
+
+    def _read_blob(self, sha):
+        """Conteúdo de um blob, lido pelo processo compartilhado"""
+        with self._lock:
+            try:
+                if self._batch is None:
+                    self._batch = subprocess.Popen(
+                        ['git', '-C', self.repo, 'cat-file', '--batch'],
+                        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+                    )
+                self._batch.stdin.write(sha.encode() + b'\n')
+                self._batch.stdin.flush()
+                header = self._batch.stdout.readline().split()
+                if len(header) != 3:
+                    raise GitError(f"objeto não encontrado: {sha}")
+                data = self._batch.stdout.read(int(header[2]))
+                self._batch.stdout.read(1)  # quebra de linha após o conteúdo
+            except GitError:
+                raise
+            except (OSError, ValueError) as e:
+                raise GitError(f"falha ao ler {sha} do git: {e}") from None
+        return data
+
+    def open(self, path):
+        """Abre o blob de um arquivo da revisão; retorna (arquivo binário, tamanho)"""
+        name = self._relative(path)
+        member = self._files.get(name) if name is not None else None
+        if member is None:
+            code = errno.EISDIR if name in self._dirs else errno.ENOENT
+            raise OSError(code, os.strerror(code), path)
+        size, _, sha = member
+        return io.BufferedReader(_BlobReader(self, sha, size)), size
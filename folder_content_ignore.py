@@ -0,0 +1,288 @@
+"""Regras de exclusão de arquivos e pastas (sintaxe do .gitignore).
+
+O IgnoreMatcher combina os padrões padrão (DEFAULT_IGNORES), os padrões
+definidos pelo usuário e os arquivos .gitignore encontrados na árvore
+(inclusive aninhados). Ligado a um Scanner (Scanner(ignore=...)), ele
+filtra as listagens da árvore e poda a descida de walk, de modo que
+pastas como node_modules e .git nunca são listadas nem consultadas.
+Com scanner, os .gitignore são lidos por scanner.open e scanner.file_key,
+de modo que os de dentro de arquivos compactados e de revisões do git
+(VirtualScanner) valem como os do disco.
+
+Sintaxe suportada (a mesma do git): comentários com #, negação com !,
+padrões só de pastas terminados em /, padrões ancorados (com / no início
+ou no meio), curingas *, ?, [abc] e **.
+"""
+import os
+import re
+
+# Padrões ignorados por padrão (prioridade mais baixa: um .gitignore pode
+# reincluí-los com !)
+DEFAULT_IGNORES = (
+    '.git/', '.hg/', '.svn/',
+    'node_modules/', '__pycache__/', 'venv/', '.venv/',
+    '.tox/', '.mypy_cache/', '.pytest_cache/',
+)
+
+GITIGNORE_NAME = '.gitignore'
+
+
+def translate_pattern(pattern):
+    """Converte um padrão do .gitignore em expressão regular.
+
+    Retorna (regex, negado, só pastas) ou None para linhas vazias e
+    comentários. A regex casa com o caminho relativo (separado por "/")
+    à pasta onde o padrão foi definido.
+    """
+    # Espaços finais são ignorados, exceto se escapados
+    while pattern.endswith(' ') and not pattern.endswith('\\ '):
+        pattern = pattern[:-1]
+    if not pattern or pattern.startswith('#'):
+        return None
+
+    negate = pattern.startswith('!')
+    if negate:
+        pattern = pattern[1:]
+    elif pattern.startswith('\\!') or pattern.startswith('\\#'):
+        pattern = pattern[1:]
+
+    dir_only = pattern.endswith('/')
+    pattern = pattern.rstrip('/')
+    if not pattern:
+        return None
+
+    # Com barra no início ou no meio, o padrão é relativo à pasta do
+    # .gitignore; sem barra, casa com o nome em qualquer nível
+    anchored = '/' in pattern
+    pattern = pattern.lstrip('/')
+
+    parts = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern.startswith('**', i):
+                at_start = i == 0 or pattern[i - 1] == '/'
+                at_end = i + 2 == n or pattern[i + 2] == '/'
+                if at_start and at_end:
+                    if i + 2 == n:
+                        parts.append('.*')          # "dir/**": tudo dentro
+                    else:
+                        parts.append('(?:.*/)?')    # "**/" : qualquer nível
+                        i += 1
+                    i += 2
+                    continue
+                i += 1
+            parts.append('[^/]*')
+        elif c == '?':
+            parts.append('[^/]')
+        elif c == '[':
+            # "]" logo após "[" (ou "[!") faz parte da classe
+            start = i + 1
+            if start < n and pattern[start] in '!^':
+                start += 1
+            if start < n and pattern[start] == ']':
+                start += 1
+            end = pattern.find(']', start)
+            if end == -1:
+                parts.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end].replace('[', '\\[')
+                if body[0] in '!^':
+                    body = '^' + body[1:]
+                parts.append('[' + body + ']')
+                i = end
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            parts.append(re.escape(pattern[i]))
+        else:
+            parts.append(re.escape(c))
+        i += 1
+
+    regex = ''.join(parts)
+    if not anchored:
+        regex = '(?:.*/)?' + regex
+    return regex, negate, dir_only
+
+
+class IgnoreRules:
+    """Conjunto compilado de padrões, relativos a uma pasta base.
+
+    Todos os padrões são reunidos em uma única regex, de modo que o caso
+    comum (nenhum padrão casa) custa uma só busca; a ordem só é
+    consultada quando algum padrão casa e há negações.
+    """
+
+    def __init__(self, patterns):
+        self.rules = []
+        for pattern in patterns:
+            translated = translate_pattern(pattern)
+            if translated is not None:
+                regex, negate, dir_only = translated
+                self.rules.append((re.compile(regex + '$', re.DOTALL), negate, dir_only))
+
+        self.has_negations = any(negate for _, negate, _ in self.rules)
+        self._any_dir = self._combine(self.rules)
+        self._any_file = self._combine([rule for rule in self.rules if not rule[2]])
+
+    @staticmethod
+    def _combine(rules):
+        if not rules:
+            return None
+        return re.compile('|'.join(f"(?:{rule[0].pattern})" for rule in rules), re.DOTALL)
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def match(self, rel_path, is_dir):
+        """True se o caminho é ignorado, False se é reincluído (!) e None se nenhum padrão casa"""
+        combined = self._any_dir if is_dir else self._any_file
+        if combined is None or combined.match(rel_path) is None:
+            return None
+        if not self.has_negations:
+            return True
+        # O último padrão que casa decide
+        for regex, negate, dir_only in reversed(self.rules):
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                return not negate
+        return None
+
+    @classmethod
+    def from_file(cls, file_path, opener=None):
+        """Lê as regras de um .gitignore; opener(caminho) é como Scanner.open (o padrão lê do disco)"""
+        if opener is None:
+            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                return cls(f.read().splitlines())
+        raw, _ = opener(file_path)
+        with raw:
+            return cls(raw.read().decode('utf-8', 'replace').splitlines())
+
+
+class IgnoreMatcher:
+    """Decide quais itens de uma árvore são ignorados.
+
+    Os .gitignore de cada pasta valem para ela e suas subpastas; os mais
+    profundos têm prioridade, seguidos pelos padrões do usuário e, por
+    fim, pelos padrões padrão. Os .gitignore são relidos quando mudam.
+    Com scanner, eles são lidos por ele em vez do disco (necessário para
+    scanners não locais, como folder_content_archive.ArchiveScanner).
+    """
+
+    def __init__(self, root, patterns=(), use_defaults=True, use_gitignore=True, scanner=None):
+        self.root = os.path.normpath(root)
+        self.patterns = tuple(patterns)
+        self.use_gitignore = use_gitignore
+        self.scanner = scanner
+        base_patterns = (DEFAULT_IGNORES if use_defaults else ()) + self.patterns
+        self.base_rules = IgnoreRules(base_patterns)
+        self._gitignores = {}  # pasta -> (mtime do .gitignore, IgnoreRules) ou None
+
+    def filter(self, dir_path, listing):
+        """Retorna a Listing de dir_path sem os itens ignorados (a própria, se nada for ignorado)"""
+        rel_dir = self._relative(dir_path)
+        if rel_dir is None:
+            return listing
+
+        if self.use_gitignore:
+            has_gitignore = GITIGNORE_NAME in listing.names
+            self._refresh_gitignore(dir_path, has_gitignore)
+        chain = self._chain(dir_path, rel_dir)
+        if not chain:
+            return listing
+
+        prefix = rel_dir + '/' if rel_dir else ''
+        kept = []
+        for position, (name, is_dir) in enumerate(listing.names_and_types()):
+            rel_path = prefix + name
+            for base_len, rules in chain:
+                result = rules.match(rel_path[base_len:], is_dir)
+                if result is not None:
+                    break
+            else:
+                result = False
+            if not result:
+                kept.append(position)
+        if len(kept) == len(listing):
+            return listing
+        return listing.view(kept)
+
+    def is_ignored(self, path, is_dir):
+        """Verifica um caminho isolado (considerando também as pastas acima dele)"""
+        rel_path = self._relative(path)
+        if not rel_path:
+            return False
+        parent = os.path.dirname(path)
+        if self.is_ignored(parent, True):
+            return True
+        if self.use_gitignore and parent not in self._gitignores:
+            self._refresh_gitignore(parent, self._has_gitignore(parent))
+        rel_dir = self._relative(parent)
+        for base_len, rules in self._chain(parent, rel_dir):
+            result = rules.match(rel_path[base_len:], is_dir)
+            if result is not None:
+                return result
+        return False
+
+    def _relative(self, path):
+        """Caminho relativo à raiz com "/" ('' para a raiz) ou None se estiver fora dela"""
+        path = os.path.normpath(path)
+        if path == self.root:
+            return ''
+        prefix = self.root if self.root.endswith(os.sep) else self.root + os.sep
+        if not path.startswith(prefix):
+            return None
+        return path[len(prefix):].replace(os.sep, '/')
+
+    def _refresh_gitignore(self, dir_path, exists):
+        """Carrega (ou recarrega, se mudou) o .gitignore de uma pasta"""
+        if not exists:
+            self._gitignores[dir_path] = None
+            return
+        file_path = os.path.join(dir_path, GITIGNORE_NAME)
+        try:
+            if self.scanner is None:
+                mtime = os.stat(file_path).st_mtime
+                opener = None
+            else:
+                mtime, _ = self.scanner.file_key(file_path)
+                opener = self.scanner.open
+            current = self._gitignores.get(dir_path)
+            if current is None or current[0] != mtime:
+                self._gitignores[dir_path] = (mtime, IgnoreRules.from_file(file_path, opener))
+        except OSError:
+            self._gitignores[dir_path] = None
+
+    def _has_gitignore(self, dir_path):
+        """Se a pasta tem um .gitignore (consultado no scanner, se houver)"""
+        file_path = os.path.join(dir_path, GITIGNORE_NAME)
+        if self.scanner is None:
+            return os.path.isfile(file_path)
+        try:
+            self.scanner.file_key(file_path)
+        except OSError:
+            return False
+        return True
+
+    def _chain(self, dir_path, rel_dir):
+        """Regras que valem dentro de dir_path, da mais prioritária para a menos.
+
+        Retorna pares (tamanho do prefixo a remover do caminho relativo, IgnoreRules).
+        """
+        chain = []
+        if self.use_gitignore:
+            path, rel = dir_path, rel_dir
+            while True:
+                if path not in self._gitignores:
+                    self._refresh_gitignore(path, self._has_gitignore(path))
+                loaded = self._gitignores[path]
+                if loaded is not None and loaded[1]:
+                    chain.append((len(rel) + 1 if rel else 0, loaded[1]))
+                if not rel:
+                    break
+                path = os.path.dirname(path)
+                rel = rel.rpartition('/')[0]
+        if self.base_rules:
+            chain.append((0, self.base_rules))
+        return chain
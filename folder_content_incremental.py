@@ -0,0 +1,307 @@
+"""Exportação incremental: atualiza uma documentação já gerada.
+
+Junto com a saída é gravado um manifesto (arquivo .manifest.json ao lado
+dela) com o deslocamento e o tamanho em bytes de cada seção e a versão
+(mtime e tamanho) de cada arquivo exportado. Na exportação seguinte:
+
+- se a lista de seções for a mesma, só as seções de arquivos alterados
+  (e o cabeçalho, que traz a data) são renderizadas de novo, como na
+  geração completa (cache de seções e cópia em bytes dos arquivos
+  grandes); os arquivos ignorados ficam registrados no manifesto, para
+  que stats['skipped'] seja o mesmo da geração completa;
+- se todas elas mantiverem o tamanho em bytes, são sobrescritas no lugar;
+- caso contrário o arquivo é remontado copiando os trechos inalterados da
+  saída anterior, sem reler nem decodificar os arquivos de origem;
+- se a ordem ou a lista de seções mudou (ou a saída foi editada por fora),
+  a documentação é gerada por completo.
+"""
+import json
+import os
+import shutil
+import tempfile
+
+from folder_content_core import (
+    CHUNK_SIZE, DEFAULT_MAX_FILE_SIZE, DEFAULT_RAW_COPY_SIZE, DEFAULT_READ_WORKERS, RawFile, Scanner, Section,
+    compression_for, copy_raw_file, iter_documentation, iter_export_plan, render_header, write_documentation
+)
+
+MANIFEST_VERSION = 2
+
+# Seções renderizadas ficam em memória até este tamanho (depois, em disco)
+SPOOL_SIZE = 8 * 1024 * 1024
+
+
+def manifest_path_for(file_path):
+    """Caminho do manifesto de uma saída"""
+    return file_path + '.manifest.json'
+
+
+def load_manifest(file_path, root_path, max_file_size=DEFAULT_MAX_FILE_SIZE):
+    """Lê o manifesto de uma saída; retorna None se ele não puder ser usado.
+
+    O manifesto é descartado se for de outra pasta de projeto, se tiver
+    sido gerado com outro limite de tamanho de arquivo ou se a saída tiver
+    sido alterada depois de gravada.
+    """
+    try:
+        with open(manifest_path_for(file_path), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        st = os.stat(file_path)
+    except (OSError, ValueError):
+        return None
+
+    if (manifest.get('version') != MANIFEST_VERSION
+            or manifest.get('root') != root_path
+            or manifest.get('max_file_size') != max_file_size
+            or manifest.get('output_size') != st.st_size
+            or manifest.get('output_mtime_ns') != st.st_mtime_ns):
+        return None
+
+    try:
+        return [
+            Section(item['kind'], item['path'], item['mtime'], item['size'], item['offset'], item['length'],
+                    item['skipped'])
+            for item in manifest['sections']
+        ]
+    except (KeyError, TypeError):
+        return None
+
+
+def save_manifest(file_path, root_path, sections, max_file_size=DEFAULT_MAX_FILE_SIZE):
+    """Grava o manifesto de uma saída"""
+    st = os.stat(file_path)
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'root': root_path,
+        'max_file_size': max_file_size,
+        'output_size': st.st_size,
+        'output_mtime_ns': st.st_mtime_ns,
+        'sections': [
+            {
+                'kind': section.kind, 'path': section.path,
+                'mtime': section.mtime, 'size': section.size,
+                'offset': section.offset, 'length': section.length,
+                'skipped': section.skipped,
+            }
+            for section in sections
+        ],
+    }
+    manifest_path = manifest_path_for(file_path)
+    temp_path = manifest_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(temp_path, manifest_path)
+
+
+def remove_manifest(file_path):
+    """Remove o manifesto (ex.: quando a saída é gerada sem ele)"""
+    try:
+        os.remove(manifest_path_for(file_path))
+    except OSError:
+        pass
+
+
+def spool_chunks(chunks):
+    """Renderiza blocos (texto ou RawFile, como em write_chunks) em um arquivo temporário.
+
+    Retorna (arquivo, tamanho em bytes).
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+    length = 0
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, RawFile):
+                length += copy_raw_file(chunk, spool)
+                continue
+            data = chunk.encode('utf-8')
+            spool.write(data)
+            length += len(data)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool, length
+
+
+def copy_range(source, target, offset, length):
+    """Copia length bytes de source (a partir de offset) para target"""
+    source.seek(offset)
+    while length > 0:
+        data = source.read(min(CHUNK_SIZE, length))
+        if not data:
+            raise OSError("saída anterior menor que o indicado no manifesto")
+        target.write(data)
+        length -= len(data)
+
+
+def write_documentation_incremental(file_path, root_path, selected_items, read_workers=DEFAULT_READ_WORKERS,
+                                    task=None, scanner=None, content_cache=None, stats=None,
+                                    max_file_size=DEFAULT_MAX_FILE_SIZE, excluded_items=None,
+                                    raw_copy_size=DEFAULT_RAW_COPY_SIZE, compress_level=None):
+    """Gera ou atualiza incrementalmente a documentação em file_path.
+
+    stats['incremental'] indica o que foi feito: 'full' (geração
+    completa), 'patch' (seções sobrescritas no lugar) ou 'rebuild'
+    (arquivo remontado); stats['sections_rewritten'] conta as seções
+    renderizadas novamente. Retorna a quantidade de arquivos exportados.
+    Saídas comprimidas (.gz, .xz, .bz2) não podem ser alteradas no lugar:
+    são sempre geradas por completo, sem manifesto.
+    """
+    if stats is None:
+        stats = {}
+    scanner = scanner or Scanner()
+
+    if compression_for(file_path):
+        remove_manifest(file_path)
+        file_count = write_documentation(
+            file_path, root_path, selected_items, read_workers, task,
+            scanner=scanner, content_cache=content_cache, stats=stats, max_file_size=max_file_size,
+            excluded_items=excluded_items, raw_copy_size=raw_copy_size, compress_level=compress_level
+        )
+        stats['incremental'] = 'full'
+        stats['sections_rewritten'] = 0
+        return file_count
+
+    old_sections = load_manifest(file_path, root_path, max_file_size)
+    if old_sections is not None:
+        result = _update(
+            file_path, root_path, selected_items, old_sections, task, scanner, content_cache, stats, max_file_size,
+            excluded_items, raw_copy_size
+        )
+        if result is not None:
+            return result
+
+    # Geração completa, registrando as seções para a próxima atualização
+    sections = []
+    remove_manifest(file_path)
+    file_count = write_documentation(
+        file_path, root_path, selected_items, read_workers, task,
+        scanner=scanner, content_cache=content_cache, stats=stats, sections=sections,
+        max_file_size=max_file_size, excluded_items=excluded_items, raw_copy_size=raw_copy_size
+    )
+    save_manifest(file_path, root_path, sections, max_file_size)
+    stats['incremental'] = 'full'
+    stats['sections_rewritten'] = len(sections)
+    return file_count
+
+
+def _update(file_path, root_path, selected_items, old_sections, task, scanner, content_cache, stats, max_file_size,
+            excluded_items, raw_copy_size):
+    """Atualiza a saída a partir do manifesto; retorna None se for preciso gerar tudo.
+
+    stats recebe os mesmos campos da geração completa: 'files',
+    'skipped' (dos arquivos alterados e, dos demais, do manifesto),
+    'cache_hits' e 'cache_misses' (só dos arquivos renderizados de novo).
+    """
+    plan = list(iter_export_plan(root_path, selected_items, scanner, excluded_items))
+    if len(plan) + 1 != len(old_sections) or old_sections[0].kind != 'header':
+        return None
+    for (kind, path, _), old in zip(plan, old_sections[1:]):
+        if kind != old.kind or path != old.path:
+            return None
+
+    # Descobrir as seções alteradas e renderizá-las
+    new_sections = [Section('header')]
+    rendered = {0: spool_chunks([render_header(root_path)])}
+    file_count = 0
+    file_stats = {'skipped': 0, 'cache_hits': 0, 'cache_misses': 0}
+    try:
+        for index, ((kind, path, rel_path), old) in enumerate(zip(plan, old_sections[1:]), start=1):
+            section = Section(kind, path)
+            new_sections.append(section)
+
+            if kind == 'folder':
+                continue
+            if kind == 'error':
+                rendered[index] = spool_chunks([f"[Erro ao processar pasta {path}: {rel_path}]\n\n"])
+                continue
+
+            file_count += 1
+            if task:
+                task.check()
+            try:
+                section.mtime, section.size = scanner.file_key(path)
+            except OSError:
+                pass
+            if (section.mtime, section.size) != (old.mtime, old.size) or section.mtime is None:
+                if task:
+                    task.progress(file_count, rel_path)
+                rendered[index], section.skipped = _render_file(
+                    root_path, path, scanner, content_cache, file_stats, max_file_size, raw_copy_size
+                )
+            else:
+                section.skipped = old.skipped
+
+        same_lengths = all(rendered[index][1] == old_sections[index].length for index in rendered)
+        if same_lengths:
+            _patch_in_place(file_path, old_sections, rendered)
+            for section, old in zip(new_sections, old_sections):
+                section.offset, section.length = old.offset, old.length
+            stats['incremental'] = 'patch'
+        else:
+            _rebuild(file_path, old_sections, new_sections, rendered)
+            stats['incremental'] = 'rebuild'
+    finally:
+        for spool, _ in rendered.values():
+            spool.close()
+
+    save_manifest(file_path, root_path, new_sections, max_file_size)
+    stats['files'] = file_count
+    stats['skipped'] = sum(section.skipped for section in new_sections)
+    stats['cache_hits'] = file_stats['cache_hits']
+    stats['cache_misses'] = file_stats['cache_misses']
+    stats['sections_rewritten'] = len(rendered)
+    return file_count
+
+
+def _render_file(root_path, path, scanner, content_cache, stats, max_file_size, raw_copy_size):
+    """Renderiza a seção de um arquivo pelo mesmo caminho da geração completa (iter_documentation).
+
+    Retorna ((arquivo temporário, tamanho em bytes), se o arquivo entrou
+    como ignorado); stats acumula 'skipped', 'cache_hits' e 'cache_misses'.
+    """
+    file_stats = {}
+    chunks = iter_documentation(
+        root_path, {path}, 1, stats=file_stats, scanner=scanner, content_cache=content_cache,
+        max_file_size=max_file_size, raw_copy_size=raw_copy_size
+    )
+    next(chunks)  # cabeçalho da documentação
+    rendered = spool_chunks(chunks)
+    for name in ('skipped', 'cache_hits', 'cache_misses'):
+        stats[name] += file_stats[name]
+    return rendered, file_stats['skipped'] > 0
+
+
+def _patch_in_place(file_path, old_sections, rendered):
+    """Sobrescreve as seções alteradas (mesmo tamanho em bytes) na própria saída"""
+    with open(file_path, 'r+b') as f:
+        for index, (spool, _) in sorted(rendered.items()):
+            f.seek(old_sections[index].offset)
+            shutil.copyfileobj(spool, f, CHUNK_SIZE)
+
+
+def _rebuild(file_path, old_sections, new_sections, rendered):
+    """Remonta a saída copiando trechos inalterados e inserindo as seções novas"""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(prefix='.gerador_', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as target, open(file_path, 'rb') as source:
+            offset = 0
+            for index, (section, old) in enumerate(zip(new_sections, old_sections)):
+                section.offset = offset
+                if index in rendered:
+                    spool, length = rendered[index]
+                    shutil.copyfileobj(spool, target, CHUNK_SIZE)
+                else:
+                    length = old.length
+                    copy_range(source, target, old.offset, length)
+                section.length = length
+                offset += length
+        shutil.copymode(file_path, temp_path)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
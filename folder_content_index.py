@@ -0,0 +1,162 @@
+"""Índice persistente das varreduras de pastas (SQLite).
+
+Guarda, para cada pasta já listada, o mtime da pasta e os itens que ela
+continha (nome, tipo, tamanho e mtime). Ao reabrir um projeto, o Scanner
+consulta o índice e só volta a listar as pastas cujo mtime mudou, o que
+torna a atualização (F5) de projetos grandes praticamente instantânea.
+
+Os índices ficam no diretório de cache do usuário (um arquivo por projeto),
+para não criar arquivos dentro das pastas documentadas. O local pode ser
+alterado com a variável de ambiente GERADOR_PROMPT_CACHE_DIR.
+"""
+import hashlib
+import os
+import threading
+
+try:
+    import sqlite3
+except ImportError:  # Python compilado sem SQLite: o índice fica desativado
+    sqlite3 = None
+
+from array import array
+
+from folder_content_core import Listing
+
+# Versão do esquema; índices de versões diferentes são recriados
+SCHEMA_VERSION = 1
+
+# Quantidade de listagens gravadas antes de um commit automático
+COMMIT_INTERVAL = 500
+
+
+def get_cache_dir():
+    """Diretório onde os índices são armazenados"""
+    custom = os.environ.get('GERADOR_PROMPT_CACHE_DIR')
+    if custom:
+        return custom
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'gerador_prompt', 'index')
+
+
+def index_path_for(root_path):
+    """Caminho do arquivo de índice de um projeto"""
+    root_path = os.path.abspath(root_path)
+    digest = hashlib.sha1(root_path.encode('utf-8', 'surrogateescape')).hexdigest()[:16]
+    name = os.path.basename(root_path.rstrip(os.sep)) or 'raiz'
+    return os.path.join(get_cache_dir(), f"{name}-{digest}.sqlite3")
+
+
+def open_index(root_path):
+    """Abre (ou cria) o índice de um projeto; retorna None se não for possível"""
+    if sqlite3 is None:
+        return None
+    try:
+        return ScanIndex(index_path_for(root_path))
+    except (OSError, sqlite3.Error) as e:
+        print(f"⚠️  Índice de varredura indisponível: {e}")
+        return None
+
+
+class ScanIndex:
+    """Listagens de pastas persistidas em SQLite.
+
+    Pode ser usado por várias threads (as operações são serializadas por
+    um lock). As gravações são agrupadas em transações; chame flush() para
+    garantir que tudo foi salvo.
+    """
+
+    def __init__(self, db_path):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            self._conn.executescript("""
+                DROP TABLE IF EXISTS dirs;
+                DROP TABLE IF EXISTS entries;
+            """)
+        self._conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS dirs (
+                path TEXT PRIMARY KEY,
+                mtime REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS entries (
+                parent TEXT NOT NULL,
+                pos INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                is_dir INTEGER NOT NULL,
+                size INTEGER,
+                mtime REAL,
+                PRIMARY KEY (parent, pos)
+            ) WITHOUT ROWID;
+            PRAGMA user_version = {SCHEMA_VERSION};
+        """)
+        self._conn.commit()
+
+    def load_listing(self, path):
+        """Retorna (mtime da pasta, Listing) gravados para a pasta, ou None.
+
+        Os itens voltam na mesma ordem em que foram gravados.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT mtime FROM dirs WHERE path = ?", (path,)).fetchone()
+            if row is None:
+                return None
+            rows = self._conn.execute(
+                "SELECT name, is_dir, size, mtime FROM entries WHERE parent = ? ORDER BY pos", (path,)
+            ).fetchall()
+
+        listing = Listing(
+            path,
+            [name for name, _, _, _ in rows],
+            bytearray(is_dir for _, is_dir, _, _ in rows),
+            array('q', [-1 if size is None else size for _, _, size, _ in rows]),
+            array('d', [mtime or 0.0 for _, _, _, mtime in rows]),
+        )
+        return row[0], listing
+
+    def store_listing(self, path, dir_mtime, listing):
+        """Substitui a listagem gravada de uma pasta (uma Listing completa)"""
+        rows = [
+            (path, pos, name, is_dir, None if size < 0 else size, None if size < 0 else mtime)
+            for pos, (name, is_dir, size, mtime) in enumerate(
+                zip(listing.names, listing.is_dir, listing.sizes, listing.mtimes)
+            )
+        ]
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE parent = ?", (path,))
+            self._conn.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._conn.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?)", (path, dir_mtime))
+            self._pending += 1
+            if self._pending >= COMMIT_INTERVAL:
+                self._conn.commit()
+                self._pending = 0
+
+    def forget(self, path):
+        """Remove uma pasta do índice (ex.: pasta apagada)"""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE parent = ?", (path,))
+            self._conn.execute("DELETE FROM dirs WHERE path = ?", (path,))
+            self._pending += 1
+
+    def flush(self):
+        """Grava as alterações pendentes"""
+        with self._lock:
+            if self._pending:
+                self._conn.commit()
+                self._pending = 0
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,246 @@
+"""Busca de arquivos e pastas pelo nome e pelo conteúdo.
+
+O NameIndex é alimentado pelo Scanner (Scanner(name_index=...)) a cada
+pasta listada - pela árvore, pela contagem de itens feita ao abrir o
+projeto ou pela exportação -, de modo que a busca alcança também as
+pastas que nunca foram expandidas.
+
+grep_files procura um texto (ou expressão regular) no conteúdo dos
+arquivos de um projeto, em um pool de processos, com as mesmas regras da
+exportação: itens ignorados, binários e grandes demais ficam de fora.
+"""
+import os
+import re
+import threading
+from array import array
+from bisect import bisect_right
+
+from folder_content_core import (
+    DEFAULT_MAX_FILE_SIZE, InvalidUtf8, SkippedFile, iter_export_plan, open_text_file, skip_reason
+)
+
+# Arquivos enviados de uma vez a cada processo do grep
+GREP_BATCH_SIZE = 32
+
+# Caracteres da linha encontrada mantidos no resultado
+GREP_LINE_LENGTH = 200
+
+
+class NameIndex:
+    """Índice em memória dos nomes de arquivos e pastas de um projeto.
+
+    Os nomes de cada pasta ficam em um bloco de texto em minúsculas, um
+    por linha; na busca os blocos são unidos em um só texto, percorrido
+    com str.find (em C). Assim uma busca em 1 milhão de nomes leva poucos
+    milissegundos, sem o custo de montagem e de memória de uma tabela de
+    trigramas. O texto unido só é remontado quando alguma pasta muda, e
+    um termo que estende o anterior filtra os resultados já encontrados.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dirs = {}             # pasta -> (nomes, bloco em minúsculas)
+        self._dirty = False
+        self._text = ''
+        self._starts = array('q')   # posição de cada pasta no texto unido
+        self._order = []            # (pasta, nomes) na ordem do texto unido
+        self._last = None           # (termo, resultados) da última busca completa
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(names) for names, _ in self._dirs.values())
+
+    def add(self, dir_path, listing):
+        """Registra (ou atualiza) os nomes de uma pasta listada"""
+        names = [name for name, _ in listing.names_and_types()]
+        block = '\n'.join(names).lower() + '\n' if names else ''
+        with self._lock:
+            current = self._dirs.get(dir_path)
+            if current is not None:
+                if current[1] == block:
+                    return
+                # Subpastas que sumiram (ou passaram a ser ignoradas) saem do índice
+                for name in set(current[0]).difference(names):
+                    self._forget(os.path.join(dir_path, name))
+            self._dirs[dir_path] = (names, block)
+            self._dirty = True
+
+    def _forget(self, dir_path):
+        if dir_path not in self._dirs:
+            return
+        prefix = dir_path + os.sep
+        for path in [path for path in self._dirs if path == dir_path or path.startswith(prefix)]:
+            del self._dirs[path]
+
+    def clear(self):
+        with self._lock:
+            self._dirs.clear()
+            self._dirty = True
+
+    def _build(self):
+        """Remonta o texto unido (se alguma pasta mudou)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            self._order = [(path, names) for path, (names, _) in self._dirs.items()]
+            blocks = [block for _, block in self._dirs.values()]
+            self._dirty = False
+        starts = array('q')
+        offset = 0
+        for block in blocks:
+            starts.append(offset)
+            offset += len(block)
+        self._text = ''.join(blocks)
+        self._starts = starts
+        self._last = None
+
+    def search(self, term, limit=500):
+        """Caminhos cujo nome contém term (sem diferenciar maiúsculas).
+
+        Retorna (caminhos em ordem alfabética, truncado); truncado indica
+        que havia mais que limit resultados.
+        """
+        term = term.lower()
+        if not term or '\n' in term:
+            return [], False
+        self._build()
+
+        # Termo que estende o anterior: basta filtrar os resultados dele
+        if self._last is not None and term.startswith(self._last[0]):
+            results = [path for path in self._last[1] if term in os.path.basename(path).lower()]
+            return results[:limit], len(results) > limit
+
+        text, starts, order = self._text, self._starts, self._order
+        results = []
+        current_dir = -1
+        line = line_start = 0
+        pos = text.find(term)
+        while pos != -1:
+            if len(results) == limit:
+                return sorted(results), True
+            i = bisect_right(starts, pos) - 1
+            if i != current_dir:
+                current_dir, line, line_start = i, 0, starts[i]
+            line += text.count('\n', line_start, pos)
+            end = text.find('\n', pos)
+            dir_path, names = order[i]
+            results.append(os.path.join(dir_path, names[line]))
+            line += 1
+            line_start = end + 1
+            pos = text.find(term, line_start)
+
+        results.sort()
+        self._last = (term, results)
+        return results, False
+
+
+def compile_pattern(pattern, regex=False, ignore_case=True):
+    """Compila o termo do grep (texto literal, a menos que regex seja verdadeiro)"""
+    flags = re.IGNORECASE if ignore_case else 0
+    return re.compile(pattern if regex else re.escape(pattern), flags)
+
+
+def grep_batch(paths, pattern, flags=0, max_size=DEFAULT_MAX_FILE_SIZE, opener=None):
+    """Procura pattern em cada arquivo (executado nos processos do grep).
+
+    Retorna (resultados, ignorados): uma tupla (caminho, número da linha,
+    linha) com a primeira ocorrência de cada arquivo que contém o termo e
+    a quantidade de arquivos que não puderam ser lidos como texto.
+    """
+    matcher = re.compile(pattern, flags)
+    results = []
+    skipped = 0
+    for path in paths:
+        try:
+            with open_text_file(path, max_size, opener) as f:
+                text = f.read()
+        except (SkippedFile, InvalidUtf8, OSError):
+            skipped += 1
+            continue
+        match = matcher.search(text)
+        if match is None:
+            continue
+        start = text.rfind('\n', 0, match.start()) + 1
+        end = text.find('\n', match.start())
+        line = text[start:end if end != -1 else len(text)].strip()
+        results.append((path, text.count('\n', 0, start) + 1, line[:GREP_LINE_LENGTH]))
+    return results, skipped
+
+
+def grep_files(root_path, matcher, selected_items=None, scanner=None, workers=None, task=None, stats=None,
+               max_size=DEFAULT_MAX_FILE_SIZE):
+    """Gera (caminho, número da linha, linha) de cada arquivo que contém matcher.
+
+    matcher é um padrão compilado (veja compile_pattern). Os arquivos são
+    os de iter_export_plan (por padrão, o projeto inteiro), divididos em
+    lotes de GREP_BATCH_SIZE e lidos por workers processos (None = um por
+    CPU; 1 = no próprio processo); os resultados saem à medida que os
+    lotes terminam, fora de ordem. Com um scanner não local (ex.: um
+    arquivo compactado), a leitura é feita no próprio processo, com
+    scanner.open. Extensões binárias são descartadas sem
+    abrir o arquivo e os demais ignorados, como na exportação, contam em
+    stats['skipped']; stats['files'] recebe os arquivos verificados.
+    task.check() é chamado entre os lotes.
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault('files', 0)
+    stats.setdefault('skipped', 0)
+
+    def batches():
+        batch = []
+        for kind, path, _ in iter_export_plan(root_path, selected_items or {root_path}, scanner):
+            if kind != 'file':
+                continue
+            if skip_reason(path):
+                stats['skipped'] += 1
+                continue
+            batch.append(path)
+            if len(batch) == GREP_BATCH_SIZE:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def collect(results, skipped, count):
+        stats['files'] += count
+        stats['skipped'] += skipped
+        return results
+
+    if workers == 1 or (scanner is not None and not scanner.local):
+        opener = scanner.open if scanner is not None else None
+        for batch in batches():
+            if task:
+                task.check()
+            yield from collect(*grep_batch(batch, matcher.pattern, matcher.flags, max_size, opener), len(batch))
+        return
+
+    # Importado sob demanda: mantém rápida a inicialização do modo linha de comando
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    workers = workers or os.cpu_count() or 1
+    pending = {}  # future -> quantidade de arquivos do lote
+
+    def completed():
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        if task:
+            task.check()
+        for future in done:
+            yield from collect(*future.result(), pending.pop(future))
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        for batch in batches():
+            if task:
+                task.check()
+            future = executor.submit(grep_batch, batch, matcher.pattern, matcher.flags, max_size)
+            pending[future] = len(batch)
+            while len(pending) >= workers * 2:
+                yield from completed()
+        while pending:
+            yield from completed()
+    finally:
+        # Busca interrompida: descartar os lotes que ainda não começaram
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
@@ -0,0 +1,448 @@
+"""Estimativa de tokens e exportação dentro de um orçamento de tokens.
+
+A contagem é uma estimativa rápida (sem tokenizador externo): cada
+sequência de até 4 letras/dígitos e cada sinal de pontuação contam como
+um token, o que fica próximo dos tokenizadores BPE usados pelos LLMs em
+código e texto. A contagem de cada arquivo fica no TokenCache, chaveada
+por (caminho, mtime, tamanho).
+
+Na exportação com orçamento (write_documentation_budget), os arquivos
+são escolhidos por prioridade antes da escrita, usando as contagens do
+cache e, para os arquivos ainda não contados, uma estimativa pelo
+tamanho (CHARS_PER_TOKEN); assim cada arquivo é lido uma única vez. O
+arquivo que não cabe inteiro é truncado e os seguintes ficam de fora.
+"""
+import os
+import re
+import threading
+
+from folder_content_core import (
+    DEFAULT_MAX_FILE_SIZE, DEFAULT_READ_WORKERS, Scanner, SkippedFile, iter_export_plan, iter_file_body,
+    open_output, open_prefetched, prefetch_files, render_header, skip_reason, write_chunks
+)
+
+TOKEN_RE = re.compile(r"\w{1,4}|[^\w\s]")
+
+# Caracteres por token usados para estimar arquivos ainda não lidos
+CHARS_PER_TOKEN = 3
+
+# Um arquivo só é truncado se couberem pelo menos tantos tokens dele
+MIN_TRUNCATED_TOKENS = 200
+
+TRUNCATED_MARK = "\n[... truncado: orçamento de tokens]"
+
+
+def estimate_tokens(text):
+    """Quantidade estimada de tokens de um texto"""
+    return len(TOKEN_RE.findall(text))
+
+
+def section_header(rel_path):
+    """Cabeçalho e rodapé da seção de um arquivo (como em iter_file_section)"""
+    return f"### 📄 {rel_path}\n```\n", "\n```\n\n"
+
+
+class TokenCache:
+    """Contagem de tokens do conteúdo de cada arquivo, chaveada por (caminho, mtime, tamanho).
+
+    Compartilhado entre a contagem da seleção (em segundo plano) e a
+    exportação; é seguro para uso em várias threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # caminho -> (mtime, tamanho, tokens)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, path, mtime, size):
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == mtime and entry[1] == size:
+            return entry[2]
+        return None
+
+    def put(self, path, mtime, size, tokens):
+        with self._lock:
+            self._entries[path] = (mtime, size, tokens)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def count_file(self, path, mtime, size, max_size=DEFAULT_MAX_FILE_SIZE, opener=None):
+        """Tokens do conteúdo exportado de um arquivo (lido só se não estiver no cache)"""
+        tokens = self.get(path, mtime, size)
+        if tokens is None:
+            body = iter_file_body(path, max_size=max_size, opener=opener)
+            tokens = sum(estimate_tokens(chunk) for chunk in body)
+            self.put(path, mtime, size, tokens)
+        return tokens
+
+
+def iter_plan_tokens(root_path, selected_items, scanner=None, excluded_items=None, cache=None, task=None,
+                     read=True, max_size=DEFAULT_MAX_FILE_SIZE):
+    """Gera (tipo, caminho, caminho relativo, tokens, chave) para o plano de exportação.
+
+    Os tokens de um arquivo incluem o cabeçalho da seção e chave é o seu
+    (mtime, tamanho), ou None se ele não pôde ser consultado. Com read
+    verdadeiro, arquivos fora do cache são lidos e contados; caso
+    contrário são estimados pelo tamanho (CHARS_PER_TOKEN).
+    """
+    cache = cache if cache is not None else TokenCache()
+    scanner = scanner if scanner is not None else Scanner()
+    for kind, path, rel_path in iter_export_plan(root_path, selected_items, scanner, excluded_items):
+        if task:
+            task.check()
+        if kind == 'folder':
+            yield kind, path, rel_path, estimate_tokens(f"## 📁 {rel_path}/\n\n"), None
+            continue
+        if kind != 'file':
+            yield kind, path, rel_path, 0, None
+            continue
+
+        head, tail = section_header(rel_path)
+        overhead = estimate_tokens(head) + estimate_tokens(tail)
+        try:
+            key = mtime, size = scanner.file_key(path)
+        except OSError:
+            yield kind, path, rel_path, overhead, None
+            continue
+
+        # Ignorados viram uma linha "[Arquivo ignorado: ...]" e não entram no cache
+        reason = skip_reason(path, size, max_size)
+        if reason:
+            tokens = estimate_tokens(f"[Arquivo ignorado: {reason}]")
+        elif read:
+            try:
+                tokens = cache.count_file(path, mtime, size, max_size, scanner.open)
+            except OSError:
+                tokens = 0
+        else:
+            tokens = cache.get(path, mtime, size)
+            if tokens is None:
+                tokens = size // CHARS_PER_TOKEN
+        yield kind, path, rel_path, overhead + tokens, key
+
+
+def count_selection_tokens(root_path, selected_items, scanner=None, excluded_items=None, cache=None, task=None,
+                           max_size=DEFAULT_MAX_FILE_SIZE):
+    """Retorna (arquivos, tokens) da documentação de uma seleção (cabeçalho incluído).
+
+    Os arquivos que não estão no cache são lidos uma vez e contados;
+    task.progress(arquivos, tokens) relata as parciais.
+    """
+    files = 0
+    tokens = estimate_tokens(render_header(root_path))
+    for kind, _, _, item_tokens, _ in iter_plan_tokens(root_path, selected_items, scanner, excluded_items, cache,
+                                                       task, max_size=max_size):
+        tokens += item_tokens
+        if kind == 'file':
+            files += 1
+            if task:
+                task.progress(files, tokens)
+    return files, tokens
+
+
+class SelectionTokens:
+    """Arquivos e tokens de cada caminho das regras de seleção, para recontar só o que mudou.
+
+    Como em SizeTotals.selection, o total de uma seleção é o cabeçalho
+    mais a soma das inclusões menos a das exclusões (os tokens de um
+    arquivo não dependem do resto da seleção). Cada contagem guarda o
+    (mtime, tamanho) dos arquivos e o mtime das pastas percorridas: count
+    só reconta um caminho se algum deles mudou (o que exige apenas stats,
+    sem ler arquivos nem listar pastas), de modo que marcar ou desmarcar
+    um item só lê o caminho novo nas regras e um arquivo editado volta a
+    ser contado. discard descarta na hora as contagens afetadas por uma
+    alteração vista pelo modo de observação.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # caminho -> (arquivos, tokens dos arquivos, tokens do cabeçalho da pasta,
+        #             {arquivo: (mtime, tamanho)}, {pasta: mtime})
+        self._paths = {}
+
+    def __len__(self):
+        return len(self._paths)
+
+    def clear(self):
+        with self._lock:
+            self._paths.clear()
+
+    def discard(self, path):
+        """Descarta as contagens de path, das pastas acima dele e das subpastas"""
+        with self._lock:
+            for counted in [p for p in self._paths if _is_related(p, path)]:
+                del self._paths[counted]
+
+    def missing(self, included, excluded):
+        """Caminhos das regras ainda não contados"""
+        return [path for path in (*included, *excluded) if path not in self._paths]
+
+    def count(self, root_path, paths, scanner=None, cache=None, task=None, max_size=DEFAULT_MAX_FILE_SIZE):
+        """Conta os caminhos ainda não contados ou alterados desde a contagem (os arquivos fora do cache são lidos)"""
+        scanner = scanner if scanner is not None else Scanner()
+        for path in paths:
+            counted = self._paths.get(path)
+            if counted is not None and not self._changed(counted, scanner, task):
+                continue
+            # Os mtimes das pastas são lidos antes da contagem: uma alteração
+            # durante ela leva a uma nova contagem na próxima chamada
+            folders = {}
+            if scanner.local:
+                entry = scanner.stat(path)
+                watched = scanner.walk(path) if entry is not None and entry.is_dir else [(os.path.dirname(path),)]
+                for dir_path, *_ in watched:
+                    try:
+                        folders[dir_path] = os.stat(dir_path).st_mtime
+                    except OSError:
+                        folders[dir_path] = None
+            files = tokens = header = 0
+            keys = {}
+            for kind, file_path, _, item_tokens, key in iter_plan_tokens(root_path, {path}, scanner, None, cache,
+                                                                         task, max_size=max_size):
+                if kind == 'folder':
+                    header = item_tokens
+                    continue
+                tokens += item_tokens
+                if kind == 'file':
+                    files += 1
+                    keys[file_path] = key
+            with self._lock:
+                self._paths[path] = (files, tokens, header, keys, folders)
+
+    @staticmethod
+    def _changed(counted, scanner, task=None):
+        """Se algum arquivo ou pasta de uma contagem mudou desde que ela foi feita"""
+        if not scanner.local:
+            # Arquivos compactados e revisões do git não mudam
+            return False
+        for dir_path, mtime in counted[4].items():
+            if task:
+                task.check()
+            try:
+                if os.stat(dir_path).st_mtime != mtime:
+                    return True
+            except OSError:
+                return True
+        for file_path, key in counted[3].items():
+            try:
+                if scanner.file_key(file_path) != key:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    def selection(self, root_path, included, excluded):
+        """(arquivos, tokens) da documentação da seleção, ou None se faltar contar algum caminho"""
+        files = 0
+        tokens = estimate_tokens(render_header(root_path))
+        for paths, sign, with_header in ((included, 1, True), (excluded, -1, False)):
+            for path in paths:
+                counted = self._paths.get(path)
+                if counted is None:
+                    return None
+                files += sign * counted[0]
+                tokens += sign * (counted[1] + (counted[2] if with_header else 0))
+        return files, tokens
+
+
+def _is_related(path, other):
+    """Se um dos caminhos está dentro do outro (ou são iguais)"""
+    shorter, longer = sorted((path, other), key=len)
+    return longer == shorter or longer.startswith(shorter.rstrip(os.sep) + os.sep)
+
+
+def omitted_note(count):
+    """Nota ao final da documentação sobre os arquivos deixados de fora do orçamento"""
+    return f"## ✂️ Fora do orçamento de tokens: {count} arquivo(s)\n\n"
+
+
+def budget_priority(rel_path, tokens):
+    """Prioridade padrão de um arquivo: os mais rasos e, entre eles, os menores primeiro"""
+    return rel_path.count('/'), tokens
+
+
+def plan_budget(items, budget, priority=budget_priority):
+    """Decide quanto de cada arquivo cabe no orçamento.
+
+    items são tuplas (caminho, caminho relativo, tokens); retorna um dict
+    caminho -> limite de tokens (None = inteiro, 0 = fora). Os arquivos
+    entram inteiros em ordem de prioridade enquanto couberem; o primeiro
+    que não couber é truncado (se sobrarem MIN_TRUNCATED_TOKENS) e os
+    demais que não couberem ficam de fora.
+    """
+    limits = {}
+    remaining = budget
+    for path, rel_path, tokens in sorted(items, key=lambda item: priority(item[1], item[2])):
+        if tokens <= remaining:
+            limits[path] = None
+            remaining -= tokens
+        elif remaining >= MIN_TRUNCATED_TOKENS:
+            limits[path] = remaining
+            remaining = 0
+        else:
+            limits[path] = 0
+    return limits
+
+
+def truncate_tokens(text, max_tokens):
+    """Retorna (trecho de text com até max_tokens tokens, tokens do trecho)"""
+    count = 0
+    for match in TOKEN_RE.finditer(text):
+        if count == max_tokens:
+            return text[:match.start()], count
+        count += 1
+    return text, count
+
+
+def iter_documentation_budget(root_path, selected_items, budget, read_workers=DEFAULT_READ_WORKERS, task=None,
+                              stats=None, scanner=None, cache=None, excluded_items=None,
+                              max_file_size=DEFAULT_MAX_FILE_SIZE, priority=budget_priority):
+    """Gera a documentação limitada a budget tokens (estimados).
+
+    Como iter_documentation, mas os arquivos são escolhidos com plan_budget
+    antes da escrita. stats['tokens'] recebe os tokens gerados,
+    stats['truncated'] e stats['omitted'] os arquivos truncados e deixados
+    de fora. Arquivos lidos por inteiro atualizam o cache de tokens.
+
+    As estimativas do plano podem ficar abaixo do real; por isso, antes de
+    cada arquivo, o cabeçalho da seção, a marca de truncamento, as pastas
+    ainda por vir e a nota final são descontados do que resta, e quando
+    não cabe mais um cabeçalho com um corpo mínimo a exportação para e os
+    arquivos restantes contam como deixados de fora.
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault('files', 0)
+    stats.setdefault('skipped', 0)
+    stats['tokens'] = stats['truncated'] = stats['omitted'] = 0
+    cache = cache if cache is not None else TokenCache()
+    scanner = scanner if scanner is not None else Scanner()
+    opener = scanner.open
+
+    header = render_header(root_path)
+    plan = list(iter_plan_tokens(root_path, selected_items, scanner, excluded_items, cache, task, read=False,
+                                 max_size=max_file_size))
+    keys = {path: key for kind, path, _, _, key in plan if kind == 'file'}
+    estimates = {path: tokens for kind, path, _, tokens, _ in plan if kind == 'file'}
+    # Reserva para a marca de truncamento e para a nota final dos arquivos deixados de fora
+    mark_tokens = estimate_tokens(TRUNCATED_MARK)
+    note_tokens = estimate_tokens(omitted_note(len(estimates)))
+    folders_left = sum(tokens for kind, _, _, tokens, _ in plan if kind == 'folder')
+    fixed = estimate_tokens(header) + mark_tokens + note_tokens + folders_left
+    limits = plan_budget(
+        [(path, rel_path, tokens) for kind, path, rel_path, tokens, _ in plan if kind == 'file'],
+        budget - fixed, priority
+    )
+    omitted = sum(1 for limit in limits.values() if limit == 0)
+    files_left = len(limits) - omitted
+
+    stats['tokens'] += estimate_tokens(header)
+    yield header
+
+    chosen = ((kind, path, rel_path) for kind, path, rel_path, _, _ in plan
+              if kind != 'file' or limits[path] != 0)
+    if read_workers > 1 and scanner.parallel_reads:
+        items = prefetch_files(chosen, read_workers, max_size=max_file_size, opener=opener)
+    else:
+        items = ((kind, path, rel_path,
+                  open_prefetched(path, max_size=max_file_size, opener=opener) if kind == 'file' else None)
+                 for kind, path, rel_path in chosen)
+
+    for kind, path, rel_path, prefetched in items:
+        if kind == 'folder':
+            text = f"## 📁 {rel_path}/\n\n"
+            tokens = estimate_tokens(text)
+            folders_left -= tokens
+            stats['tokens'] += tokens
+            yield text
+            continue
+        if kind == 'error':
+            text = f"[Erro ao processar pasta {path}: {rel_path}]\n\n"
+            stats['tokens'] += estimate_tokens(text)
+            yield text
+            continue
+
+        if task:
+            task.check()
+            task.progress(stats['files'], rel_path)
+        head, tail = section_header(rel_path)
+        overhead = estimate_tokens(head) + estimate_tokens(tail)
+
+        # O que sobra para o corpo depois do cabeçalho, da marca de truncamento,
+        # das pastas ainda por vir e da nota final; arquivos inteiros também são
+        # limitados a isso
+        available = budget - stats['tokens'] - overhead - mark_tokens - folders_left - note_tokens
+        if available < min(MIN_TRUNCATED_TOKENS, max(1, estimates[path] - overhead)):
+            prefetched.close()
+            items.close()
+            omitted += files_left
+            break
+        files_left -= 1
+
+        skipped = isinstance(prefetched.error, SkippedFile)
+        if skipped:
+            stats['skipped'] += 1
+        stats['tokens'] += overhead
+        yield head
+
+        limit = limits[path]
+        limit = available if limit is None else min(limit, available)
+        tokens = 0
+        truncated = False
+        body = iter_file_body(path, prefetched, max_file_size, opener)
+        for chunk in body:
+            chunk_tokens = estimate_tokens(chunk)
+            if tokens + chunk_tokens > limit:
+                chunk, chunk_tokens = truncate_tokens(chunk, limit - tokens)
+                truncated = True
+            tokens += chunk_tokens
+            yield chunk
+            if truncated:
+                body.close()
+                stats['tokens'] += estimate_tokens(TRUNCATED_MARK)
+                yield TRUNCATED_MARK
+                break
+
+        if truncated:
+            stats['truncated'] += 1
+        elif keys.get(path) and prefetched.error is None:
+            cache.put(path, *keys[path], tokens)
+        stats['tokens'] += tokens
+        stats['files'] += 1
+        yield tail
+
+    if omitted:
+        stats['omitted'] = omitted
+        stats['tokens'] += estimate_tokens(omitted_note(omitted))
+        yield omitted_note(omitted)
+
+
+def write_documentation_budget(file_path, root_path, selected_items, budget, read_workers=DEFAULT_READ_WORKERS,
+                               task=None, stats=None, scanner=None, cache=None, excluded_items=None,
+                               max_file_size=DEFAULT_MAX_FILE_SIZE, priority=budget_priority, compress_level=None):
+    """Grava a documentação limitada a budget tokens (veja iter_documentation_budget).
+
+    Saídas .gz, .xz e .bz2 são comprimidas como em write_documentation.
+    Em caso de cancelamento ou erro o arquivo parcial é removido.
+    Retorna a quantidade de arquivos exportados.
+    """
+    if stats is None:
+        stats = {}
+    chunks = iter_documentation_budget(
+        root_path, selected_items, budget, read_workers, task, stats, scanner, cache, excluded_items,
+        max_file_size, priority
+    )
+    try:
+        with open_output(file_path, compress_level) as f:
+            write_chunks(f, chunks)
+    except BaseException:
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
+        raise
+    return stats['files']
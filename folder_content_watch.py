@@ -0,0 +1,268 @@
+"""Monitoramento das pastas do projeto para o modo de observação da interface.
+
+create_watcher() devolve um InotifyWatcher no Linux (inotify pela libc,
+via ctypes, sem dependências externas) ou, onde ele não existir, um
+PollingWatcher, que compara o mtime das pastas a cada consulta. Quem usa
+registra as pastas com watch e chama changes() periodicamente,
+recebendo as pastas cuja listagem mudou (itens criados, apagados ou
+renomeados) e os arquivos cujo conteúdo mudou desde a consulta anterior.
+Os dois podem ser usados por várias threads: a interface consulta
+changes() e registra subárvores em segundo plano (o polling consulta
+cada pasta monitorada com stat, o que não pode travar a thread do Tk).
+
+Alterar um arquivo no lugar não muda o mtime da pasta: no polling, o
+mtime dos arquivos só é comparado nas pastas registradas com
+files=True (na interface, as pastas abertas na árvore). Se o limite de
+inotify do sistema (fs.inotify.max_user_watches) acabar, as pastas
+excedentes passam a ser consultadas por polling.
+
+Exemplo:
+    from folder_content_watch import create_watcher
+    watcher = create_watcher()
+    watcher.watch('/projetos/app', files=True)
+    dirs, files = watcher.changes()
+"""
+import errno
+import os
+import struct
+import threading
+
+# Intervalo sugerido entre consultas (segundos)
+INOTIFY_INTERVAL = 0.5
+POLL_INTERVAL = 2.0
+
+# Constantes de <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0)
+
+_LISTING_EVENTS = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+_CONTENT_EVENTS = IN_MODIFY | IN_CLOSE_WRITE
+_WATCH_MASK = _LISTING_EVENTS | _CONTENT_EVENTS | IN_MOVE_SELF | IN_ONLYDIR
+
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, tamanho do nome
+_READ_SIZE = 64 * 1024
+
+
+def _is_within(path, folder):
+    return path == folder or path.startswith(folder.rstrip(os.sep) + os.sep)
+
+
+class PollingWatcher:
+    """Monitoramento por consulta do mtime das pastas (e dos arquivos das pastas com files=True)"""
+
+    name = "polling"
+    interval = POLL_INTERVAL
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dirs = {}   # pasta -> mtime
+        self._files = {}  # pasta com files=True -> {nome: (mtime, tamanho)}
+
+    def __contains__(self, path):
+        return path in self._dirs
+
+    def __len__(self):
+        return len(self._dirs)
+
+    def watch(self, path, files=False):
+        """Passa a monitorar uma pasta; com files, também o conteúdo dos seus arquivos"""
+        if path not in self._dirs:
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                return
+            with self._lock:
+                self._dirs.setdefault(path, mtime)
+        if files and path not in self._files:
+            keys = self._stat_files(path)
+            with self._lock:
+                if path in self._dirs:
+                    self._files.setdefault(path, keys)
+
+    def unwatch(self, path):
+        """Deixa de monitorar uma pasta e tudo abaixo dela"""
+        with self._lock:
+            for watched in [p for p in self._dirs if _is_within(p, path)]:
+                del self._dirs[watched]
+                self._files.pop(watched, None)
+
+    def changes(self):
+        """(pastas com a listagem alterada, arquivos com o conteúdo alterado) desde a última consulta"""
+        dirs, files = set(), set()
+        with self._lock:
+            watched = list(self._dirs.items())
+        # Os stats são feitos fora do lock; pastas que deixaram de ser
+        # monitoradas nesse meio tempo são descartadas
+        for path, mtime in watched:
+            try:
+                current = os.stat(path).st_mtime
+            except OSError:
+                # Pasta apagada: a mudança aparece na listagem da pasta acima
+                self.unwatch(path)
+                continue
+            keys = self._stat_files(path) if path in self._files else None
+            with self._lock:
+                if self._dirs.get(path) != mtime:
+                    continue
+                if current != mtime:
+                    self._dirs[path] = current
+                    dirs.add(path)
+                previous = self._files.get(path)
+                if keys is not None and previous is not None:
+                    self._files[path] = keys
+                    files.update(
+                        os.path.join(path, name) for name, key in keys.items()
+                        if name in previous and previous[name] != key
+                    )
+        return dirs, files
+
+    def close(self):
+        with self._lock:
+            self._dirs.clear()
+            self._files.clear()
+
+    @staticmethod
+    def _stat_files(path):
+        keys = {}
+        try:
+            with os.scandir(path) as it:
+                for dir_entry in it:
+                    try:
+                        if dir_entry.is_file():
+                            st = dir_entry.stat()
+                            keys[dir_entry.name] = (st.st_mtime, st.st_size)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return keys
+
+
+class InotifyWatcher:
+    """Monitoramento pelo inotify do Linux (um watch por pasta; arquivos sempre monitorados)"""
+
+    name = "inotify"
+    interval = INOTIFY_INTERVAL
+
+    def __init__(self):
+        # Importado sob demanda: só é necessário no Linux
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        # AttributeError quando a libc não tem inotify (outros sistemas)
+        self._add_watch = libc.inotify_add_watch
+        self._rm_watch = libc.inotify_rm_watch
+        self._get_errno = ctypes.get_errno
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code))
+        self._fd = fd
+        self._lock = threading.Lock()
+        self._paths = {}  # pasta -> wd
+        self._wds = {}    # wd -> pasta
+        self._fallback = PollingWatcher()  # pastas além do limite de watches do sistema
+
+    def __contains__(self, path):
+        return path in self._paths or path in self._fallback
+
+    def __len__(self):
+        return len(self._paths) + len(self._fallback)
+
+    def watch(self, path, files=False):
+        """Passa a monitorar uma pasta (files é ignorado: o inotify já informa os arquivos)"""
+        if path in self._paths:
+            return
+        if path in self._fallback:
+            self._fallback.watch(path, files)
+            return
+        with self._lock:
+            if self._fd < 0:
+                return
+            wd = self._add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+            if wd >= 0:
+                self._paths[path] = wd
+                self._wds[wd] = path
+                return
+            full = self._get_errno() == errno.ENOSPC
+        if full:
+            self._fallback.watch(path, files)
+
+    def unwatch(self, path):
+        """Deixa de monitorar uma pasta e tudo abaixo dela"""
+        with self._lock:
+            for watched in [p for p in self._paths if _is_within(p, path)]:
+                wd = self._paths.pop(watched)
+                self._wds.pop(wd, None)
+                self._rm_watch(self._fd, wd)
+        self._fallback.unwatch(path)
+
+    def changes(self):
+        """(pastas com a listagem alterada, arquivos com o conteúdo alterado) desde a última consulta"""
+        dirs, files = self._fallback.changes()
+        with self._lock:
+            self._read_events(dirs, files)
+        return dirs, files
+
+    def _read_events(self, dirs, files):
+        """Lê os eventos pendentes (o descritor não bloqueia) e os acumula em dirs e files"""
+        while self._fd >= 0:
+            try:
+                data = os.read(self._fd, _READ_SIZE)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, size = _EVENT_HEADER.unpack_from(data, offset)
+                name = data[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + size].rstrip(b'\0')
+                offset += _EVENT_HEADER.size + size
+
+                if mask & IN_Q_OVERFLOW:
+                    # Eventos perdidos: todas as pastas precisam ser relidas
+                    dirs.update(self._paths)
+                    continue
+                path = self._wds.get(wd)
+                if path is None:
+                    continue
+                if mask & (IN_IGNORED | IN_MOVE_SELF):
+                    # Pasta apagada ou movida: a mudança aparece na listagem da pasta
+                    # acima, e o caminho fica livre para uma nova pasta de mesmo nome
+                    del self._wds[wd]
+                    if self._paths.get(path) == wd:
+                        del self._paths[path]
+                    if mask & IN_MOVE_SELF:
+                        self._rm_watch(self._fd, wd)
+                elif mask & _LISTING_EVENTS:
+                    dirs.add(path)
+                elif mask & _CONTENT_EVENTS and not mask & IN_ISDIR:
+                    files.add(os.path.join(path, os.fsdecode(name)))
+
+    def close(self):
+        with self._lock:
+            if self._fd >= 0:
+                os.close(self._fd)
+                self._fd = -1
+            self._paths.clear()
+            self._wds.clear()
+        self._fallback.close()
+
+
+def create_watcher():
+    """InotifyWatcher quando disponível (Linux); senão, PollingWatcher"""
+    try:
+        return InotifyWatcher()
+    except (OSError, AttributeError):
+        return PollingWatcher()
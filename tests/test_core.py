@@ -0,0 +1,78 @@
+"""Testes do núcleo de exportação (folder_content_core)."""
+import io
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from folder_content_core import copy_raw_file, iter_file_body, open_prefetched, open_raw_file, write_documentation
+
+
+class InvalidUtf8Test(unittest.TestCase):
+    """A leitura em texto e a cópia em bytes geram a mesma saída para arquivos inválidos"""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+
+    def write(self, name, data):
+        path = os.path.join(self.folder, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def text_body(self, path, prefetch=None):
+        prefetched = open_prefetched(path, size=prefetch, max_size=None) if prefetch else None
+        return ''.join(iter_file_body(path, prefetched, max_size=None)).encode('utf-8')
+
+    def raw_body(self, path, chunk_size=mmap.ALLOCATIONGRANULARITY):
+        out = io.BytesIO()
+        copy_raw_file(open_raw_file(path, None), out, chunk_size)
+        return out.getvalue()
+
+    def test_invalid_byte_early(self):
+        path = self.write('early.txt', b'abc\r\ndef\xffghi')
+        expected = (b"abc\ndef\n[Erro ao ler arquivo: 'utf-8' codec can't decode byte 0xff "
+                    b"in position 8: invalid start byte]")
+        self.assertEqual(self.text_body(path), expected)
+        self.assertEqual(self.text_body(path, prefetch=4), expected)
+        self.assertEqual(self.raw_body(path), expected)
+
+    def test_invalid_byte_after_first_chunks(self):
+        # O byte inválido fica depois de várias janelas e de um caractere cortado entre elas
+        granularity = mmap.ALLOCATIONGRANULARITY
+        data = b'a' * (3 * granularity - 1) + '€'.encode('utf-8') + b'\r\nok\xe2A'
+        path = self.write('late.txt', data)
+        text = self.text_body(path)
+        self.assertTrue(text.startswith(b'a' * (3 * granularity - 1) + '€\nok'.encode('utf-8')))
+        self.assertIn(f"in position {len(data) - 2}:".encode('utf-8'), text)
+        self.assertEqual(self.raw_body(path), text)
+        self.assertEqual(self.text_body(path, prefetch=granularity), text)
+
+    def test_incomplete_character_at_end(self):
+        path = self.write('cut.txt', 'é'.encode('utf-8') * 5000 + b'\xe2\x82')
+        text = self.text_body(path)
+        self.assertIn(b"in position 10000: unexpected end of data", text)
+        self.assertEqual(self.raw_body(path), text)
+
+    def test_full_export_matches_with_and_without_raw_copy(self):
+        self.write('a.txt', b'linha\r\n' * 50000 + b'\xff fim')
+        self.write('b.txt', 'válido\n'.encode('utf-8') * 1000)
+        outputs = []
+        for raw_copy_size in (None, 1):
+            output = os.path.join(tempfile.mkdtemp(), 'saida.md')
+            self.addCleanup(shutil.rmtree, os.path.dirname(output))
+            write_documentation(output, self.folder, {self.folder}, max_file_size=None,
+                                raw_copy_size=raw_copy_size)
+            with open(output, 'rb') as f:
+                # A linha "Data:" do cabeçalho pode mudar entre as duas exportações
+                outputs.append([line for line in f.read().split(b'\n') if not line.startswith(b'Data: ')])
+        self.assertEqual(outputs[0], outputs[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+"""Testes da exportação incremental (folder_content_incremental)."""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from folder_content_core import write_documentation
+from folder_content_incremental import write_documentation_incremental
+
+
+class IncrementalStatsTest(unittest.TestCase):
+    """Atualizações incrementais relatam e geram o mesmo que a geração completa"""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+        self.addCleanup(shutil.rmtree, self.output_dir)
+        for i in range(5):
+            self.write(f"f{i}.txt", f"arquivo {i}\n")
+        self.write('dados.bin', b'x\0y')
+        self.write('grande.txt', 'linha\r\n' * 20000)
+
+    def write(self, name, content, mode='w'):
+        if isinstance(content, bytes):
+            mode += 'b'
+        with open(os.path.join(self.folder, name), mode) as f:
+            f.write(content)
+
+    def export(self, name, incremental):
+        output = os.path.join(self.output_dir, name)
+        stats = {}
+        export = write_documentation_incremental if incremental else write_documentation
+        export(output, self.folder, {self.folder}, stats=stats, max_file_size=None, raw_copy_size=1024)
+        with open(output, 'rb') as f:
+            lines = [line for line in f.read().split(b'\n') if not line.startswith(b'Data: ')]
+        return stats, lines
+
+    def test_patch_and_rebuild_match_full_export(self):
+        self.export('saida.md', incremental=True)
+        for change, kind in (("f1.txt", 'patch'), ("grande.txt", 'rebuild')):
+            # Mesmo tamanho em bytes: sobrescrita no lugar; mais bytes: remontagem
+            self.write(change, "X" if kind == 'patch' else "mais uma linha\n", mode='r+' if kind == 'patch' else 'a')
+            stats, lines = self.export('saida.md', incremental=True)
+            full_stats, full_lines = self.export('completa.md', incremental=False)
+            self.assertEqual(stats['incremental'], kind)
+            self.assertEqual((stats['files'], stats['skipped']), (full_stats['files'], full_stats['skipped']))
+            self.assertEqual(stats['skipped'], 1)
+            self.assertEqual(lines, full_lines)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+"""Testes da contagem de tokens (folder_content_tokens)."""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from folder_content_core import Scanner
+from folder_content_tokens import SelectionTokens, TokenCache, count_selection_tokens
+
+
+class SelectionTokensTest(unittest.TestCase):
+    """As contagens por caminho acompanham o disco e batem com a contagem completa"""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+        self.scanner, self.cache = Scanner(), TokenCache()  # compartilhados, como na interface
+        os.makedirs(os.path.join(self.folder, 'sub', 'vazia'))
+        self.write('a.txt', 'um dois tres')
+        self.write(os.path.join('sub', 'b.py'), 'print("b")\n')
+        self.write(os.path.join('sub', 'c.md'), '# c\n')
+
+    def write(self, name, text, mtime=None):
+        path = os.path.join(self.folder, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def count(self, tokens, included, excluded=()):
+        tokens.count(self.folder, [*included, *excluded], self.scanner, self.cache)
+        expected = count_selection_tokens(self.folder, set(included), self.scanner, set(excluded), self.cache)
+        result = tokens.selection(self.folder, included, excluded)
+        self.assertEqual(result, expected)
+        return result
+
+    def test_matches_full_count_with_exclusions(self):
+        tokens = SelectionTokens()
+        sub = os.path.join(self.folder, 'sub')
+        included = [self.folder, os.path.join(sub, 'c.md')]
+        self.count(tokens, included, [sub])
+        self.assertEqual(tokens.missing(included, [sub]), [])
+
+    def test_edited_file_is_recounted(self):
+        tokens = SelectionTokens()
+        before = self.count(tokens, [self.folder])
+        # Mesmo mtime da pasta: a edição no lugar só muda o próprio arquivo
+        path = os.path.join(self.folder, 'a.txt')
+        self.write('a.txt', 'palavra ' * 5000, mtime=os.stat(path).st_mtime + 10)
+        after = self.count(tokens, [self.folder])
+        self.assertEqual(after[0], before[0])
+        self.assertGreater(after[1], before[1] + 4000)
+
+    def test_new_file_in_empty_folder_is_counted(self):
+        tokens = SelectionTokens()
+        before = self.count(tokens, [self.folder])
+        self.write(os.path.join('sub', 'vazia', 'novo.txt'), 'novo arquivo')
+        after = self.count(tokens, [self.folder])
+        self.assertEqual(after[0], before[0] + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()